@@ -1,14 +1,16 @@
 """
 Match API routes for candidate-job matching
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import logging
 
 from backend.database import get_db, User
 from backend.api.auth import get_current_user
-from backend.services import get_matching_service
+from backend.api.schemas import BatchMatchRequest, DistributedMatchRequest, ShardSearchRequest
+from backend.services import get_matching_service, get_embedding_index, get_match_cache, get_shard_pool
+from backend.core.executor import run_in_session
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/match", tags=["Matching"])
@@ -19,7 +21,14 @@ async def match_candidate_to_jobs(
     candidate_id: int,
     top_k: int = Query(default=10, ge=1, le=100),
     min_similarity: float = Query(default=0.5, ge=0.0, le=1.0),
-    db: Session = Depends(get_db),
+    search_mode: Optional[str] = Query(None, pattern="^(exact|ivf|int8|pq)$"),
+    nprobe: Optional[int] = Query(None, ge=1, le=1024),
+    location: Optional[str] = Query(None, description="Job location contains"),
+    job_type: Optional[str] = Query(None),
+    seniority_level: Optional[str] = Query(None),
+    domain: Optional[str] = Query(None),
+    min_experience: Optional[float] = Query(None, ge=0, description="Minimum years the job requires"),
+    max_experience: Optional[float] = Query(None, ge=0, description="Maximum years the job requires"),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -27,11 +36,22 @@ async def match_candidate_to_jobs(
     """
     try:
         matching_service = get_matching_service()
-        matches = matching_service.match_candidate_to_jobs(
-            db=db,
+        # Index search and its DB reads run on the blocking executor
+        matches = await run_in_session(
+            matching_service.match_candidate_to_jobs,
             candidate_id=candidate_id,
             top_k=top_k,
-            min_similarity=min_similarity
+            min_similarity=min_similarity,
+            search_mode=search_mode,
+            nprobe=nprobe,
+            filters={
+                "location": location,
+                "job_type": job_type,
+                "seniority_level": seniority_level,
+                "domain": domain,
+                "min_experience": min_experience,
+                "max_experience": max_experience
+            }
         )
         
         if not matches:
@@ -61,7 +81,10 @@ async def match_job_to_candidates(
     job_id: int,
     top_k: int = Query(default=10, ge=1, le=100),
     min_similarity: float = Query(default=0.5, ge=0.0, le=1.0),
-    db: Session = Depends(get_db),
+    search_mode: Optional[str] = Query(None, pattern="^(exact|ivf|int8|pq)$"),
+    nprobe: Optional[int] = Query(None, ge=1, le=1024),
+    min_experience: Optional[float] = Query(None, ge=0, description="Minimum candidate years of experience"),
+    max_experience: Optional[float] = Query(None, ge=0, description="Maximum candidate years of experience"),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -69,11 +92,14 @@ async def match_job_to_candidates(
     """
     try:
         matching_service = get_matching_service()
-        matches = matching_service.match_job_to_candidates(
-            db=db,
+        matches = await run_in_session(
+            matching_service.match_job_to_candidates,
             job_id=job_id,
             top_k=top_k,
-            min_similarity=min_similarity
+            min_similarity=min_similarity,
+            search_mode=search_mode,
+            nprobe=nprobe,
+            filters={"min_experience": min_experience, "max_experience": max_experience}
         )
         
         if not matches:
@@ -96,3 +122,229 @@ async def match_job_to_candidates(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error finding matches: {str(e)}"
         )
+
+
+@router.post("/batch")
+async def match_batch(
+    request: BatchMatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get top matches for many candidates or many jobs in one request
+    """
+    if bool(request.candidate_ids) == bool(request.job_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either candidate_ids or job_ids"
+        )
+    
+    filters = {
+        "min_experience": request.min_experience,
+        "max_experience": request.max_experience
+    }
+    job_filters = {
+        "location": request.location,
+        "job_type": request.job_type,
+        "seniority_level": request.seniority_level,
+        "domain": request.domain
+    }
+    if request.candidate_ids:
+        filters.update(job_filters)
+    elif any(value is not None for value in job_filters.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="location, job_type, seniority_level and domain filters apply to candidate_ids only"
+        )
+    
+    try:
+        query_type = "candidate" if request.candidate_ids else "job"
+        result = await run_in_session(
+            get_matching_service().match_batch,
+            query_type=query_type,
+            ids=request.candidate_ids or request.job_ids,
+            top_k=request.top_k,
+            min_similarity=request.min_similarity,
+            filters=filters
+        )
+        
+        logger.info(f"Batch matched {len(result['results'])} {query_type}s")
+        return {
+            "query_type": query_type,
+            "total_queries": len(result['results']),
+            **result
+        }
+    
+    except Exception as e:
+        logger.error(f"Error batch matching: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding matches: {str(e)}"
+        )
+
+
+@router.post("/distributed")
+async def match_distributed(
+    request: DistributedMatchRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get top matches for one candidate or job across all matcher nodes
+    (MATCH_NODE_URLS): the query vector is sent to every node and the
+    per-node top matches are merged. Nodes slower than
+    MATCH_NODE_TIMEOUT_SECONDS are left out and the response is marked partial.
+    """
+    matching_service = get_matching_service()
+    if not matching_service.node_client.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Distributed matching is not configured (MATCH_NODE_URLS)"
+        )
+    if (request.candidate_id is None) == (request.job_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either candidate_id or job_id"
+        )
+    
+    filters = {
+        "min_experience": request.min_experience,
+        "max_experience": request.max_experience
+    }
+    job_filters = {
+        "location": request.location,
+        "job_type": request.job_type,
+        "seniority_level": request.seniority_level,
+        "domain": request.domain
+    }
+    if request.candidate_id is not None:
+        filters.update(job_filters)
+    elif any(value is not None for value in job_filters.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="location, job_type, seniority_level and domain filters apply to candidate_id only"
+        )
+    
+    query_type = "candidate" if request.candidate_id is not None else "job"
+    entity_id = request.candidate_id if request.candidate_id is not None else request.job_id
+    try:
+        # Nodes authenticate the forwarded token against the shared user table
+        authorization = http_request.headers.get("Authorization")
+        result = await matching_service.match_distributed(
+            db=db,
+            query_type=query_type,
+            entity_id=entity_id,
+            top_k=request.top_k,
+            min_similarity=request.min_similarity,
+            search_mode=request.search_mode,
+            nprobe=request.nprobe,
+            filters=filters,
+            headers={"Authorization": authorization} if authorization else None
+        )
+    except Exception as e:
+        logger.error(f"Error matching across nodes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding matches: {str(e)}"
+        )
+    
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{query_type.capitalize()} {entity_id} not found"
+        )
+    
+    logger.info(f"Found {len(result['matches'])} matches for {query_type} {entity_id} across nodes")
+    return {
+        f"{query_type}_id": entity_id,
+        "total_matches": len(result['matches']),
+        **result
+    }
+
+
+@router.post("/shard/search")
+async def search_shard(
+    request: ShardSearchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search this node's shard of the index (MATCHER_SHARD_INDEX of
+    MATCHER_SHARD_COUNT) for a coordinator's query vector
+    """
+    try:
+        hits = await run_in_session(
+            get_matching_service().search_shard,
+            kind=request.kind,
+            vector=request.vector,
+            top_k=request.top_k,
+            min_similarity=request.min_similarity,
+            search_mode=request.search_mode,
+            nprobe=request.nprobe,
+            filters=request.filters,
+            skills=request.skills,
+            experience=request.experience
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching index shard: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching shard: {str(e)}"
+        )
+    
+    index = get_embedding_index()
+    return {
+        "shard_index": index.shard_index,
+        "shard_count": index.shard_count,
+        "hits": [list(hit) for hit in hits]
+    }
+
+
+@router.get("/index/recall")
+async def measure_index_recall(
+    kind: str = Query(default="candidate", pattern="^(candidate|job)$"),
+    sample_size: int = Query(default=100, ge=1, le=1000),
+    top_k: int = Query(default=10, ge=1, le=100),
+    nprobe: Optional[int] = Query(None, ge=1, le=1024),
+    search_mode: str = Query(default="ivf", pattern="^(ivf|int8|pq)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Measure recall and latency of an approximate search mode against exact search
+    """
+    try:
+        report = await run_in_session(
+            get_embedding_index().measure_recall,
+            kind=kind,
+            sample_size=sample_size,
+            top_k=top_k,
+            nprobe=nprobe,
+            search_mode=search_mode
+        )
+        logger.info(f"{search_mode} recall for {kind} partition: {report['recall']}")
+        return report
+    
+    except Exception as e:
+        logger.error(f"Error measuring index recall: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error measuring recall: {str(e)}"
+        )
+
+
+@router.get("/index/stats")
+async def get_index_stats(current_user: User = Depends(get_current_user)):
+    """
+    Get embedding index row, tombstone and capacity counters, plus the
+    published versions of the search shards
+    """
+    return dict(get_embedding_index().stats(), shards=get_shard_pool().stats())
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """
+    Get match cache hit, miss and eviction counters
+    """
+    return get_match_cache().stats()
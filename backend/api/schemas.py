@@ -2,7 +2,7 @@
 Pydantic schemas for API request/response validation
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 from datetime import datetime
 
 
@@ -112,6 +112,50 @@ class MatchRequest(BaseModel):
     min_similarity: float = Field(default=0.5, ge=0.0, le=1.0)
 
 
+class BatchMatchRequest(BaseModel):
+    candidate_ids: Optional[List[int]] = Field(default=None, max_length=5000)
+    job_ids: Optional[List[int]] = Field(default=None, max_length=5000)
+    top_k: int = Field(default=10, ge=1, le=100)
+    min_similarity: float = Field(default=0.5, ge=0.0, le=1.0)
+    # Filters on the matched jobs (candidate_ids) or candidates (job_ids);
+    # location, job_type, seniority_level and domain apply to jobs only
+    location: Optional[str] = None
+    job_type: Optional[str] = None
+    seniority_level: Optional[str] = None
+    domain: Optional[str] = None
+    min_experience: Optional[float] = Field(default=None, ge=0)
+    max_experience: Optional[float] = Field(default=None, ge=0)
+
+
+class DistributedMatchRequest(BaseModel):
+    candidate_id: Optional[int] = None
+    job_id: Optional[int] = None
+    top_k: int = Field(default=10, ge=1, le=100)
+    min_similarity: float = Field(default=0.5, ge=0.0, le=1.0)
+    search_mode: Optional[str] = Field(default=None, pattern="^(exact|ivf|int8|pq)$")
+    nprobe: Optional[int] = Field(default=None, ge=1, le=1024)
+    # Same filters as BatchMatchRequest
+    location: Optional[str] = None
+    job_type: Optional[str] = None
+    seniority_level: Optional[str] = None
+    domain: Optional[str] = None
+    min_experience: Optional[float] = Field(default=None, ge=0)
+    max_experience: Optional[float] = Field(default=None, ge=0)
+
+
+class ShardSearchRequest(BaseModel):
+    kind: str = Field(pattern="^(job|candidate)$")  # partition searched
+    vector: List[float]
+    top_k: int = Field(default=10, ge=1, le=100)
+    min_similarity: float = Field(default=0.5, ge=0.0, le=1.0)
+    search_mode: Optional[str] = Field(default=None, pattern="^(exact|ivf|int8|pq)$")
+    nprobe: Optional[int] = Field(default=None, ge=1, le=1024)
+    filters: Dict[str, Union[float, str]] = Field(default_factory=dict)
+    # Query entity attributes for hybrid ranking
+    skills: Optional[List[str]] = None
+    experience: Optional[float] = None
+
+
 # Search Schemas
 class SearchRequest(BaseModel):
     query: Optional[str]
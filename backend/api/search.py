@@ -2,14 +2,15 @@
 Search API routes for filtering candidates and jobs
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import logging
 
-from backend.database import get_db, Candidate, Job, User
+from backend.database import get_db, Candidate, Job, User, skill_filter
 from backend.api.schemas import CandidateResponse, JobResponse
 from backend.api.auth import get_current_user
+from backend.services.text_search import get_text_search
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/search", tags=["Search"])
@@ -18,37 +19,46 @@ router = APIRouter(prefix="/search", tags=["Search"])
 @router.get("/candidates", response_model=List[CandidateResponse])
 async def search_candidates(
     skills: Optional[str] = Query(None, description="Comma-separated skills"),
+    skills_match: str = Query("all", pattern="^(all|any)$", description="Require all listed skills or any of them"),
     min_experience: Optional[float] = Query(None, ge=0),
     max_experience: Optional[float] = Query(None, ge=0),
     name: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, description="Full-text query over name and resume text; best matches first"),
+    fuzzy: bool = Query(False, description="Typo-tolerant name match (PostgreSQL with pg_trgm)"),
     limit: int = Query(default=50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Search and filter candidates
     """
     try:
-        query = db.query(Candidate)
+        query = select(Candidate)
+        text_search = get_text_search()
+        
+        # Full-text query, ordered by relevance
+        if q and q.strip():
+            query = text_search.match(query, Candidate, q)
         
         # Filter by name
         if name:
-            query = query.filter(Candidate.name.ilike(f"%{name}%"))
+            condition, similarity = text_search.contains(Candidate, "name", name, fuzzy)
+            query = query.where(condition)
+            if similarity is not None:
+                query = query.order_by(similarity.desc())
         
         # Filter by experience
         if min_experience is not None:
-            query = query.filter(Candidate.experience_years >= min_experience)
+            query = query.where(Candidate.experience_years >= min_experience)
         if max_experience is not None:
-            query = query.filter(Candidate.experience_years <= max_experience)
+            query = query.where(Candidate.experience_years <= max_experience)
         
         # Filter by skills
         if skills:
-            skill_list = [s.strip().lower() for s in skills.split(',')]
-            # This is a simple approach; for production, use PostgreSQL array operations
-            for skill in skill_list:
-                query = query.filter(Candidate.raw_text.ilike(f"%{skill}%"))
+            skill_list = skills.split(',')
+            query = query.where(skill_filter(Candidate, skill_list, match_all=skills_match == "all"))
         
-        candidates = query.limit(limit).all()
+        candidates = (await db.scalars(query.limit(limit))).all()
         logger.info(f"Found {len(candidates)} candidates matching search criteria")
         
         return candidates
@@ -66,59 +76,65 @@ async def search_jobs(
     title: Optional[str] = Query(None),
     company: Optional[str] = Query(None),
     skills: Optional[str] = Query(None, description="Comma-separated skills"),
+    skills_match: str = Query("all", pattern="^(all|any)$", description="Require all listed skills or any of them"),
     min_experience: Optional[float] = Query(None, ge=0),
     max_experience: Optional[float] = Query(None, ge=0),
     location: Optional[str] = Query(None),
     job_type: Optional[str] = Query(None),
     seniority_level: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, description="Full-text query over title, company and description; best matches first"),
+    fuzzy: bool = Query(False, description="Typo-tolerant title, company and location match (PostgreSQL with pg_trgm)"),
     limit: int = Query(default=50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Search and filter jobs
     """
     try:
-        query = db.query(Job)
-        
-        # Filter by title
-        if title:
-            query = query.filter(Job.title.ilike(f"%{title}%"))
+        query = select(Job)
+        text_search = get_text_search()
         
-        # Filter by company
-        if company:
-            query = query.filter(Job.company.ilike(f"%{company}%"))
+        # Full-text query, ordered by relevance
+        if q and q.strip():
+            query = text_search.match(query, Job, q)
         
-        # Filter by location
-        if location:
-            query = query.filter(Job.location.ilike(f"%{location}%"))
+        # Filter by title, company and location
+        similarities = []
+        for field, value in (("title", title), ("company", company), ("location", location)):
+            if value:
+                condition, similarity = text_search.contains(Job, field, value, fuzzy)
+                query = query.where(condition)
+                if similarity is not None:
+                    similarities.append(similarity)
+        if similarities:
+            query = query.order_by(sum(similarities).desc())
         
         # Filter by job type
         if job_type:
-            query = query.filter(Job.job_type == job_type)
+            query = query.where(Job.job_type == job_type)
         
         # Filter by seniority level
         if seniority_level:
-            query = query.filter(Job.seniority_level == seniority_level)
+            query = query.where(Job.seniority_level == seniority_level)
         
         # Filter by domain
         if domain:
-            query = query.filter(Job.domain == domain)
+            query = query.where(Job.domain == domain)
         
         # Filter by experience
         if min_experience is not None:
-            query = query.filter(Job.experience_required >= min_experience)
+            query = query.where(Job.experience_required >= min_experience)
         if max_experience is not None:
-            query = query.filter(Job.experience_required <= max_experience)
+            query = query.where(Job.experience_required <= max_experience)
         
         # Filter by skills
         if skills:
-            skill_list = [s.strip().lower() for s in skills.split(',')]
-            for skill in skill_list:
-                query = query.filter(Job.description.ilike(f"%{skill}%"))
+            skill_list = skills.split(',')
+            query = query.where(skill_filter(Job, skill_list, match_all=skills_match == "all"))
         
-        jobs = query.limit(limit).all()
+        jobs = (await db.scalars(query.limit(limit))).all()
         logger.info(f"Found {len(jobs)} jobs matching search criteria")
         
         return jobs
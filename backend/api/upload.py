@@ -2,7 +2,9 @@
 Upload API routes for resumes and job descriptions
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import BinaryIO
 import logging
 import os
 from pathlib import Path
@@ -11,7 +13,13 @@ import shutil
 from backend.database import get_db, Candidate, Job, Embedding, User
 from backend.api.schemas import CandidateResponse, JobResponse, JobCreate
 from backend.api.auth import get_current_user
-from backend.services import ResumeParser, JobParser, get_embedding_service
+from backend.services import (
+    ResumeParser, JobParser, get_embedding_batcher, get_embedding_cache, get_embedding_index
+)
+from backend.services.vector_index import JOB, CANDIDATE, entity_attributes
+from backend.services.embedding_cache import embedding_key
+from backend.services.encoders import encoder_name
+from backend.core.executor import run_blocking
 from backend.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -23,10 +31,17 @@ UPLOAD_DIR = Path("data/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _save_upload(source: BinaryIO, file_path: Path):
+    """Copy an uploaded file to disk"""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+
+
 @router.post("/resume", response_model=CandidateResponse, status_code=status.HTTP_201_CREATED)
 async def upload_resume(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -40,32 +55,33 @@ async def upload_resume(
                 detail="Only PDF and DOCX files are supported"
             )
         
-        # Save file
+        # Save file; disk I/O and parsing run off the event loop
         file_path = UPLOAD_DIR / f"{file.filename}"
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await run_blocking(_save_upload, file.file, file_path)
         
         logger.info(f"Resume file saved: {file_path}")
         
         # Parse resume
         parser = ResumeParser()
-        parsed_data = parser.parse_file(str(file_path))
+        parsed_data = await run_blocking(parser.parse_file, str(file_path))
         
         # Check if candidate already exists
         existing_candidate = None
         if parsed_data.get('email'):
-            existing_candidate = db.query(Candidate).filter(
-                Candidate.email == parsed_data['email']
-            ).first()
+            existing_candidate = await db.scalar(
+                select(Candidate).where(Candidate.email == parsed_data['email'])
+            )
         
+        previous_attributes = None
         if existing_candidate:
+            previous_attributes = entity_attributes(CANDIDATE, existing_candidate)
             # Update existing candidate
             for key, value in parsed_data.items():
                 if key != 'raw_text':  # Don't overwrite raw_text
                     setattr(existing_candidate, key, value)
             existing_candidate.file_path = str(file_path)
-            db.commit()
-            db.refresh(existing_candidate)
+            await db.commit()
+            await db.refresh(existing_candidate)
             candidate = existing_candidate
             logger.info(f"Updated existing candidate: {candidate.id}")
         else:
@@ -81,32 +97,44 @@ async def upload_resume(
                 file_path=str(file_path)
             )
             db.add(candidate)
-            db.commit()
-            db.refresh(candidate)
+            await db.commit()
+            await db.refresh(candidate)
             logger.info(f"Created new candidate: {candidate.id}")
         
-        # Generate embedding
-        embedding_service = get_embedding_service()
         embedding_text = f"{parsed_data['name']} {' '.join(parsed_data['skills'])} {parsed_data['education']}"
-        embedding_vector = embedding_service.generate_embedding(embedding_text)
+        text_hash = embedding_key(encoder_name(), embedding_text)
+        existing_embedding = await db.scalar(
+            select(Embedding).where(Embedding.candidate_id == candidate.id)
+        )
         
-        # Store embedding
-        existing_embedding = db.query(Embedding).filter(
-            Embedding.candidate_id == candidate.id
-        ).first()
+        # Re-upload of the same resume: the stored embedding and index row are current
+        if (existing_embedding and existing_embedding.text_hash == text_hash
+                and previous_attributes == entity_attributes(CANDIDATE, candidate)):
+            logger.info(f"Embedding unchanged for candidate: {candidate.id}")
+            return candidate
+        
+        # Generate embedding (served from the embedding cache if only attributes changed)
+        embedding_vector = await get_embedding_batcher().embed_async(embedding_text)
         
+        # Store embedding
         if existing_embedding:
-            existing_embedding.embedding_vector = embedding_vector
-            existing_embedding.model_name = settings.MODEL_NAME
-        else:
-            embedding = Embedding(
-                candidate_id=candidate.id,
-                embedding_vector=embedding_vector,
-                model_name=settings.MODEL_NAME
-            )
-            db.add(embedding)
+            # Replace instead of updating in place so the new row id moves
+            # past the index watermark of every worker
+            await db.delete(existing_embedding)
         
-        db.commit()
+        embedding = Embedding(
+            candidate_id=candidate.id,
+            embedding_vector=embedding_vector,
+            model_name=encoder_name(),
+            text_hash=text_hash
+        )
+        db.add(embedding)
+        
+        await db.commit()
+        await run_blocking(
+            get_embedding_index().upsert, CANDIDATE, candidate.id, embedding_vector,
+            entity_attributes(CANDIDATE, candidate), embedding_id=embedding.id
+        )
         logger.info(f"Embedding generated for candidate: {candidate.id}")
         
         return candidate
@@ -114,7 +142,7 @@ async def upload_resume(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error uploading resume: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,7 +153,7 @@ async def upload_resume(
 @router.post("/job", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
 async def upload_job(
     job_data: JobCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -134,7 +162,7 @@ async def upload_job(
     try:
         # Parse job description
         parser = JobParser()
-        parsed_data = parser.parse_job_description(job_data.dict())
+        parsed_data = await run_blocking(parser.parse_job_description, job_data.dict())
         
         # Create new job
         job = Job(
@@ -150,31 +178,46 @@ async def upload_job(
         )
         
         db.add(job)
-        db.commit()
-        db.refresh(job)
+        await db.commit()
+        await db.refresh(job)
         logger.info(f"Created new job: {job.id}")
         
         # Generate embedding
-        embedding_service = get_embedding_service()
         embedding_text = f"{parsed_data['title']} {parsed_data['description']} {' '.join(parsed_data['required_skills'])}"
-        embedding_vector = embedding_service.generate_embedding(embedding_text)
+        embedding_vector = await get_embedding_batcher().embed_async(embedding_text)
         
         # Store embedding
         embedding = Embedding(
             job_id=job.id,
             embedding_vector=embedding_vector,
-            model_name=settings.MODEL_NAME
+            model_name=encoder_name(),
+            text_hash=embedding_key(encoder_name(), embedding_text)
         )
         db.add(embedding)
-        db.commit()
+        await db.commit()
+        await run_blocking(
+            get_embedding_index().upsert, JOB, job.id, embedding_vector,
+            entity_attributes(JOB, job), embedding_id=embedding.id
+        )
         logger.info(f"Embedding generated for job: {job.id}")
         
         return job
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error uploading job: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing job: {str(e)}"
         )
+
+
+@router.get("/embedding/stats")
+async def get_embedding_stats(current_user: User = Depends(get_current_user)):
+    """
+    Get embedding batch size and latency histograms plus embedding cache counters
+    """
+    return {
+        "batcher": get_embedding_batcher().stats(),
+        "cache": get_embedding_cache().stats()
+    }
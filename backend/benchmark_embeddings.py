@@ -0,0 +1,126 @@
+"""
+Compare fp32 and dynamic int8 embedding throughput and drift on CPU
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import List
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.core.cpu import available_cpus, inference_threads
+from backend.services.encoders import SentenceTransformerEncoder
+from backend.services.nlp_service import NLPService
+from backend.services.vector_index import normalize_rows
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=512, help="Texts encoded per measurement")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE, help="Texts per encode call")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="torch intra-op threads; 0 = this process's share of the CPU budget")
+    parser.add_argument("--from-db", action="store_true",
+                        help="Use candidate resumes and job descriptions instead of synthetic texts")
+    parser.add_argument("--top-k", type=int, default=10, help="Neighbours compared for rank agreement")
+    return parser.parse_args()
+
+
+def synthetic_texts(count: int, rng: np.random.Generator) -> List[str]:
+    """Resume-like texts built from random skills, titles and years"""
+    skills = sorted(NLPService.COMMON_SKILLS)
+    titles = ["software engineer", "data scientist", "devops engineer", "frontend developer", "product analyst"]
+    texts = []
+    for _ in range(count):
+        chosen = rng.choice(skills, size=int(rng.integers(3, 12)), replace=False)
+        texts.append(
+            f"{rng.choice(titles)} with {int(rng.integers(1, 15))} years of experience in "
+            f"{', '.join(chosen)}. Built and operated production systems using {chosen[0]} and {chosen[-1]}."
+        )
+    return texts
+
+
+def database_texts(count: int) -> List[str]:
+    """Candidate resumes and job descriptions, repeated up to count"""
+    from backend.database import SessionLocal, Candidate, Job
+
+    db = SessionLocal()
+    try:
+        texts = [text for (text,) in db.query(Candidate.raw_text).limit(count) if text]
+        texts += [text for (text,) in db.query(Job.description).limit(count) if text]
+    finally:
+        db.close()
+    if not texts:
+        raise SystemExit("No candidate or job texts in the database")
+    return (texts * (count // len(texts) + 1))[:count]
+
+
+def measure(encoder: SentenceTransformerEncoder, texts: List[str], batch_size: int) -> dict:
+    """Embeddings and throughput of encoding texts in batches"""
+    encoder.encode(texts[:batch_size])  # warm up
+    started = time.perf_counter()
+    embeddings = np.concatenate([
+        encoder.encode(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)
+    ])
+    elapsed = time.perf_counter() - started
+    return {
+        'embeddings': normalize_rows(embeddings),
+        'texts_per_second': len(texts) / elapsed,
+        'ms_per_text': elapsed * 1000 / len(texts)
+    }
+
+
+def rank_agreement(reference: np.ndarray, candidate: np.ndarray, top_k: int) -> float:
+    """Mean overlap of each text's top_k nearest neighbours under both embeddings"""
+    top_k = min(top_k, len(reference) - 1)
+
+    def neighbours(embeddings):
+        scores = embeddings @ embeddings.T
+        np.fill_diagonal(scores, -np.inf)
+        return np.argpartition(-scores, top_k, axis=1)[:, :top_k]
+
+    expected, found = neighbours(reference), neighbours(candidate)
+    return float(np.mean([len(set(a) & set(b)) / top_k for a, b in zip(expected, found)]))
+
+
+def main():
+    """Encode the same texts with the fp32 and the int8 model and compare"""
+    args = parse_args()
+    texts = database_texts(args.texts) if args.from_db else synthetic_texts(args.texts, np.random.default_rng(0))
+    threads = args.threads or inference_threads()
+    logger.info(f"{len(texts)} texts, batch size {args.batch_size}, {threads} threads of {available_cpus()} CPUs")
+
+    results = {}
+    for quantize in (False, True):
+        encoder = SentenceTransformerEncoder(quantize=quantize, threads=threads)
+        results[quantize] = measure(encoder, texts, args.batch_size)
+        del encoder
+
+    fp32, int8 = results[False], results[True]
+    print(f"{'model':>6} {'texts/s':>9} {'ms/text':>9} {'speedup':>8}")
+    for label, result in (("fp32", fp32), ("int8", int8)):
+        print(
+            f"{label:>6} {result['texts_per_second']:>9.1f} {result['ms_per_text']:>9.2f} "
+            f"{result['texts_per_second'] / fp32['texts_per_second']:>8.2f}"
+        )
+
+    cosine = np.sum(fp32['embeddings'] * int8['embeddings'], axis=1)
+    print(
+        f"drift: cosine(fp32, int8) mean {cosine.mean():.4f}, min {cosine.min():.4f}; "
+        f"top-{args.top_k} neighbour agreement {rank_agreement(fp32['embeddings'], int8['embeddings'], args.top_k):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
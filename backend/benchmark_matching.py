@@ -0,0 +1,115 @@
+"""
+Measure how exact matching scales with the number of search shards
+"""
+import sys
+import os
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.services.vector_index import (
+    IndexPartition, JOB, CANDIDATE, NUMERIC_ATTRIBUTES, BITSET_ATTRIBUTES, normalize_rows
+)
+from backend.services.hybrid_ranking import SKILL_WORDS
+from backend.services.shard_pool import ShardPool
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kind", choices=[CANDIDATE, JOB], default=CANDIDATE, help="Partition searched")
+    parser.add_argument("--rows", type=int, default=200000, help="Synthetic entities in the partition")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per measurement")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--shards", default="2,4,8", help="Comma-separated shard counts to measure")
+    parser.add_argument("--concurrency", type=int, default=1, help="Queries in flight at once")
+    return parser.parse_args()
+
+
+def synthetic_partition(kind: str, rows: int, rng: np.random.Generator) -> IndexPartition:
+    """Partition of random unit vectors with random skills and experience"""
+    partition = IndexPartition(kind, settings.EMBEDDING_DIM)
+    attributes, vocabularies = {}, {}
+    for name in partition.attribute_names:
+        if name in BITSET_ATTRIBUTES:
+            attributes[name] = rng.integers(0, 2 ** 63, size=(rows, SKILL_WORDS), dtype=np.uint64)
+        elif name in NUMERIC_ATTRIBUTES:
+            attributes[name] = rng.uniform(0, 15, size=rows).astype(np.float32)
+        else:
+            attributes[name] = np.zeros(rows, dtype=np.int32)
+            vocabularies[name] = ["any"]
+    vectors = normalize_rows(rng.standard_normal((rows, settings.EMBEDDING_DIM), dtype=np.float32))
+    partition.load_arrays(np.arange(1, rows + 1), vectors, attributes, vocabularies)
+    return partition
+
+
+def measure(search, queries: np.ndarray, query_attributes: dict, top_k: int, concurrency: int) -> dict:
+    """Latency percentiles and throughput of running every query once"""
+    def timed(query):
+        started = time.perf_counter()
+        search(query, top_k, -1.0, query_attributes=query_attributes)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(timed, queries))) * 1000
+    elapsed = time.perf_counter() - started
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'qps': len(queries) / elapsed
+    }
+
+
+def main():
+    """Compare in-process search with each shard count on the same queries"""
+    args = parse_args()
+    rng = np.random.default_rng(0)
+
+    partition = synthetic_partition(args.kind, args.rows, rng)
+    queries = normalize_rows(rng.standard_normal((args.queries, settings.EMBEDDING_DIM), dtype=np.float32))
+    query_attributes = {
+        'skills': rng.integers(0, 2 ** 63, size=SKILL_WORDS, dtype=np.uint64),
+        'experience': 5.0
+    }
+    logger.info(f"{args.rows} {args.kind} rows, {args.queries} queries, {os.cpu_count()} CPUs")
+
+    baseline = measure(partition.search, queries, query_attributes, args.top_k, args.concurrency)
+    # One core in-process is the baseline each shard count is compared with
+    results = [("in-proc", 1, baseline)]
+    for shards in [int(value) for value in args.shards.split(",") if value.strip()]:
+        pool = ShardPool(shards=shards, min_rows=0)
+        try:
+            def search(query, top_k, min_similarity, query_attributes=None):
+                return pool.search(partition, query, top_k, min_similarity, query_attributes=query_attributes)
+
+            # Warm up: publish the shards and start every worker
+            measure(search, queries[:shards * 2], query_attributes, args.top_k, shards)
+            result = measure(search, queries, query_attributes, args.top_k, args.concurrency)
+            results.append((str(shards), shards, result))
+        finally:
+            pool.close()
+
+    print(f"{'shards':>7} {'p50 ms':>9} {'p95 ms':>9} {'qps':>9} {'speedup':>8} {'per core':>9}")
+    for label, shards, result in results:
+        speedup = result['qps'] / baseline['qps']
+        print(
+            f"{label:>7} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['qps']:>9.1f} "
+            f"{speedup:>8.2f} {speedup / shards:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
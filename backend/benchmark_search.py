@@ -0,0 +1,180 @@
+"""
+Latency of the /search text filters through their text search indexes and
+through the ILIKE scans they replaced.
+
+On PostgreSQL the ILIKE baseline drops the trigram and full-text indexes
+inside a transaction that is rolled back, which locks the tables
+meanwhile: run it against a seeded copy, not a serving database.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import insert, select, text
+
+from backend.database import engine, init_db, Candidate, Job
+from backend.database.migrations import TEXT_SEARCH_DOCUMENTS, TRIGRAM_COLUMNS
+from backend.services.text_search import TextSearch
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK = 5000
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Emma", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Luis"]
+TITLE_LEVELS = ["Junior", "Senior", "Lead", "Staff", "Principal"]
+TITLE_AREAS = ["Backend", "Frontend", "Data", "Machine Learning", "Platform", "Mobile", "Security", "Cloud", "QA"]
+TITLE_ROLES = ["Engineer", "Developer", "Scientist", "Analyst", "Architect", "Manager"]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Austin, TX", "Berlin, Germany", "London, UK", "Remote"]
+BASELINE_DROPPED = (
+    tuple(f"ix_{table}_search_vector" for table in TEXT_SEARCH_DOCUMENTS)
+    + tuple(f"ix_{table}_{column}_trgm" for table, columns in TRIGRAM_COLUMNS.items() for column in columns)
+)
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="First add this many synthetic jobs and candidates with generated text")
+    parser.add_argument("--repeat", type=int, default=20, help="Executions timed per query and path")
+    parser.add_argument("--limit", type=int, default=50, help="Rows fetched per query, as /search does")
+    return parser.parse_args()
+
+
+def _words(rng: np.random.Generator, count: int) -> List[str]:
+    """Random lower-case words of 4 to 10 letters"""
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return ["".join(rng.choice(letters, size=rng.integers(4, 11))) for _ in range(count)]
+
+
+def seed_synthetic(count: int, rng: np.random.Generator):
+    """Jobs and candidates with generated names, titles, companies and Zipf-distributed texts"""
+    vocabulary = np.array(_words(rng, 20000))
+    frequencies = 1.0 / np.arange(1, len(vocabulary) + 1)
+    frequencies /= frequencies.sum()
+    suffixes = rng.choice(["Inc", "Labs", "Group"], size=2000)
+    companies = [f"{word.title()} {suffix}" for word, suffix in zip(_words(rng, 2000), suffixes)]
+    surnames = [word.title() for word in _words(rng, 5000)]
+
+    def documents(size: int, words: int) -> List[str]:
+        return [" ".join(row) for row in rng.choice(vocabulary, size=(size, words), p=frequencies)]
+
+    with engine.begin() as conn:
+        for start in range(0, count, INSERT_CHUNK):
+            size = min(INSERT_CHUNK, count - start)
+            conn.execute(insert(Job.__table__), [{
+                'title': f"{rng.choice(TITLE_LEVELS)} {rng.choice(TITLE_AREAS)} {rng.choice(TITLE_ROLES)}",
+                'company': str(rng.choice(companies)),
+                'description': description,
+                'location': str(rng.choice(LOCATIONS)),
+                'experience_required': float(rng.integers(0, 10))
+            } for description in documents(size, 80)])
+            conn.execute(insert(Candidate.__table__), [{
+                'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(surnames)}",
+                'raw_text': raw_text,
+                'experience_years': float(rng.integers(0, 15))
+            } for raw_text in documents(size, 200)])
+    logger.info(f"Added {count} synthetic jobs and candidates")
+
+
+def sample_values(conn) -> Dict[str, str]:
+    """
+    Filter values taken from the rows halfway through each table; the
+    title word stands in for a missing company
+    """
+    job = conn.execute(text(
+        "SELECT title, company, location, description FROM jobs "
+        "WHERE id >= (SELECT (MIN(id) + MAX(id)) / 2 FROM jobs) ORDER BY id LIMIT 1"
+    )).first()
+    candidate = conn.execute(text(
+        "SELECT name, raw_text FROM candidates "
+        "WHERE id >= (SELECT (MIN(id) + MAX(id)) / 2 FROM candidates) ORDER BY id LIMIT 1"
+    )).first()
+    title_word = max(job[0].split(), key=len)
+    surname = candidate[0].split()[-1]
+    company = (job[1] or "").split()
+    return {
+        'title': title_word.lower(),
+        'company': company[0] if company else title_word,
+        'location': (job[2] or "").split(",")[0],
+        'name': surname[1:],  # a substring, not a prefix
+        'fuzzy_title': title_word[:3] + title_word[2:],  # one letter typed twice
+        'fuzzy_name': surname[:3] + surname[2:],
+        'job_terms': " ".join((job[3] or job[0]).split()[:2]),
+        'candidate_terms': " ".join((candidate[1] or candidate[0]).split()[:2])
+    }
+
+
+def queries(search: TextSearch, values: Dict[str, str]) -> Dict:
+    """Id queries of every text filter the /search endpoints offer"""
+    def filtered(model, field, value, fuzzy=False):
+        condition, similarity = search.contains(model, field, value, fuzzy)
+        query = select(model.id).where(condition)
+        return query.order_by(similarity.desc()) if similarity is not None else query
+
+    return {
+        f"candidate name ~ {values['name']!r}": filtered(Candidate, "name", values['name']),
+        f"candidate name fuzzy {values['fuzzy_name']!r}": filtered(Candidate, "name", values['fuzzy_name'], True),
+        f"candidate q {values['candidate_terms']!r}": search.match(select(Candidate.id), Candidate, values['candidate_terms']),
+        f"job title ~ {values['title']!r}": filtered(Job, "title", values['title']),
+        f"job title fuzzy {values['fuzzy_title']!r}": filtered(Job, "title", values['fuzzy_title'], True),
+        f"job company ~ {values['company']!r}": filtered(Job, "company", values['company']),
+        f"job location ~ {values['location']!r}": filtered(Job, "location", values['location']),
+        f"job q {values['job_terms']!r}": search.match(select(Job.id), Job, values['job_terms']),
+    }
+
+
+def measure(conn, query, repeat: int, limit: int) -> Dict:
+    """Mean latency and row count of a query"""
+    statement = query.limit(limit)
+    rows = len(conn.execute(statement).all())  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(statement).all()
+    return {'ms': (time.perf_counter() - started) * 1000 / repeat, 'rows': rows}
+
+
+def main():
+    """Seed if asked, then time every text filter through ILIKE and through the indexes"""
+    args = parse_args()
+    init_db()
+    if args.synthetic:
+        seed_synthetic(args.synthetic, np.random.default_rng(0))
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    indexed, baseline = TextSearch(), TextSearch(probe=False)
+    with engine.connect() as conn:
+        values = sample_values(conn)
+        counts = {table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in ("jobs", "candidates")}
+        after = {name: measure(conn, query, args.repeat, args.limit) for name, query in queries(indexed, values).items()}
+        conn.rollback()  # end the read transaction begun by the queries
+
+        transaction = conn.begin()
+        try:
+            if engine.dialect.name == "postgresql":
+                for name in BASELINE_DROPPED:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            before = [(name, measure(conn, query, args.repeat, args.limit))
+                      for name, query in queries(baseline, values).items()]
+        finally:
+            transaction.rollback()
+        results = [(name, result, after[name]) for name, result in before]
+
+    print(f"{engine.dialect.name}: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"{'query':<48} {'ILIKE ms':>9} {'rows':>5} {'index ms':>9} {'rows':>5} {'speedup':>8}")
+    for name, before, after in results:
+        print(f"{name:<48} {before['ms']:>9.2f} {before['rows']:>5} {after['ms']:>9.2f} {after['rows']:>5} "
+              f"{before['ms'] / after['ms']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
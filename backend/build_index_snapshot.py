@@ -0,0 +1,40 @@
+"""
+Build the embedding index from the database and publish an on-disk snapshot
+"""
+import sys
+from pathlib import Path
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backend.database import SessionLocal
+from backend.services.vector_index import EmbeddingIndex
+from backend.config import get_settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def main():
+    """Rebuild the index snapshot that API workers map at startup"""
+    if not settings.INDEX_SNAPSHOT_DIR:
+        logger.error("INDEX_SNAPSHOT_DIR is not set")
+        sys.exit(1)
+    
+    db = SessionLocal()
+    try:
+        index = EmbeddingIndex()
+        index.build(db)
+        path = index.save_snapshot(settings.INDEX_SNAPSHOT_DIR)
+        logger.info(f"Index snapshot written to {path}")
+    except Exception as e:
+        logger.error(f"Error building index snapshot: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,61 @@ class Settings(BaseSettings):
     HUGGINGFACE_API_TOKEN: str
     MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
     EMBEDDING_DIM: int = 384
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # sentence-transformers, or hashing (n-gram feature hashing, no model weights)
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"  # empty keeps cached embeddings in memory only
+    EMBEDDING_CACHE_SIZE: int = 10000  # embeddings kept in the in-process LRU
+    EMBEDDING_BATCH_SIZE: int = 32  # texts per coalesced encode call
+    EMBEDDING_BATCH_WAIT_MS: float = 5.0  # max time a queued text waits for others to join its batch
+    EMBEDDING_SERVER_URL: str = ""  # http://host:port or unix:///path.sock of embedding_server.py; empty loads the model in-process
+    EMBEDDING_SERVER_TIMEOUT_SECONDS: float = 30.0
+    EMBEDDING_QUANTIZE: bool = False  # dynamic int8 quantization of the model's linear layers (CPU inference)
+    INFERENCE_WORKERS: int = 0  # processes encoding on this host; 0 = WEB_CONCURRENCY or 1
+    TORCH_THREADS: int = 0  # intra-op threads per process; 0 = available CPUs (affinity, cgroup quota) / INFERENCE_WORKERS
+    TORCH_INTEROP_THREADS: int = 1
+    STARTUP_WARMUP: bool = True  # load the model, warm it up and build the index in the background at startup (see /api/ready)
+    EMBEDDING_WARMUP_BATCHES: int = 2
+    
+    # Matching / vector search
+    MATCH_SEARCH_MODE: str = "exact"  # exact, ivf, int8, pq
+    ANN_MIN_ROWS: int = 10000  # smaller partitions are always scanned exactly
+    IVF_NLIST: int = 0  # 0 = auto (~4 * sqrt(rows))
+    IVF_NPROBE: int = 8
+    IVF_TRAIN_ITERATIONS: int = 10
+    QUANT_RESCORE_FACTOR: int = 10  # int8/pq modes rescore top_k * factor rows on float32
+    QUANT_TRAIN_SAMPLE: int = 10000
+    PQ_SUBVECTORS: int = 96  # bytes per vector in pq mode; must divide EMBEDDING_DIM
+    INDEX_COMPACTION_THRESHOLD: float = 0.2  # tombstoned fraction that triggers compaction
+    INDEX_COMPACTION_MIN_TOMBSTONES: int = 1000
+    MATCH_BATCH_BLOCK_MB: int = 256  # score matrix budget per batch block
+    PRECOMPUTE_MEMORY_MB: int = 512  # score block budget for precompute_matches.py
+    INDEX_SNAPSHOT_DIR: str = "data/index"  # empty disables snapshots
+    INDEX_SYNC_INTERVAL_SECONDS: float = 5.0
+    INDEX_SYNC_GAP_SECONDS: float = 300.0  # how long ids skipped by the sync watermark are re-checked
+    INDEX_SYNC_MAX_GAPS: int = 500  # skipped ids tracked at most (the highest are kept)
+    MATCH_WRITE_FLUSH_SECONDS: float = 1.0  # write-behind flush interval for match results
+    MATCH_WRITE_BATCH_SIZE: int = 500  # pending rows that trigger an early flush
+    MATCH_WRITE_MAX_PENDING: int = 100000  # rows kept for retry after failed flushes
+    MATCH_CACHE_SIZE: int = 2048  # cached match lists; 0 disables the cache
+    MATCH_CACHE_TTL_SECONDS: float = 300.0
+    MATCH_WEIGHT_SEMANTIC: float = 0.7  # ranking weights; min_similarity still applies to cosine
+    MATCH_WEIGHT_SKILLS: float = 0.2
+    MATCH_WEIGHT_EXPERIENCE: float = 0.1
+    MATCH_SHARDS: int = 0  # worker processes for exact search; 0 or 1 searches in-process
+    MATCH_SHARD_MIN_ROWS: int = 50000  # smaller partitions are searched in-process
+    MATCH_SHARD_REFRESH_SECONDS: float = 30.0  # max age of shard copies while the index changes
+    MATCHER_SHARD_INDEX: int = 0  # this node indexes ids with id % MATCHER_SHARD_COUNT == index
+    MATCHER_SHARD_COUNT: int = 1
+    MATCH_NODE_URLS: str = ""  # comma-separated matcher node base URLs, in shard order; set on the coordinator
+    MATCH_NODE_TIMEOUT_SECONDS: float = 2.0  # per-node deadline; slower nodes are left out of the results
+    VECTOR_BACKEND: str = "numpy"  # numpy (in-memory index), or pgvector (PostgreSQL vector column, in-database top-k)
+    PGVECTOR_INDEX: str = "hnsw"  # hnsw or ivfflat, built per partition (jobs / candidates)
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_EF_SEARCH: int = 100  # hnsw.ef_search; raised to the number of fetched rows when lower
+    PGVECTOR_IVFFLAT_LISTS: int = 100
+    PGVECTOR_IVFFLAT_PROBES: int = 10
+    PGVECTOR_RERANK_FACTOR: int = 5  # fetch top_k * factor rows by cosine, then order them by match_score
+    BLOCKING_WORKERS: int = 0  # threads for CPU-heavy and sync DB work of async routes; 0 = CPUs + 4 (max 32)
     
     # Authentication
     JWT_SECRET_KEY: str
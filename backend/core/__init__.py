@@ -1,6 +1,9 @@
 """Core utilities package"""
 from .security import create_access_token, verify_password, get_password_hash, decode_access_token
 from .logging_config import setup_logging, get_correlation_id, set_correlation_id
+from .executor import BlockingExecutor, get_blocking_executor, run_blocking, run_in_session
+from .cpu import available_cpus, inference_threads
+from .readiness import Readiness, get_readiness
 
 __all__ = [
     "create_access_token",
@@ -9,5 +12,13 @@ __all__ = [
     "decode_access_token",
     "setup_logging",
     "get_correlation_id",
-    "set_correlation_id"
+    "set_correlation_id",
+    "BlockingExecutor",
+    "get_blocking_executor",
+    "run_blocking",
+    "run_in_session",
+    "available_cpus",
+    "inference_threads",
+    "Readiness",
+    "get_readiness"
 ]
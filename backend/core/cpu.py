@@ -0,0 +1,57 @@
+"""
+CPU budget of this process under CPU affinity and cgroup quotas
+"""
+import os
+from pathlib import Path
+from typing import Optional
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """CPUs granted by the cgroup CPU quota (v2 cpu.max or v1 CFS), None when unlimited"""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for directory in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+        try:
+            quota = int(Path(directory, "cpu.cfs_quota_us").read_text())
+            period = int(Path(directory, "cpu.cfs_period_us").read_text())
+            return quota / period if quota > 0 and period > 0 else None
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on: its affinity mask, capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        # A fractional quota is rounded down: an extra thread would only be throttled
+        cpus = min(cpus, int(quota))
+    return max(1, cpus)
+
+
+def inference_workers() -> int:
+    """Processes running model inference on this host (INFERENCE_WORKERS, else uvicorn's WEB_CONCURRENCY)"""
+    if settings.INFERENCE_WORKERS:
+        return settings.INFERENCE_WORKERS
+    try:
+        return max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+def inference_threads(workers: Optional[int] = None) -> int:
+    """Intra-op threads per process so that all inference workers together fit the CPU budget"""
+    if settings.TORCH_THREADS:
+        return settings.TORCH_THREADS
+    return max(1, available_cpus() // (workers or inference_workers()))
@@ -0,0 +1,84 @@
+"""
+Bounded thread pool for blocking work called from async route handlers
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Callable, Dict, TypeVar
+
+from backend.config import get_settings
+from backend.database.connection import SessionLocal
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """
+    Runs CPU-heavy calls (NumPy search, model inference, password hashing)
+    and sync SQLAlchemy work on a fixed number of threads. Callers beyond
+    the thread count wait on a semaphore, so the event loop keeps serving
+    any number of other requests while they queue.
+    """
+
+    def __init__(self, workers: int = settings.BLOCKING_WORKERS):
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="blocking")
+        self._slots = asyncio.Semaphore(self.workers)
+        self._lock = threading.Lock()
+        self._counters = {'running': 0, 'waiting': 0, 'completed': 0}
+
+    def _count(self, name: str, delta: int):
+        with self._lock:
+            self._counters[name] += delta
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Await fn(*args, **kwargs) on a worker thread, keeping the caller's context (correlation id)"""
+        self._count('waiting', 1)
+        async with self._slots:
+            self._count('waiting', -1)
+            self._count('running', 1)
+            try:
+                context = contextvars.copy_context()
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._pool, context.run, partial(fn, *args, **kwargs)
+                )
+            finally:
+                self._count('running', -1)
+                self._count('completed', 1)
+
+    async def run_in_session(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Await fn(db, *args, **kwargs) on a worker thread with its own sync session"""
+        def call():
+            with SessionLocal() as db:
+                return fn(db, *args, **kwargs)
+        return await self.run(call)
+
+    def stats(self) -> Dict:
+        """Thread count and running/waiting/completed call counters"""
+        with self._lock:
+            return dict(self._counters, workers=self.workers)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+# Singleton instance
+@lru_cache()
+def get_blocking_executor() -> BlockingExecutor:
+    """Get singleton blocking executor instance"""
+    return BlockingExecutor()
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call on the shared executor"""
+    return await get_blocking_executor().run(fn, *args, **kwargs)
+
+
+async def run_in_session(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call taking a sync session as first argument on the shared executor"""
+    return await get_blocking_executor().run_in_session(fn, *args, **kwargs)
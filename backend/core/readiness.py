@@ -0,0 +1,67 @@
+"""
+Startup steps that gate readiness, with their state and duration
+"""
+import logging
+import time
+from functools import lru_cache
+from typing import Awaitable, Dict
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class Readiness:
+    """
+    Named startup steps (model load, warm-up, index build). The app is
+    ready once every registered step is done; a failed step keeps it
+    unready and reports the error.
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Dict] = {}
+        self._started = time.perf_counter()
+
+    def register(self, *names: str):
+        """Declare steps before they run, so readiness waits for them"""
+        for name in names:
+            self._steps[name] = {'status': PENDING, 'seconds': None}
+
+    async def run_step(self, name: str, step: Awaitable):
+        """Await one step, recording its outcome and wall time; errors are re-raised"""
+        state = self._steps.setdefault(name, {'status': PENDING, 'seconds': None})
+        state['status'] = RUNNING
+        started = time.perf_counter()
+        try:
+            await step
+        except BaseException as e:
+            state.update(status=FAILED, seconds=round(time.perf_counter() - started, 3), error=str(e) or type(e).__name__)
+            logger.error(f"Startup step {name} failed: {state['error']}")
+            raise
+        state.update(status=DONE, seconds=round(time.perf_counter() - started, 3))
+        logger.info(f"Startup step {name} done in {state['seconds']}s")
+
+    @property
+    def ready(self) -> bool:
+        return all(state['status'] == DONE for state in self._steps.values())
+
+    def report(self) -> Dict:
+        """Overall status plus per-step status and seconds"""
+        if self.ready:
+            status = "ready"
+        elif any(state['status'] == FAILED for state in self._steps.values()):
+            status = "failed"
+        else:
+            status = "starting"
+        return {
+            'status': status,
+            'uptime_seconds': round(time.perf_counter() - self._started, 3),
+            'steps': {name: dict(state) for name, state in self._steps.items()}
+        }
+
+
+# Singleton instance
+@lru_cache()
+def get_readiness() -> Readiness:
+    """Get singleton readiness instance"""
+    return Readiness()
@@ -1,10 +1,13 @@
 """Database package"""
-from .connection import engine, SessionLocal, get_db, init_db
-from .models import Base, User, Candidate, Job, Embedding, MatchResult
+from .connection import engine, SessionLocal, async_engine, AsyncSessionLocal, get_db, init_db
+from .models import Base, User, Candidate, Job, Embedding, MatchResult, Skill, CandidateSkill, JobSkill
+from .skills import normalize_skill, skill_filter
 
 __all__ = [
     "engine",
     "SessionLocal",
+    "async_engine",
+    "AsyncSessionLocal",
     "get_db",
     "init_db",
     "Base",
@@ -12,5 +15,10 @@ __all__ = [
     "Candidate",
     "Job",
     "Embedding",
-    "MatchResult"
+    "MatchResult",
+    "Skill",
+    "CandidateSkill",
+    "JobSkill",
+    "normalize_skill",
+    "skill_filter"
 ]
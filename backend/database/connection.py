@@ -1,11 +1,13 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
-from typing import Generator
+from typing import AsyncIterator
 import logging
 
 from backend.config import get_settings
@@ -13,7 +15,26 @@ from backend.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Create async-compatible engine with connection pooling
+
+def async_database_url(url: str) -> URL:
+    """
+    Async driver URL for a DATABASE_URL: asyncpg for PostgreSQL, aiosqlite for SQLite
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        query = dict(url.query)
+        # asyncpg takes `ssl` instead of libpq's `sslmode` and has no channel_binding
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+# Sync engine for scripts, migrations and blocking work run off the event loop
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -22,20 +43,40 @@ engine = create_engine(
     echo=settings.DEBUG
 )
 
+if engine.dialect.name == "sqlite":
+    # pysqlite only opens transactions before DML, so DDL (migrations) would
+    # autocommit; hand transaction control to SQLAlchemy instead
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_sqlite_transaction(conn):
+        conn.exec_driver_sql("BEGIN")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers; aiosqlite connections are not pooled
+_async_url = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **({} if _async_url.get_backend_name() == "sqlite" else {'pool_size': 10, 'max_overflow': 20})
+)
+
+# Objects stay usable after commit; attributes are never lazy-loaded in async code
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db() -> Generator:
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
-    Dependency for getting database session
+    Dependency for getting an async database session
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
@@ -43,9 +84,16 @@ def init_db():
     Initialize database tables
     """
     from backend.database.models import Base
+    from backend.database.migrations import run_migrations
+    from backend.database.types import uses_pgvector
     try:
+        if uses_pgvector(engine.dialect):
+            # New tables declare their embedding column as vector(dim)
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
+        run_migrations(engine)
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
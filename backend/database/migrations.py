@@ -0,0 +1,437 @@
+"""
+Versioned schema upgrades for databases created by older releases.
+Applied versions are recorded in schema_migrations; every step is also
+safe to re-run, so databases from before the version table upgrade cleanly.
+"""
+import json
+import sqlite3
+import time
+
+import numpy as np
+from sqlalchemy import text, inspect, select, LargeBinary
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+import logging
+
+from backend.config import get_settings
+from backend.database.types import Float32Vector, uses_pgvector, vector_literal, parse_vector_literal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+VECTOR_CONVERT_BATCH = 1000  # embeddings rewritten per UPDATE batch
+DEDUPLICATE_BATCH = 10000  # match_results ids checked for duplicates per DELETE
+SKILL_BACKFILL_BATCH = 1000  # candidates/jobs linked to their skills per batch
+MIGRATION_LOCK_KEY = 0x6A6F626D61746368  # pg_advisory_xact_lock key serializing workers that start together
+
+# Indexes behind the hot lookups: latest embedding of an entity, stored
+# matches of a job and the job search filters (declared on the models)
+HOT_LOOKUP_INDEXES = (
+    "ix_embeddings_candidate_latest",
+    "ix_embeddings_job_latest",
+    "ix_match_results_job_score",
+    "ix_jobs_job_type",
+    "ix_jobs_seniority_level",
+    "ix_jobs_domain",
+)
+
+# Full-text documents: (column, weight) per table. PostgreSQL keeps them in
+# a generated `search_vector` column, SQLite in a `<table>_fts` FTS5 table
+TEXT_SEARCH_DOCUMENTS = {
+    "candidates": (("name", "A"), ("raw_text", "B")),
+    "jobs": (("title", "A"), ("company", "B"), ("description", "C")),
+}
+TEXT_SEARCH_CONFIG = "english"  # PostgreSQL text search configuration (stemming, stop words)
+TEXT_SEARCH_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}  # ts_rank defaults, reused as SQLite bm25 column weights
+# Columns of the substring/fuzzy filters: pg_trgm GIN indexes, or `<table>_trgm` FTS5 trigram tables
+TRIGRAM_COLUMNS = {
+    "candidates": ("name",),
+    "jobs": ("title", "company", "location"),
+}
+SQLITE_TRIGRAM_VERSION = (3, 34, 0)  # first SQLite release with the FTS5 trigram tokenizer
+
+
+def _has_index(conn, table: str, name: str) -> bool:
+    return any(index['name'] == name for index in inspect(conn).get_indexes(table))
+
+
+def _has_column(conn, table: str, name: str) -> bool:
+    if conn.dialect.name == "postgresql":
+        # inspect() warns about extension column types such as vector
+        return conn.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :name"
+        ), {'table': table, 'name': name}).first() is not None
+    return any(column['name'] == name for column in inspect(conn).get_columns(table))
+
+
+def add_match_results_unique_index(conn):
+    """
+    Unique (candidate_id, job_id) index used by match result upserts.
+    Existing duplicates are collapsed to the newest row first, walking the
+    table in id ranges of DEDUPLICATE_BATCH with a temporary pair index.
+    """
+    if _has_index(conn, "match_results", "uq_match_results_candidate_job"):
+        return
+    
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS tmp_match_results_pair ON match_results (candidate_id, job_id, id)"
+    ))
+    max_id = conn.execute(text("SELECT MAX(id) FROM match_results")).scalar() or 0
+    removed = 0
+    for start in range(0, max_id + 1, DEDUPLICATE_BATCH):
+        result = conn.execute(text(
+            "DELETE FROM match_results WHERE id >= :start AND id < :end AND EXISTS ("
+            "SELECT 1 FROM match_results newer WHERE newer.candidate_id = match_results.candidate_id "
+            "AND newer.job_id = match_results.job_id AND newer.id > match_results.id)"
+        ), {'start': start, 'end': start + DEDUPLICATE_BATCH})
+        removed += result.rowcount
+    if removed:
+        logger.info(f"Removed {removed} duplicate match results")
+    conn.execute(text("DROP INDEX tmp_match_results_pair"))
+    
+    conn.execute(text(
+        "CREATE UNIQUE INDEX uq_match_results_candidate_job "
+        "ON match_results (candidate_id, job_id)"
+    ))
+
+
+def add_embedding_text_hash(conn):
+    """
+    Hash of the text each embedding was computed from, so unchanged
+    re-uploads skip encoding. Older rows stay NULL and re-encode once.
+    """
+    if _has_column(conn, "embeddings", "text_hash"):
+        return
+    
+    conn.execute(text("ALTER TABLE embeddings ADD COLUMN text_hash VARCHAR(64)"))
+
+
+def _column_type(conn, table: str, name: str) -> str:
+    """Lower-case type name of a column as the database reports it (json, bytea, vector, blob, ...)"""
+    if conn.dialect.name == "postgresql":
+        # information_schema also names extension types such as vector, which inspect() cannot reflect
+        return conn.execute(text(
+            "SELECT udt_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :name"
+        ), {'table': table, 'name': name}).scalar_one().lower()
+    column = next(column for column in inspect(conn).get_columns(table) if column['name'] == name)
+    return str(column['type']).lower()
+
+
+def _rewrite_embedding_vectors(conn, column_type: str, convert, source: str = "embedding_vector",
+                               target: str = ":vector") -> int:
+    """
+    Copy embedding_vector into a new `column_type` column in id-ordered
+    batches of VECTOR_CONVERT_BATCH rows, passing each `source` value through
+    `convert` and binding it as `target`, then swap the columns. Runs in the
+    migration's transaction, so a failure leaves the old column intact.
+    """
+    conn.execute(text(f"ALTER TABLE embeddings ADD COLUMN embedding_vector_new {column_type}"))
+    converted, last_id = 0, 0
+    while True:
+        rows = conn.execute(text(
+            f"SELECT id, {source} FROM embeddings WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': VECTOR_CONVERT_BATCH}).all()
+        if not rows:
+            break
+        conn.execute(
+            text(f"UPDATE embeddings SET embedding_vector_new = {target} WHERE id = :id"),
+            [{'id': row_id, 'vector': convert(row_id, value)} for row_id, value in rows]
+        )
+        converted += len(rows)
+        last_id = rows[-1][0]
+    
+    conn.execute(text("ALTER TABLE embeddings DROP COLUMN embedding_vector"))
+    conn.execute(text("ALTER TABLE embeddings RENAME COLUMN embedding_vector_new TO embedding_vector"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE embeddings ALTER COLUMN embedding_vector SET NOT NULL"))
+    return converted
+
+
+def _float32_bytes(vector) -> bytes:
+    return np.asarray(vector, dtype=Float32Vector.DTYPE).tobytes()
+
+
+def convert_embedding_vectors_to_binary(conn):
+    """
+    Replace the JSON embedding_vector column with float32 bytes
+    """
+    if _column_type(conn, "embeddings", "embedding_vector") not in ("json", "jsonb"):
+        return
+    
+    def convert(row_id, value):
+        # Drivers return JSON columns either parsed or as text
+        return _float32_bytes(json.loads(value) if isinstance(value, (str, bytes)) else value)
+    
+    blob_type = LargeBinary().compile(dialect=conn.dialect)
+    converted = _rewrite_embedding_vectors(conn, blob_type, convert)
+    logger.info(f"Converted {converted} embeddings from JSON to float32")
+
+
+def switch_embedding_vector_storage(conn):
+    """
+    On PostgreSQL, keep embedding_vector as pgvector vector(EMBEDDING_DIM)
+    while VECTOR_BACKEND=pgvector and as bytea otherwise, converting existing
+    rows when the setting changes
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    current = _column_type(conn, "embeddings", "embedding_vector")
+    
+    if uses_pgvector(conn.dialect) and current == "bytea":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        dim = settings.EMBEDDING_DIM
+        
+        def convert(row_id, value):
+            vector = np.frombuffer(value, dtype=Float32Vector.DTYPE)
+            if len(vector) != dim:
+                raise ValueError(
+                    f"Embedding {row_id} has {len(vector)} dimensions, expected {dim}; "
+                    f"re-encode or delete it before enabling pgvector"
+                )
+            return vector_literal(vector)
+        
+        converted = _rewrite_embedding_vectors(conn, f"vector({dim})", convert, target="CAST(:vector AS vector)")
+        logger.info(f"Moved {converted} embeddings to a pgvector column")
+    elif not uses_pgvector(conn.dialect) and current == "vector":
+        converted = _rewrite_embedding_vectors(
+            conn, "bytea", lambda row_id, value: _float32_bytes(parse_vector_literal(value)),
+            source="embedding_vector::text"
+        )
+        logger.info(f"Moved {converted} embeddings from pgvector back to float32 bytes")
+
+
+def add_pgvector_indexes(conn):
+    """
+    Partial HNSW or IVFFlat cosine index per partition (job and candidate
+    embeddings), so an index scan for jobs never walks candidate vectors.
+    Indexes of the other method are dropped when PGVECTOR_INDEX changes.
+    """
+    if not uses_pgvector(conn.dialect):
+        return
+    method = settings.PGVECTOR_INDEX
+    if method == "hnsw":
+        options = f"m = {settings.PGVECTOR_HNSW_M}, ef_construction = {settings.PGVECTOR_HNSW_EF_CONSTRUCTION}"
+    elif method == "ivfflat":
+        options = f"lists = {settings.PGVECTOR_IVFFLAT_LISTS}"
+    else:
+        raise ValueError(f"Unknown PGVECTOR_INDEX: {method}")
+    
+    existing = set(conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'embeddings'"
+    )).scalars())
+    for column in ("job_id", "candidate_id"):
+        partition = column[:-3]
+        for other in {"hnsw", "ivfflat"} - {method}:
+            if f"ix_embeddings_{partition}_vector_{other}" in existing:
+                conn.execute(text(f"DROP INDEX ix_embeddings_{partition}_vector_{other}"))
+        name = f"ix_embeddings_{partition}_vector_{method}"
+        if name in existing:
+            continue
+        started = time.perf_counter()
+        conn.execute(text(
+            f"CREATE INDEX {name} ON embeddings USING {method} (embedding_vector vector_cosine_ops) "
+            f"WITH ({options}) WHERE {column} IS NOT NULL"
+        ))
+        logger.info(f"Built {name} in {time.perf_counter() - started:.1f}s")
+
+
+def add_hot_lookup_indexes(conn):
+    """
+    Composite and partial indexes of HOT_LOOKUP_INDEXES, created from
+    their model declarations
+    """
+    from backend.database.models import Base
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in HOT_LOOKUP_INDEXES:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def backfill_skill_links(conn):
+    """
+    candidate_skills/job_skills rows of existing candidates and jobs; new
+    rows are linked on flush (see backend.database.skills)
+    """
+    from backend.database.models import Candidate, Job
+    from backend.database.skills import SKILL_LINKS, replace_skill_links
+    
+    for model, (_, _, skills_attribute) in SKILL_LINKS.items():
+        skills_column = getattr(model, skills_attribute)
+        linked, last_id = 0, 0
+        while True:
+            rows = conn.execute(
+                select(model.id, skills_column).where(model.id > last_id)
+                .order_by(model.id).limit(SKILL_BACKFILL_BATCH)
+            ).all()
+            if not rows:
+                break
+            replace_skill_links(conn, model, {entity_id: skills for entity_id, skills in rows})
+            linked += len(rows)
+            last_id = rows[-1][0]
+        if linked:
+            logger.info(f"Linked skills of {linked} {model.__tablename__}")
+
+
+def _sqlite_fts_table(conn, name: str, table: str, columns, tokenize: str) -> bool:
+    """
+    External-content FTS5 table over some columns of `table`, kept in sync
+    by triggers; False if it already existed
+    """
+    if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {'name': name}).first():
+        return False
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {name} USING fts5({names}, content='{table}', content_rowid='id', "
+        f"tokenize='{tokenize}')"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER {name}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER {name}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {names}) VALUES ('delete', old.id, {old}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER {name}_update AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END"
+    ))
+    started = time.perf_counter()
+    conn.execute(text(f"INSERT INTO {name}({name}) VALUES ('rebuild')"))
+    logger.info(f"Built {name} in {time.perf_counter() - started:.1f}s")
+    return True
+
+
+def add_full_text_search(conn):
+    """
+    Weighted full-text documents of TEXT_SEARCH_DOCUMENTS: a generated
+    tsvector column with a GIN index (PostgreSQL; adding it rewrites the
+    table once) or an FTS5 table ranked by bm25 (SQLite)
+    """
+    for table, document in TEXT_SEARCH_DOCUMENTS.items():
+        if conn.dialect.name == "postgresql":
+            vector = " || ".join(
+                f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+                for column, weight in document
+            )
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)"))
+        elif conn.dialect.name == "sqlite":
+            name = f"{table}_fts"
+            _sqlite_fts_table(conn, name, table, [column for column, _ in document], "porter unicode61")
+            weights = ", ".join(str(TEXT_SEARCH_WEIGHTS[weight]) for _, weight in document)
+            conn.execute(text(f"INSERT INTO {name}({name}, rank) VALUES ('rank', 'bm25({weights})')"))
+
+
+def add_trigram_indexes(conn):
+    """
+    Indexes of the TRIGRAM_COLUMNS substring filters, where the server
+    supports them: pg_trgm GIN indexes, or FTS5 trigram tables on SQLite
+    3.34+. Checked on every start, so installing pg_trgm later adds them.
+    """
+    if conn.dialect.name == "postgresql":
+        installed = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+        if not installed:
+            if not conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+                logger.warning("pg_trgm is not available: substring filters of /search scan their tables")
+                return
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for table, columns in TRIGRAM_COLUMNS.items():
+            for column in columns:
+                name = f"ix_{table}_{column}_trgm"
+                if _has_index(conn, table, name):
+                    continue
+                started = time.perf_counter()
+                conn.execute(text(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)"))
+                logger.info(f"Built {name} in {time.perf_counter() - started:.1f}s")
+    elif conn.dialect.name == "sqlite":
+        if sqlite3.sqlite_version_info < SQLITE_TRIGRAM_VERSION:
+            logger.warning(f"SQLite {sqlite3.sqlite_version} has no trigram tokenizer: "
+                           f"substring filters of /search scan their tables")
+            return
+        for table, columns in TRIGRAM_COLUMNS.items():
+            _sqlite_fts_table(conn, f"{table}_trgm", table, columns, "trigram")
+
+
+# Version N is MIGRATIONS[N - 1]: append new steps, never reorder
+MIGRATIONS = [
+    add_match_results_unique_index,
+    add_embedding_text_hash,
+    convert_embedding_vectors_to_binary,
+    add_hot_lookup_indexes,
+    backfill_skill_links,
+    add_full_text_search,
+]
+
+# Steps that follow settings (VECTOR_BACKEND, PGVECTOR_INDEX) or server
+# capabilities rather than a version, so they are checked on every start
+SETTINGS_MIGRATIONS = [
+    switch_embedding_vector_storage,
+    add_pgvector_indexes,
+    add_trigram_indexes,
+]
+
+
+def _lock(conn):
+    """Serialize migrations of workers starting together (PostgreSQL; SQLite serializes writers itself)"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+
+
+def applied_versions(conn) -> dict:
+    """Recorded migration versions and their names"""
+    return dict(conn.execute(text("SELECT version, name FROM schema_migrations")).all())
+
+
+def run_migrations(engine: Engine):
+    """
+    Apply the MIGRATIONS missing from schema_migrations, each in one
+    transaction with its version row, then the SETTINGS_MIGRATIONS
+    """
+    with engine.begin() as conn:
+        # Concurrent CREATE TABLE IF NOT EXISTS can still collide on PostgreSQL
+        _lock(conn)
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        applied = applied_versions(conn)
+    
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if version in applied:
+            continue
+        try:
+            with engine.begin() as conn:
+                _lock(conn)
+                # Another worker may have applied it while this one waited for the lock
+                if conn.execute(text("SELECT 1 FROM schema_migrations WHERE version = :version"),
+                                {'version': version}).first():
+                    continue
+                started = time.perf_counter()
+                migration(conn)
+                conn.execute(text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                             {'version': version, 'name': migration.__name__})
+            logger.info(f"Applied migration {version} {migration.__name__} in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Migration {version} {migration.__name__} failed: {e}")
+            raise
+    
+    for migration in SETTINGS_MIGRATIONS:
+        try:
+            with engine.begin() as conn:
+                _lock(conn)
+                migration(conn)
+        except Exception as e:
+            logger.error(f"Migration {migration.__name__} failed: {e}")
+            raise
+    logger.info(f"Database schema at version {len(MIGRATIONS)}")
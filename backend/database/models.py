@@ -1,10 +1,11 @@
 """
 SQLAlchemy ORM models for PostgreSQL
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database.connection import Base
+from backend.database.types import Float32Vector
 
 
 class User(Base):
@@ -53,9 +54,9 @@ class Job(Base):
     required_skills = Column(JSON)  # List of required skills
     experience_required = Column(Float)  # Years of experience
     location = Column(String(255))
-    job_type = Column(String(50))  # full-time, part-time, contract
-    seniority_level = Column(String(50))  # junior, mid, senior, lead
-    domain = Column(String(100))  # tech, finance, healthcare, etc.
+    job_type = Column(String(50), index=True)  # full-time, part-time, contract
+    seniority_level = Column(String(50), index=True)  # junior, mid, senior, lead
+    domain = Column(String(100), index=True)  # tech, finance, healthcare, etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -71,13 +72,55 @@ class Embedding(Base):
     id = Column(Integer, primary_key=True, index=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=True)
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=True)
-    embedding_vector = Column(JSON, nullable=False)  # Store as JSON array
+    embedding_vector = Column(Float32Vector, nullable=False)  # float32 bytes, read as a NumPy array
     model_name = Column(String(255))
+    text_hash = Column(String(64))  # embedding_key of the encoded text
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     candidate = relationship("Candidate", back_populates="embeddings")
     job = relationship("Job", back_populates="embeddings")
+    
+    __table_args__ = (
+        # Latest embedding of an entity: index seek plus a backward scan of its ids
+        Index("ix_embeddings_candidate_latest", candidate_id, id,
+              postgresql_where=candidate_id.isnot(None), sqlite_where=candidate_id.isnot(None)),
+        Index("ix_embeddings_job_latest", job_id, id,
+              postgresql_where=job_id.isnot(None), sqlite_where=job_id.isnot(None)),
+    )
+
+
+class Skill(Base):
+    """Normalized skill names (see backend.database.skills.normalize_skill)"""
+    __tablename__ = "skills"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, index=True, nullable=False)
+
+
+class CandidateSkill(Base):
+    """Candidate.skills as rows, maintained on every flush of a candidate"""
+    __tablename__ = "candidate_skills"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    
+    __table_args__ = (
+        # Posting list of a skill
+        Index("ix_candidate_skills_skill", "skill_id", "candidate_id"),
+    )
+
+
+class JobSkill(Base):
+    """Job.required_skills as rows, maintained on every flush of a job"""
+    __tablename__ = "job_skills"
+    
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_job_skills_skill", "skill_id", "job_id"),
+    )
 
 
 class MatchResult(Base):
@@ -94,3 +137,10 @@ class MatchResult(Base):
     # Relationships
     candidate = relationship("Candidate", back_populates="match_results")
     job = relationship("Job", back_populates="match_results")
+    
+    __table_args__ = (
+        # One row per pair; target of INSERT ... ON CONFLICT upserts
+        Index("uq_match_results_candidate_job", "candidate_id", "job_id", unique=True),
+        # Stored matches of a job, best first; also serves ON DELETE CASCADE from jobs
+        Index("ix_match_results_job_score", "job_id", "similarity_score"),
+    )
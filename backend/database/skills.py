@@ -0,0 +1,111 @@
+"""
+Skill dictionary and candidate/job skill links behind the /search skill filters
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete, event, insert, intersect, select, true
+from sqlalchemy.orm import attributes
+
+from backend.database.models import Candidate, Job, Skill, CandidateSkill, JobSkill
+
+# Entity model -> (link model, link entity column, entity skills attribute)
+SKILL_LINKS = {
+    Candidate: (CandidateSkill, CandidateSkill.candidate_id, "skills"),
+    Job: (JobSkill, JobSkill.job_id, "required_skills"),
+}
+
+
+def normalize_skill(skill) -> str:
+    """Lower-case skill name with single spaces ("Machine  Learning" -> "machine learning")"""
+    return " ".join(str(skill).split()).lower()
+
+
+def normalize_skills(skills: Iterable) -> List[str]:
+    """Distinct non-empty normalized names, first occurrence order"""
+    names = (normalize_skill(skill) for skill in skills or ())
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def _dialect_insert(conn):
+    """INSERT construct with ON CONFLICT support for this connection, None if the dialect has none"""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def skill_ids(conn, names: List[str]) -> Dict[str, int]:
+    """Ids of normalized skill names, adding the unknown ones"""
+    if not names:
+        return {}
+    known = dict(conn.execute(select(Skill.name, Skill.id).where(Skill.name.in_(names))).all())
+    missing = [name for name in names if name not in known]
+    if missing:
+        dialect_insert = _dialect_insert(conn)
+        if dialect_insert is not None:
+            # Concurrent uploads may add the same skill
+            conn.execute(dialect_insert(Skill).on_conflict_do_nothing(index_elements=[Skill.name]),
+                         [{'name': name} for name in missing])
+        else:
+            conn.execute(insert(Skill), [{'name': name} for name in missing])
+        known.update(conn.execute(select(Skill.name, Skill.id).where(Skill.name.in_(missing))).all())
+    return known
+
+
+def replace_skill_links(conn, model, skills_by_id: Dict[int, Iterable]):
+    """Set the skill links of many candidates or jobs (model) to their skill lists"""
+    if not skills_by_id:
+        return
+    link, column, _ = SKILL_LINKS[model]
+    names_by_id = {entity_id: normalize_skills(skills) for entity_id, skills in skills_by_id.items()}
+    ids = skill_ids(conn, list(dict.fromkeys(name for names in names_by_id.values() for name in names)))
+
+    conn.execute(delete(link).where(column.in_(list(names_by_id))))
+    rows = [
+        {column.key: entity_id, 'skill_id': ids[name]}
+        for entity_id, names in names_by_id.items() for name in names
+    ]
+    if rows:
+        conn.execute(insert(link), rows)
+
+
+def skill_filter(model, skills: Iterable, match_all: bool = True):
+    """
+    Condition on model.id: entities having every listed skill (an INTERSECT
+    of one posting-list lookup per skill), or any of them; no condition
+    without skill names
+    """
+    link, column, _ = SKILL_LINKS[model]
+    names = normalize_skills(skills)
+    if not names:
+        return true()
+
+    def postings(names):
+        return select(column).join(Skill, Skill.id == link.skill_id).where(Skill.name.in_(names))
+
+    if match_all and len(names) > 1:
+        return model.id.in_(intersect(*(postings([name]) for name in names)))
+    return model.id.in_(postings(names))
+
+
+def _link_inserted(mapper, connection, target):
+    """Links of a new candidate/job"""
+    _, _, skills_attribute = SKILL_LINKS[mapper.class_]
+    replace_skill_links(connection, mapper.class_, {target.id: getattr(target, skills_attribute)})
+
+
+def _link_updated(mapper, connection, target):
+    """Links of an updated candidate/job, when its skills list changed"""
+    _, _, skills_attribute = SKILL_LINKS[mapper.class_]
+    if attributes.get_history(target, skills_attribute).has_changes():
+        replace_skill_links(connection, mapper.class_, {target.id: getattr(target, skills_attribute)})
+
+
+# ORM flushes of any session (API uploads, seed scripts) maintain the links
+for _model in SKILL_LINKS:
+    event.listen(_model, "after_insert", _link_inserted)
+    event.listen(_model, "after_update", _link_updated)
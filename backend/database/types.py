@@ -0,0 +1,72 @@
+"""
+Custom column types
+"""
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator, UserDefinedType
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+VECTOR_NUMPY = "numpy"
+VECTOR_PGVECTOR = "pgvector"
+
+
+def uses_pgvector(dialect) -> bool:
+    """Whether embeddings live in a pgvector column on this database (VECTOR_BACKEND=pgvector on PostgreSQL)"""
+    return settings.VECTOR_BACKEND == VECTOR_PGVECTOR and dialect.name == "postgresql"
+
+
+def vector_literal(vector) -> str:
+    """pgvector text form of a vector: [x1,x2,...] (9 significant digits round-trip float32)"""
+    return "[" + ",".join(f"{x:.9g}" for x in np.asarray(vector, dtype=np.float32).ravel().tolist()) + "]"
+
+
+def parse_vector_literal(value: str) -> np.ndarray:
+    """float32 array from pgvector text form"""
+    return np.fromstring(value.strip()[1:-1], dtype=np.float32, sep=",")
+
+
+class PgVector(UserDefinedType):
+    """pgvector `vector(dim)` column, exchanged in text form"""
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return f"VECTOR({self.dim})"
+
+
+class Float32Vector(TypeDecorator):
+    """
+    Embedding stored as raw little-endian float32 bytes (BYTEA / BLOB), or
+    as pgvector `vector(EMBEDDING_DIM)` where enabled (see uses_pgvector).
+    Accepts any sequence of floats on write and returns a NumPy array on
+    read, so loading vectors is a memory copy instead of JSON parsing.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    DTYPE = np.dtype("<f4")
+
+    def load_dialect_impl(self, dialect):
+        if uses_pgvector(dialect):
+            return dialect.type_descriptor(PgVector(settings.EMBEDDING_DIM))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if uses_pgvector(dialect):
+            return vector_literal(value)
+        return np.ascontiguousarray(value, dtype=self.DTYPE).ravel().tobytes()
+
+    def process_result_value(self, value, dialect) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return parse_vector_literal(value)
+        return np.frombuffer(value, dtype=self.DTYPE)
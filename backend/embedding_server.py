@@ -0,0 +1,93 @@
+"""
+Standalone embedding server: loads the model once and encodes texts for
+every API worker started with EMBEDDING_SERVER_URL
+"""
+import sys
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from pydantic import BaseModel, Field
+import uvicorn
+
+from backend.services.embedding_service import EmbeddingService
+from backend.services.embedding_batcher import EmbeddingBatcher
+from backend.services.encoders import ENCODERS
+from backend.config import get_settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class EncodeRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=1024)
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8100, help="HTTP port to listen on")
+    parser.add_argument("--uds", default=None,
+                        help="Listen on this Unix socket instead of a port (EMBEDDING_SERVER_URL=unix://<path>)")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE,
+                        help="Texts per encode call, across all connected workers")
+    parser.add_argument("--max-wait-ms", type=float, default=settings.EMBEDDING_BATCH_WAIT_MS,
+                        help="Max time a text waits for others to join its batch")
+    parser.add_argument("--backend", default=settings.EMBEDDING_BACKEND, choices=sorted(ENCODERS),
+                        help="Encoder backend")
+    return parser.parse_args()
+
+
+def create_app(batch_size: int, max_wait_ms: float, backend: str = settings.EMBEDDING_BACKEND) -> FastAPI:
+    """Embedding server app; the model is loaded before the first request is accepted"""
+    # Always encode locally, even if EMBEDDING_SERVER_URL is set in the shared .env
+    service = EmbeddingService(server_url="", backend=backend)
+    batcher = EmbeddingBatcher(batch_size, max_wait_ms, service=service)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        service.warm_up()
+        batcher.start()
+        yield
+        batcher.stop()
+
+    app = FastAPI(title="Embedding Server", lifespan=lifespan)
+
+    @app.post("/encode")
+    async def encode(request: EncodeRequest):
+        """Embeddings of texts; texts of concurrent requests are encoded in shared batches"""
+        embeddings = await asyncio.gather(*(batcher.embed_async(text) for text in request.texts))
+        return {"model": service.model_name, "embeddings": embeddings}
+
+    @app.get("/health")
+    async def health():
+        """Model name and batch statistics"""
+        return {"status": "healthy", "model": service.model_name, "batcher": batcher.stats()}
+
+    return app
+
+
+def main():
+    """Load the model and serve encode requests"""
+    args = parse_args()
+    app = create_app(args.batch_size, args.max_wait_ms, args.backend)
+
+    if args.uds:
+        logger.info(f"Embedding server listening on unix://{args.uds}")
+        uvicorn.run(app, uds=args.uds, log_level=settings.LOG_LEVEL.lower())
+    else:
+        logger.info(f"Embedding server listening on http://{args.host}:{args.port}")
+        uvicorn.run(app, host=args.host, port=args.port, log_level=settings.LOG_LEVEL.lower())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Query plans and latency of the hot lookups with and without their indexes.
+
+The baseline drops the indexes inside a transaction that is rolled back,
+which locks the tables meanwhile: run it against a seeded copy, not a
+serving database.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import insert, text
+
+from backend.config import get_settings
+from backend.database import engine, init_db, Candidate, Job, Embedding, MatchResult
+from backend.database.migrations import HOT_LOOKUP_INDEXES
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HOT_QUERIES = [
+    ("latest candidate embedding",
+     "SELECT id FROM embeddings WHERE candidate_id = :candidate_id ORDER BY id DESC LIMIT 1"),
+    ("latest job embedding",
+     "SELECT id FROM embeddings WHERE job_id = :job_id ORDER BY id DESC LIMIT 1"),
+    ("stored matches of a job",
+     "SELECT candidate_id, similarity_score FROM match_results WHERE job_id = :job_id "
+     "ORDER BY similarity_score DESC LIMIT 10"),
+    ("match result of a pair",
+     "SELECT id FROM match_results WHERE candidate_id = :candidate_id AND job_id = :job_id"),
+    ("job search filters",
+     "SELECT id FROM jobs WHERE job_type = :job_type AND seniority_level = :seniority_level "
+     "AND domain = :domain LIMIT 50"),
+]
+BASELINE_DROPPED = HOT_LOOKUP_INDEXES + ("uq_match_results_candidate_job",)
+INSERT_CHUNK = 5000
+JOB_TYPES = ["full-time", "part-time", "contract"]
+SENIORITY_LEVELS = ["junior", "mid", "senior", "lead"]
+DOMAINS = ["tech", "finance", "healthcare", "retail", "education"]
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="First add this many synthetic jobs and candidates (two embeddings each, "
+                             "ten match results per candidate)")
+    parser.add_argument("--repeat", type=int, default=200, help="Executions timed per query")
+    return parser.parse_args()
+
+
+def _insert_chunked(conn, table, rows: List[Dict]) -> List[int]:
+    """Insert rows in chunks, returning their new ids in order"""
+    ids = []
+    for start in range(0, len(rows), INSERT_CHUNK):
+        result = conn.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows[start:start + INSERT_CHUNK]
+        )
+        ids.extend(result.scalars())
+    return ids
+
+
+def seed_synthetic(count: int, rng: np.random.Generator):
+    """Jobs and candidates with random attributes, re-encoded embeddings and match results"""
+    with engine.begin() as conn:
+        job_ids = _insert_chunked(conn, Job.__table__, [{
+            'title': f"Synthetic job {n}",
+            'description': "synthetic",
+            'job_type': JOB_TYPES[n % len(JOB_TYPES)],
+            'seniority_level': SENIORITY_LEVELS[n % len(SENIORITY_LEVELS)],
+            'domain': DOMAINS[n % len(DOMAINS)],
+            'experience_required': float(n % 10)
+        } for n in range(count)])
+        candidate_ids = _insert_chunked(conn, Candidate.__table__, [{
+            'name': f"Synthetic candidate {n}",
+            'experience_years': float(n % 15)
+        } for n in range(count)])
+
+        # Two embeddings per entity, as after a re-upload, so "latest" has to pick one
+        for column, ids in (('job_id', job_ids), ('candidate_id', candidate_ids)):
+            for _ in range(2):
+                for start in range(0, count, INSERT_CHUNK):
+                    chunk = ids[start:start + INSERT_CHUNK]
+                    vectors = rng.standard_normal((len(chunk), settings.EMBEDDING_DIM), dtype=np.float32)
+                    _insert_chunked(conn, Embedding.__table__, [
+                        {column: entity_id, 'embedding_vector': vector, 'model_name': "synthetic"}
+                        for entity_id, vector in zip(chunk, vectors)
+                    ])
+
+        for start in range(0, count, INSERT_CHUNK):
+            _insert_chunked(conn, MatchResult.__table__, [
+                {'candidate_id': candidate_id, 'job_id': int(job_id), 'similarity_score': float(score)}
+                for candidate_id in candidate_ids[start:start + INSERT_CHUNK]
+                for job_id, score in zip(rng.choice(job_ids, size=min(10, count), replace=False), rng.random(10))
+            ])
+    logger.info(f"Added {count} synthetic jobs and candidates")
+
+
+def _middle_row(conn, table: str, columns: str, condition: str = "1 = 1"):
+    """Columns of the row halfway through a table's ids, so the newest rows do not flatter id-ordered scans"""
+    return conn.execute(text(
+        f"SELECT {columns} FROM {table} WHERE {condition} AND id >= "
+        f"(SELECT (MIN(id) + MAX(id)) / 2 FROM {table} WHERE {condition}) ORDER BY id LIMIT 1"
+    )).first()
+
+
+def sample_parameters(conn) -> Dict:
+    """Bind values taken from existing rows"""
+    pair = _middle_row(conn, "match_results", "candidate_id, job_id")
+    candidate = _middle_row(conn, "embeddings", "candidate_id", "candidate_id IS NOT NULL")
+    job = _middle_row(conn, "jobs", "id, job_type, seniority_level, domain")
+    return {
+        'candidate_id': pair[0] if pair else candidate and candidate[0],
+        'job_id': pair[1] if pair else job and job[0],
+        'job_type': job and job[1],
+        'seniority_level': job and job[2],
+        'domain': job and job[3]
+    }
+
+
+def plan(conn, sql: str, parameters: Dict, label: str) -> str:
+    """One-line query plan"""
+    # The label keeps the statement text distinct per pass: SQLite's
+    # statement cache would otherwise replay the plan of the first pass
+    if conn.dialect.name == "postgresql":
+        lines = [row[0].strip() for row in conn.execute(text(f"EXPLAIN (COSTS OFF) {sql} -- {label}"), parameters)]
+    else:
+        lines = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql} -- {label}"), parameters)]
+    return " / ".join(lines)
+
+
+def measure(conn, parameters: Dict, repeat: int, label: str) -> Dict:
+    """Plan and mean latency of every hot query"""
+    report = {}
+    for name, sql in HOT_QUERIES:
+        statement = text(sql)
+        conn.execute(statement, parameters).all()  # warm up
+        started = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(statement, parameters).all()
+        report[name] = {
+            'plan': plan(conn, sql, parameters, label),
+            'ms': (time.perf_counter() - started) * 1000 / repeat
+        }
+    return report
+
+
+def main():
+    """Seed if asked, then compare the hot queries without and with their indexes"""
+    args = parse_args()
+    init_db()
+    if args.synthetic:
+        seed_synthetic(args.synthetic, np.random.default_rng(0))
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    with engine.connect() as conn:
+        parameters = sample_parameters(conn)
+        indexed = measure(conn, parameters, args.repeat, "indexed")
+        conn.rollback()  # end the read transaction begun by the queries
+
+        transaction = conn.begin()
+        try:
+            for name in BASELINE_DROPPED:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            baseline = measure(conn, parameters, args.repeat, "baseline")
+        finally:
+            transaction.rollback()
+
+        counts = {table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                  for table in ("jobs", "candidates", "embeddings", "match_results")}
+    print(f"{engine.dialect.name}: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+    for name, _ in HOT_QUERIES:
+        before, after = baseline[name], indexed[name]
+        print(f"\n{name}: {before['ms']:.3f} ms -> {after['ms']:.3f} ms ({before['ms'] / after['ms']:.1f}x)")
+        print(f"  without indexes: {before['plan']}")
+        print(f"  with indexes:    {after['plan']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,14 +13,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, FileResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import time
 from pathlib import Path
 
 from backend.config import get_settings
 from backend.core.logging_config import setup_logging, set_correlation_id
-from backend.database import init_db
+from backend.database import init_db, async_engine
 from backend.api import auth_router, upload_router, match_router, search_router
+from backend.services.match_writer import get_match_writer
+from backend.services.embedding_service import get_embedding_service
+from backend.services.embedding_batcher import get_embedding_batcher
+from backend.services.vector_index import get_embedding_index
+from backend.services.shard_pool import get_shard_pool
+from backend.services.scatter_gather import get_node_search_client
+from backend.services.pgvector_search import get_pgvector_search
+from backend.services.text_search import get_text_search
+from backend.core.executor import get_blocking_executor, run_blocking, run_in_session
+from backend.core.readiness import get_readiness
 
 settings = get_settings()
 
@@ -29,6 +40,34 @@ setup_logging(settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 
+def warms_index() -> bool:
+    """
+    Whether startup builds the in-memory index: not with pgvector, where
+    the database serves matching, nor on a scatter-gather coordinator
+    (MATCH_NODE_URLS), whose matcher nodes hold the index shards
+    """
+    return not (get_pgvector_search().enabled or get_node_search_client().enabled)
+
+
+async def warm_up():
+    """
+    Load and warm up the embedding model while the index is built, so the
+    first requests after a deploy do not pay for either (see warms_index).
+    """
+    readiness = get_readiness()
+    
+    async def embeddings():
+        await readiness.run_step("model", run_blocking(get_embedding_service))
+        await readiness.run_step("warmup", run_blocking(lambda: get_embedding_service().warm_up()))
+    
+    async def index():
+        await readiness.run_step("index", run_in_session(get_embedding_index().ensure_loaded))
+    
+    # A failed step is reported by /api/ready; the other one still runs
+    steps = [embeddings(), index()] if warms_index() else [embeddings()]
+    await asyncio.gather(*steps, return_exceptions=True)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -39,14 +78,28 @@ async def lifespan(app: FastAPI):
     try:
         init_db()
         logger.info("Database initialized successfully")
+        get_text_search()  # probes the text search indexes once, before requests arrive
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
+    get_match_writer().start()
+    warmup_task = None
+    if settings.STARTUP_WARMUP:
+        get_readiness().register("model", "warmup", *(("index",) if warms_index() else ()))
+        warmup_task = asyncio.create_task(warm_up())
     
     yield
     
     # Shutdown
     logger.info("Shutting down AI Job Matcher application...")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    get_embedding_batcher().stop()
+    get_match_writer().stop()
+    get_shard_pool().close()
+    await get_node_search_client().close()
+    get_blocking_executor().shutdown()
+    await async_engine.dispose()
 
 
 # Create FastAPI app
@@ -143,6 +196,19 @@ async def health_check():
     }
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """
+    Readiness probe: 503 until the model is loaded and warmed up and the
+    matching index is built, with per-step timings
+    """
+    readiness = get_readiness()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=readiness.report()
+    )
+
+
 # Serve React frontend (after build)
 frontend_dist = Path(__file__).parent.parent / "frontend" / "dist"
 if frontend_dist.exists():
@@ -0,0 +1,56 @@
+"""
+Precompute candidate/job rankings into match_results
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add backend to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backend.database import SessionLocal
+from backend.services.vector_index import EmbeddingIndex
+from backend.services.match_precompute import AllPairsPrecompute
+from backend.config import get_settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=10, help="Matches kept per candidate and per job")
+    parser.add_argument("--min-similarity", type=float, default=0.5, help="Cosine similarity cutoff (0-1)")
+    parser.add_argument("--memory-mb", type=int, default=settings.PRECOMPUTE_MEMORY_MB,
+                        help="Memory budget for one block of scores")
+    return parser.parse_args()
+
+
+def main():
+    """Score all candidate/job pairs in blocks and store the top matches"""
+    args = parse_args()
+    
+    db = SessionLocal()
+    try:
+        index = EmbeddingIndex()
+        index.build(db)
+        report = AllPairsPrecompute(
+            index,
+            top_k=args.top_k,
+            min_similarity=args.min_similarity,
+            memory_mb=args.memory_mb
+        ).run(db)
+        logger.info(f"Precompute completed: {report}")
+    except Exception as e:
+        logger.error(f"Error precomputing matches: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
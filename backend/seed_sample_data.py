@@ -7,6 +7,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from backend.database import SessionLocal, Candidate, Job, Embedding
 from backend.services import get_embedding_service
+from backend.services.embedding_cache import embedding_key
+from backend.services.encoders import encoder_name
 from backend.config import get_settings
 import logging
 
@@ -86,7 +88,8 @@ def create_sample_candidates(db):
         embedding = Embedding(
             candidate_id=candidate.id,
             embedding_vector=embedding_vector,
-            model_name=settings.MODEL_NAME
+            model_name=encoder_name(),
+            text_hash=embedding_key(encoder_name(), embedding_text)
         )
         db.add(embedding)
         
@@ -190,7 +193,8 @@ def create_sample_jobs(db):
         embedding = Embedding(
             job_id=job.id,
             embedding_vector=embedding_vector,
-            model_name=settings.MODEL_NAME
+            model_name=encoder_name(),
+            text_hash=embedding_key(encoder_name(), embedding_text)
         )
         db.add(embedding)
         
@@ -1,14 +1,38 @@
 """Services package"""
 from .nlp_service import NLPService
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 from .embedding_service import EmbeddingService, get_embedding_service
+from .embedding_batcher import EmbeddingBatcher, get_embedding_batcher
+from .vector_index import EmbeddingIndex, get_embedding_index
+from .match_cache import MatchCache, get_match_cache
+from .shard_pool import ShardPool, get_shard_pool
+from .scatter_gather import NodeSearchClient, get_node_search_client
+from .pgvector_search import PgVectorSearch, get_pgvector_search
+from .text_search import TextSearch, get_text_search
 from .matching_service import MatchingService, get_matching_service
 from .resume_parser import ResumeParser
 from .job_parser import JobParser
 
 __all__ = [
     "NLPService",
+    "EmbeddingCache",
+    "get_embedding_cache",
     "EmbeddingService",
     "get_embedding_service",
+    "EmbeddingBatcher",
+    "get_embedding_batcher",
+    "EmbeddingIndex",
+    "get_embedding_index",
+    "MatchCache",
+    "get_match_cache",
+    "ShardPool",
+    "get_shard_pool",
+    "NodeSearchClient",
+    "get_node_search_client",
+    "PgVectorSearch",
+    "get_pgvector_search",
+    "TextSearch",
+    "get_text_search",
     "MatchingService",
     "get_matching_service",
     "ResumeParser",
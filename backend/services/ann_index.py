@@ -0,0 +1,80 @@
+"""
+Approximate nearest-neighbour search using an IVF coarse quantizer
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def spherical_kmeans(vectors: np.ndarray,
+                     k: int,
+                     iterations: int = 10,
+                     seed: int = 0) -> np.ndarray:
+    """
+    Cluster L2-normalized vectors by cosine similarity and return unit-length centroids
+    """
+    rng = np.random.default_rng(seed)
+    k = max(1, min(k, len(vectors)))
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+
+        # Re-seed empty clusters with random points
+        empty = np.flatnonzero(~sums.any(axis=1))
+        if empty.size:
+            sums[empty] = vectors[rng.choice(len(vectors), size=empty.size)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file coarse quantizer: rows are bucketed by nearest centroid and
+    a query only scores the rows of its `nprobe` closest buckets.
+    The per-row list assignments live with the rows they describe.
+    """
+
+    def __init__(self, nlist: int = 0, iterations: int = 10, train_sample: int = 50000):
+        self.nlist = nlist
+        self.iterations = iterations
+        self.train_sample = train_sample
+        self.centroids = None
+        self.trained_rows = 0
+
+    def train(self, vectors: np.ndarray):
+        """
+        Learn centroids from (a sample of) the vectors
+        """
+        nlist = self.nlist or max(1, int(4 * np.sqrt(len(vectors))))
+        sample = vectors
+        if len(vectors) > self.train_sample:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), size=self.train_sample, replace=False)]
+
+        self.centroids = spherical_kmeans(sample, nlist, self.iterations)
+        self.trained_rows = len(vectors)
+        logger.info(f"IVF index trained: {len(self.centroids)} lists over {len(vectors)} rows")
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest-centroid list for each vector"""
+        if len(vectors) == 0:
+            return np.empty(0, dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=-1).astype(np.int32)
+
+    def probe(self, query: np.ndarray, nprobe: int, assignments: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of rows whose list is among the `nprobe` closest to the query
+        """
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.isin(assignments, lists)
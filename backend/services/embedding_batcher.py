@@ -0,0 +1,180 @@
+"""
+Request-coalescing micro-batcher for embedding inference
+"""
+import asyncio
+import bisect
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.config import get_settings
+from backend.services.embedding_service import EmbeddingService, get_embedding_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Upper bounds of the per-request latency histogram, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _Histogram:
+    """Fixed-bucket counts plus count/sum/max; caller holds the batcher lock"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict:
+        labels = [f"{bound:g}" for bound in self.bounds] + ["+Inf"]
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'max': round(self.max, 3)
+        }
+
+
+class EmbeddingBatcher:
+    """
+    Queues embedding requests from any thread or coroutine and encodes them
+    on one dispatcher thread: a batch is sent to generate_embeddings_batch
+    once EMBEDDING_BATCH_SIZE texts are waiting or EMBEDDING_BATCH_WAIT_MS
+    after its first text arrived, then each caller's future is resolved.
+    Concurrent uploads share forward passes instead of contending for
+    torch threads with one encode call each.
+    """
+
+    def __init__(self,
+                 batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+                 max_wait_ms: float = settings.EMBEDDING_BATCH_WAIT_MS,
+                 service: Optional[EmbeddingService] = None):
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._counters = {'submitted': 0, 'batches': 0, 'failed_batches': 0}
+        size_bounds = [1]
+        while size_bounds[-1] < self.batch_size:
+            size_bounds.append(min(size_bounds[-1] * 2, self.batch_size))
+        self._batch_sizes = _Histogram(size_bounds)
+        self._latency_ms = _Histogram(LATENCY_BUCKETS_MS)
+
+    def start(self):
+        """Start the dispatcher thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the dispatcher thread after encoding everything still queued"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        while not self._queue.empty():
+            self._encode(self._take_batch(block=False))
+
+    def submit(self, text: str) -> "Future[List[float]]":
+        """Queue a text; the future resolves to its embedding"""
+        future: "Future[List[float]]" = Future()
+        if not text or not text.strip():
+            future.set_result([0.0] * settings.EMBEDDING_DIM)
+            return future
+
+        with self._lock:
+            self._counters['submitted'] += 1
+        if self._thread is None:
+            self.start()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed(self, text: str) -> List[float]:
+        """Embedding of a text, blocking the calling thread"""
+        return self.submit(text).result()
+
+    async def embed_async(self, text: str) -> List[float]:
+        """Embedding of a text, awaited without holding a worker thread"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _take_batch(self, block: bool = True) -> List[Tuple[str, Future, float]]:
+        """First queued request plus whatever arrives until the batch is full or its wait expires"""
+        try:
+            first = self._queue.get(timeout=0.1) if block else self._queue.get_nowait()
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if block and remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _encode(self, batch: List[Tuple[str, Future, float]]):
+        """Encode one batch and resolve its futures"""
+        if not batch:
+            return
+        try:
+            embeddings = (self.service or get_embedding_service()).generate_embeddings_batch(
+                [text for text, _, _ in batch], show_progress_bar=False
+            )
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(batch)} texts: {e}")
+            with self._lock:
+                self._counters['failed_batches'] += 1
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        with self._lock:
+            self._counters['batches'] += 1
+            self._batch_sizes.observe(len(batch))
+            for _, _, queued in batch:
+                self._latency_ms.observe((finished - queued) * 1000.0)
+        for (_, future, _), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._encode(self._take_batch())
+
+    def stats(self) -> Dict:
+        """Request and batch counters, batch size and per-request latency (ms) histograms"""
+        with self._lock:
+            return dict(
+                self._counters,
+                queued=self._queue.qsize(),
+                batch_size_limit=self.batch_size,
+                max_wait_ms=self.max_wait * 1000.0,
+                batch_size=self._batch_sizes.snapshot(),
+                latency_ms=self._latency_ms.snapshot()
+            )
+
+
+# Singleton instance
+@lru_cache()
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Get singleton embedding batcher instance"""
+    return EmbeddingBatcher()
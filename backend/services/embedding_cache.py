@@ -0,0 +1,145 @@
+"""
+Content-addressed embedding cache: in-process LRU in front of a SQLite file
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Keys per SELECT ... IN (...) lookup, below SQLite's bound parameter limit
+LOOKUP_CHUNK = 500
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """
+    Hex SHA-256 of the model name and the text with whitespace runs collapsed;
+    texts that only differ in spacing share an embedding
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    float32 embeddings by embedding_key. Hits are served from a bounded LRU;
+    misses fall through to a SQLite file shared by every worker on the host,
+    so re-uploads and re-seeding skip model inference across restarts.
+    Disk errors only cost cache hits, never fail the caller.
+    """
+
+    def __init__(self,
+                 path: str = settings.EMBEDDING_CACHE_PATH,
+                 max_entries: int = settings.EMBEDDING_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Embedding cache file {path} unavailable, caching in memory only: {e}")
+                self._db = None
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the LRU; caller holds the lock"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors for keys, None where missing"""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self._counters['memory_hits'] += len(found)
+
+            remaining = list(dict.fromkeys(key for key in keys if key not in found))
+            if remaining and self._db is not None:
+                try:
+                    for start in range(0, len(remaining), LOOKUP_CHUNK):
+                        chunk = remaining[start:start + LOOKUP_CHUNK]
+                        rows = self._db.execute(
+                            f"SELECT key, vector FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                            chunk
+                        ).fetchall()
+                        for key, blob in rows:
+                            vector = np.frombuffer(blob, dtype=np.float32)
+                            found[key] = vector
+                            self._remember(key, vector)
+                            self._counters['disk_hits'] += 1
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding cache lookup failed: {e}")
+            self._counters['misses'] += sum(1 for key in keys if key not in found)
+
+        return [found.get(key) for key in keys]
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Cached vector for a key, or None"""
+        return self.get_many([key])[0]
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]):
+        """Store vectors (as float32) under their keys"""
+        items = [(key, np.asarray(vector, dtype=np.float32)) for key, vector in items]
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embedding_cache (key, vector) VALUES (?, ?)",
+                        [(key, vector.tobytes()) for key, vector in items]
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding cache write failed: {e}")
+
+    def put(self, key: str, vector: np.ndarray):
+        """Store one vector"""
+        self.put_many([(key, vector)])
+
+    def stats(self) -> Dict:
+        """Hit and miss counters"""
+        with self._lock:
+            lookups = sum(self._counters.values())
+            hits = self._counters['memory_hits'] + self._counters['disk_hits']
+            return dict(
+                self._counters,
+                entries_in_memory=len(self._memory),
+                max_entries=self.max_entries,
+                path=self.path or None,
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0
+            )
+
+
+# Singleton instance
+@lru_cache()
+def get_embedding_cache() -> EmbeddingCache:
+    """Get singleton embedding cache instance"""
+    return EmbeddingCache()
@@ -0,0 +1,51 @@
+"""
+Client for the standalone embedding server (backend/embedding_server.py)
+"""
+import logging
+from typing import List, Optional
+
+import httpx
+import numpy as np
+
+from backend.config import get_settings
+from backend.services.encoders import encoder_name
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Server endpoint encoding a list of texts
+ENCODE_PATH = "/encode"
+
+
+class EmbeddingClient:
+    """
+    Encodes texts on the embedding server, so the calling process never
+    loads the model. The server URL is either http://host:port or
+    unix:///path/to/socket for a server on the same host.
+    """
+
+    def __init__(self,
+                 server_url: str = settings.EMBEDDING_SERVER_URL,
+                 timeout_seconds: float = settings.EMBEDDING_SERVER_TIMEOUT_SECONDS,
+                 model_name: Optional[str] = None):
+        self.server_url = server_url
+        self.model_name = model_name or encoder_name()
+        if server_url.startswith("unix://"):
+            # The host part is only used for the Host header
+            transport = httpx.HTTPTransport(uds=server_url[len("unix://"):])
+            self._client = httpx.Client(transport=transport, base_url="http://embedding-server", timeout=timeout_seconds)
+        else:
+            self._client = httpx.Client(base_url=server_url.rstrip("/"), timeout=timeout_seconds)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """float32 (len(texts), dim) embeddings computed by the server"""
+        response = self._client.post(ENCODE_PATH, json={"texts": texts})
+        response.raise_for_status()
+        body = response.json()
+        if body["model"] != self.model_name:
+            raise ValueError(f"Embedding server runs {body['model']}, expected {self.model_name}")
+        return np.asarray(body["embeddings"], dtype=np.float32).reshape(len(texts), -1)
+
+    def close(self):
+        """Close pooled connections"""
+        self._client.close()
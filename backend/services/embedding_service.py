@@ -1,60 +1,106 @@
 """
 Embedding Service using Sentence-BERT for semantic similarity
 """
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Union
+from typing import List, Optional, Union
 import logging
 from functools import lru_cache
 
 from backend.config import get_settings
+from backend.services.embedding_cache import embedding_key, get_embedding_cache
+from backend.services.embedding_client import EmbeddingClient
+from backend.services.encoders import Encoder, create_encoder, encoder_name
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
 class EmbeddingService:
-    """Service for generating and managing embeddings"""
+    """
+    Service for generating and managing embeddings with the encoder selected
+    by EMBEDDING_BACKEND. With a server_url (EMBEDDING_SERVER_URL) texts are
+    encoded by the embedding server and no encoder is loaded in this process.
+    """
     
-    def __init__(self):
-        self.model = None
-        self._load_model()
+    def __init__(self, server_url: Optional[str] = None, backend: str = settings.EMBEDDING_BACKEND):
+        if server_url is None:
+            server_url = settings.EMBEDDING_SERVER_URL
+        self.backend = backend
+        self.model_name = encoder_name(backend)
+        self.encoder: Optional[Encoder] = None
+        self.client = EmbeddingClient(server_url, model_name=self.model_name) if server_url else None
+        self.cache = get_embedding_cache()
+        if self.client is None:
+            self._load_model()
+        else:
+            logger.info(f"Encoding embeddings on server: {server_url}")
     
     def _load_model(self):
-        """Load Sentence-BERT model"""
+        """Load the configured encoder"""
         try:
-            logger.info(f"Loading embedding model: {settings.MODEL_NAME}")
-            self.model = SentenceTransformer(settings.MODEL_NAME)
+            logger.info(f"Loading embedding model: {self.model_name} ({self.backend} backend)")
+            self.encoder = create_encoder(self.backend)
             logger.info("Embedding model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading embedding model: {e}")
             raise
     
+    def _encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """float32 embeddings of texts from the local encoder or the embedding server"""
+        if self.client is not None:
+            return self.client.encode(texts)
+        return self.encoder.encode(texts, show_progress_bar=show_progress_bar)
+    
+    def warm_up(self, batches: int = settings.EMBEDDING_WARMUP_BATCHES, batch_size: int = settings.EMBEDDING_BATCH_SIZE):
+        """
+        Encode throwaway batches of mixed lengths so the first real request
+        does not pay for lazy initialization; bypasses the embedding cache
+        """
+        words = "senior python engineer with sql docker and cloud experience".split()
+        for batch in range(batches):
+            texts = [" ".join(words * (1 + (batch + i) % 4)) for i in range(batch_size)]
+            self._encode(texts)
+    
     def generate_embedding(self, text: str) -> List[float]:
         """
-        Generate embedding vector for a single text
+        Generate embedding vector for a single text, reusing the cached
+        vector when the same text was encoded before
         """
         try:
             if not text or not text.strip():
                 logger.warning("Empty text provided for embedding")
                 return [0.0] * settings.EMBEDDING_DIM
             
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            key = embedding_key(self.model_name, text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached.tolist()
+            
+            embedding = self._encode([text])[0]
+            self.cache.put(key, embedding)
             return embedding.tolist()
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
     
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings_batch(self, texts: List[str], show_progress_bar: bool = True) -> List[List[float]]:
         """
-        Generate embeddings for multiple texts (batch processing)
+        Generate embeddings for multiple texts (batch processing); only
+        texts missing from the embedding cache are encoded
         """
         try:
             if not texts:
                 return []
             
-            embeddings = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
-            return embeddings.tolist()
+            keys = [embedding_key(self.model_name, text) for text in texts]
+            embeddings = self.cache.get_many(keys)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                encoded = self._encode([texts[i] for i in missing], show_progress_bar=show_progress_bar)
+                self.cache.put_many((keys[i], vector) for i, vector in zip(missing, encoded))
+                for i, vector in zip(missing, encoded):
+                    embeddings[i] = vector
+            return [embedding.tolist() for embedding in embeddings]
         except Exception as e:
             logger.error(f"Error generating batch embeddings: {e}")
             raise
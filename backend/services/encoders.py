@@ -0,0 +1,210 @@
+"""
+Pluggable text encoders behind EmbeddingService
+"""
+import abc
+import logging
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.core.cpu import inference_threads
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Encoder(abc.ABC):
+    """Turns texts into float32 (len(texts), dim) embeddings"""
+
+    name: str
+    dim: int
+
+    @abc.abstractmethod
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """Embeddings of `texts`, one row per text"""
+
+
+def configure_torch_threads(torch, threads: int, interop_threads: int = settings.TORCH_INTEROP_THREADS):
+    """
+    Pin torch's intra-op and inter-op pools; by default every process
+    starts one thread per core, which oversubscribes hosts running
+    several workers
+    """
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Only settable once, before the first inter-op parallel work
+        logger.debug("torch inter-op threads already configured")
+
+
+class SentenceTransformerEncoder(Encoder):
+    """
+    Sentence-BERT model; sentence_transformers (and torch) are imported on
+    construction. With quantize the Linear layers are dynamically quantized
+    to int8 (weights int8, activations quantized per batch), which runs on
+    CPU only and changes vectors slightly, so the encoder gets its own name.
+    """
+
+    def __init__(self,
+                 model_name: str = settings.MODEL_NAME,
+                 dim: int = settings.EMBEDDING_DIM,
+                 quantize: bool = settings.EMBEDDING_QUANTIZE,
+                 threads: Optional[int] = None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self._torch = torch
+        self.name = self.model_name(model_name, quantize)
+        self.dim = dim
+        self.quantize = quantize
+        self.threads = threads or inference_threads()
+        configure_torch_threads(torch, self.threads)
+
+        self.model = SentenceTransformer(model_name, device="cpu" if quantize else None)
+        self.model.eval()
+        if quantize:
+            torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        logger.info(f"Encoder {self.name} using {self.threads} torch threads")
+
+    @staticmethod
+    def model_name(model_name: str, quantize: bool) -> str:
+        return f"{model_name}+int8" if quantize else model_name
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        with self._torch.inference_mode():
+            return self.model.encode(
+                texts, convert_to_numpy=True, show_progress_bar=show_progress_bar
+            ).astype(np.float32)
+
+
+@lru_cache(maxsize=65536)
+def _token_hashes(token: str) -> Tuple[int, ...]:
+    """
+    crc32 of a token feature followed by those of the character trigrams
+    of "<token>", so spelling variants share dimensions. crc32 is stable
+    across processes, unlike hash().
+    """
+    padded = f"<{token}>"
+    names = [f"w:{token}"] + [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return tuple(zlib.crc32(name.encode("utf-8")) for name in names)
+
+
+def _hashed_features(features: List[str], dim: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bucket counts, bucket indices and signed weights of token ("w:") and
+    bigram ("b:") features, concatenated in feature order. A feature has
+    unit weight and a token spreads another unit weight over its trigrams.
+    """
+    hashes: List[int] = []
+    lengths = np.ones(len(features), dtype=np.intp)
+    for position, feature in enumerate(features):
+        if feature.startswith("w:"):
+            token_hashes = _token_hashes(feature[2:])
+            hashes.extend(token_hashes)
+            lengths[position] = len(token_hashes)
+        else:
+            # Bigrams rarely repeat across batches; caching them would evict tokens
+            hashes.append(zlib.crc32(feature.encode("utf-8")))
+
+    trigram_weights = 1.0 / np.maximum(lengths - 1, 1)
+    weights = np.repeat(trigram_weights, lengths)
+    weights[np.cumsum(lengths) - lengths] = 1.0
+
+    hashes = np.array(hashes, dtype=np.uint64)
+    indices = (hashes % dim).astype(np.intp)
+    # bit 31 picks the sign
+    signs = np.where(hashes >> np.uint64(31) & np.uint64(1), 1.0, -1.0)
+    return lengths, indices, signs * weights
+
+
+class HashingEncoder(Encoder):
+    """
+    Signed feature hashing of word unigrams, word bigrams and character
+    trigrams into dim buckets, with sublinear term frequency and L2
+    normalization. Pure NumPy, deterministic and needs no model weights;
+    there is no IDF term because it would need a fitted corpus and make
+    vectors depend on when they were encoded.
+    """
+
+    VERSION = 1
+
+    def __init__(self, dim: int = settings.EMBEDDING_DIM):
+        self.dim = dim
+        self.name = self.model_name(dim)
+
+    @classmethod
+    def model_name(cls, dim: int) -> str:
+        return f"hashing-ngram-v{cls.VERSION}-{dim}"
+
+    @staticmethod
+    def _features(text: str) -> Counter:
+        """Term frequencies of the token and bigram features of a text"""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = Counter(f"w:{token}" for token in tokens)
+        features.update(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return features
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        # Number the distinct features of the batch and list (text, feature, count) entries
+        vocabulary: Dict[str, int] = {}
+        rows, columns, counts = [], [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            columns.extend(vocabulary.setdefault(feature, len(vocabulary)) for feature in features)
+            counts.extend(features.values())
+        if not vocabulary:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        # Buckets and weights of every distinct feature, hashed once per batch
+        lengths, bucket_indices, bucket_weights = _hashed_features(list(vocabulary), self.dim)
+        offsets = np.cumsum(lengths) - lengths
+
+        # Expand each entry to its feature's buckets and sum them in one bincount
+        columns = np.asarray(columns, dtype=np.intp)
+        spans = lengths[columns]
+        starts = np.cumsum(spans) - spans
+        positions = np.arange(spans.sum()) + np.repeat(offsets[columns] - starts, spans)
+        tf = np.repeat(1.0 + np.log(np.asarray(counts, dtype=np.float64)), spans)
+        targets = np.repeat(np.asarray(rows, dtype=np.intp) * self.dim, spans) + bucket_indices[positions]
+        vectors = np.bincount(
+            targets, weights=bucket_weights[positions] * tf, minlength=len(texts) * self.dim
+        ).reshape(len(texts), self.dim)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors.astype(np.float32)
+
+
+ENCODERS: Dict[str, Type[Encoder]] = {
+    "sentence-transformers": SentenceTransformerEncoder,
+    "hashing": HashingEncoder,
+}
+
+
+def create_encoder(backend: str = settings.EMBEDDING_BACKEND) -> Encoder:
+    """Encoder for an EMBEDDING_BACKEND name"""
+    if backend not in ENCODERS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {sorted(ENCODERS)}")
+    return ENCODERS[backend]()
+
+
+def encoder_name(backend: str = settings.EMBEDDING_BACKEND) -> str:
+    """
+    Name stored with embeddings and used in cache keys; vectors from
+    different backends are never mixed up
+    """
+    if backend == "hashing":
+        return HashingEncoder.model_name(settings.EMBEDDING_DIM)
+    return SentenceTransformerEncoder.model_name(settings.MODEL_NAME, settings.EMBEDDING_QUANTIZE)
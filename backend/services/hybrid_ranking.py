@@ -0,0 +1,103 @@
+"""
+Vectorized hybrid match scoring: semantic similarity, skill overlap and experience fit
+"""
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.services.nlp_service import NLPService
+
+settings = get_settings()
+
+# Skill vocabulary behind the per-row bitsets; bit i is SKILL_VOCABULARY[i]
+SKILL_VOCABULARY = sorted(NLPService.COMMON_SKILLS)
+SKILL_BITS = {skill: bit for bit, skill in enumerate(SKILL_VOCABULARY)}
+SKILL_WORDS = (len(SKILL_VOCABULARY) + 63) // 64
+
+# SWAR popcount masks, for NumPy versions without bitwise_count
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0f0f0f0f0f0f0f0f)
+_H01 = np.uint64(0x0101010101010101)
+
+
+class HybridWeights(NamedTuple):
+    semantic: float
+    skills: float
+    experience: float
+
+
+def get_hybrid_weights() -> HybridWeights:
+    """Ranking weights from settings"""
+    return HybridWeights(
+        settings.MATCH_WEIGHT_SEMANTIC,
+        settings.MATCH_WEIGHT_SKILLS,
+        settings.MATCH_WEIGHT_EXPERIENCE
+    )
+
+
+def encode_skills(skills: Optional[Iterable[str]]) -> np.ndarray:
+    """
+    Bitset of the known skills in a skill list as SKILL_WORDS uint64 words;
+    skills outside the vocabulary are ignored
+    """
+    words = np.zeros(SKILL_WORDS, dtype=np.uint64)
+    for skill in skills or ():
+        bit = SKILL_BITS.get(str(skill).strip().lower())
+        if bit is not None:
+            words[bit >> 6] |= np.uint64(1) << np.uint64(bit & 63)
+    return words
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits per bitset (summed over the last axis)"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int32)
+    words = words - ((words >> np.uint64(1)) & _M1)
+    words = (words & _M2) + ((words >> np.uint64(2)) & _M2)
+    words = (words + (words >> np.uint64(4))) & _M4
+    counts = (words * _H01) >> np.uint64(56)
+    # Adding the few word columns directly beats a reduction over a short axis
+    total = counts[..., 0].copy()
+    for word in range(1, counts.shape[-1]):
+        total += counts[..., word]
+    return total.astype(np.int32)
+
+
+def skill_overlap_fraction(row_skills: np.ndarray,
+                           query_skills: np.ndarray,
+                           rows_are_jobs: bool) -> np.ndarray:
+    """
+    Fraction of the job's required skills the candidate has, for every row:
+    |candidate & job| / |job|, 0 for jobs without known skills
+    """
+    overlap = popcount(row_skills & query_skills)
+    required = popcount(row_skills) if rows_are_jobs else popcount(query_skills)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(required > 0, overlap / np.maximum(required, 1), 0.0)
+    return fraction.astype(np.float32)
+
+
+def experience_fit(candidate_years: np.ndarray, required_years: np.ndarray) -> np.ndarray:
+    """
+    1.0 when the candidate meets the required years, otherwise the fraction
+    met; unknown candidate experience counts as 0 years, unknown requirements as met
+    """
+    candidate_years = np.nan_to_num(np.asarray(candidate_years, dtype=np.float32), nan=0.0)
+    required_years = np.nan_to_num(np.asarray(required_years, dtype=np.float32), nan=0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fit = np.where(required_years > 0, np.minimum(candidate_years / required_years, 1.0), 1.0)
+    return fit.astype(np.float32)
+
+
+def hybrid_scores(similarity: np.ndarray,
+                  skill_fraction: np.ndarray,
+                  experience: np.ndarray,
+                  weights: HybridWeights) -> np.ndarray:
+    """Weighted sum of the three components"""
+    return (
+        weights.semantic * similarity
+        + weights.skills * skill_fraction
+        + weights.experience * experience
+    ).astype(np.float32)
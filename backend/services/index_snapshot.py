@@ -0,0 +1,118 @@
+"""
+Versioned on-disk snapshots of the embedding index
+"""
+import json
+import os
+import shutil
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 3
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+
+
+class SnapshotWriter:
+    """
+    Writes one snapshot version into a temporary directory and publishes it
+    atomically, so readers never observe a half-written snapshot
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.version = time.strftime("v%Y%m%d%H%M%S") + f"-{os.getpid()}"
+        self.path = self.root / f".tmp-{self.version}"
+        self.arrays: Dict[str, Dict] = {}
+
+    def __enter__(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+        return False
+
+    def write_array(self, name: str, array: np.ndarray):
+        """Write a small array in one go"""
+        np.save(self.path / f"{name}.npy", np.ascontiguousarray(array))
+        self.arrays[name] = {'dtype': str(array.dtype), 'shape': list(array.shape)}
+
+    def write_rows(self,
+                   name: str,
+                   dtype,
+                   shape: tuple,
+                   fill: Callable[[np.ndarray], None]):
+        """
+        Write a large array through a writable memmap so it never has to
+        be materialized in memory; `fill` populates the mapped array
+        """
+        target = np.lib.format.open_memmap(self.path / f"{name}.npy", mode="w+", dtype=dtype, shape=shape)
+        fill(target)
+        target.flush()
+        del target
+        self.arrays[name] = {'dtype': np.dtype(dtype).name, 'shape': list(shape)}
+
+    def publish(self, manifest: Dict) -> Path:
+        """Write the manifest, move the version into place and point CURRENT at it"""
+        manifest = dict(manifest, format_version=SNAPSHOT_FORMAT_VERSION,
+                        version=self.version, arrays=self.arrays)
+        with open(self.path / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+        final_path = self.root / self.version
+        os.replace(self.path, final_path)
+
+        pointer = self.root / f".{CURRENT_FILE}-{self.version}"
+        pointer.write_text(self.version)
+        os.replace(pointer, self.root / CURRENT_FILE)
+
+        _prune_versions(self.root, keep=self.version)
+        logger.info(f"Index snapshot published: {final_path}")
+        return final_path
+
+
+def _prune_versions(root: Path, keep: str):
+    """
+    Remove old versions. Workers still mapping them keep their pages until
+    they reload, since unlinking a mapped file does not invalidate the mapping.
+    """
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and p.name.startswith("v"))
+    for path in versions[:-KEEP_VERSIONS]:
+        if path.name != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def open_snapshot(root: str) -> Optional[Dict]:
+    """
+    Open the current snapshot: returns the manifest plus its arrays, with
+    large arrays memory-mapped read-only so workers share the page cache
+    """
+    root = Path(root)
+    pointer = root / CURRENT_FILE
+    if not pointer.exists():
+        return None
+
+    path = root / pointer.read_text().strip()
+    try:
+        with open(path / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            logger.warning(f"Ignoring index snapshot {path}: unsupported format version")
+            return None
+
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in manifest['arrays']
+        }
+        return {'manifest': manifest, 'arrays': arrays, 'path': str(path)}
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable index snapshot {path}: {e}")
+        return None
@@ -0,0 +1,84 @@
+"""
+Bounded LRU/TTL cache of match results
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+from functools import lru_cache
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+class MatchCache:
+    """
+    LRU cache with per-entry TTL.
+
+    Keys carry the index versions the result was computed against, so index
+    updates make stale entries unreachable instead of requiring a scan; they
+    age out through LRU eviction or their TTL.
+    """
+
+    def __init__(self,
+                 max_entries: int = settings.MATCH_CACHE_SIZE,
+                 ttl_seconds: float = settings.MATCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key: Hashable) -> Optional[List[Dict]]:
+        """Cached value for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: List[Dict]):
+        """Store a value, evicting least recently used entries past the bound"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit, miss and eviction counters"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                hit_rate=round(self._counters['hits'] / lookups, 4) if lookups else 0.0
+            )
+
+
+# Singleton instance
+@lru_cache()
+def get_match_cache() -> MatchCache:
+    """Get singleton match cache instance"""
+    return MatchCache()
@@ -0,0 +1,155 @@
+"""
+Blocked all-pairs candidate/job similarity precompute with bounded memory
+"""
+import logging
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.database.models import Candidate, Job, MatchResult
+from backend.services.nlp_service import NLPService
+from backend.services.match_writer import upsert_match_results
+from backend.services.vector_index import EmbeddingIndex, top_k_matrix
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rows per INSERT batch (and per skills lookup)
+INSERT_BATCH_ROWS = 5000
+
+# Approximate bytes held per score-matrix cell: the float32 scores plus the
+# argpartition and transposed temporaries used for row and column top-k
+BYTES_PER_SCORE = 24
+
+
+class AllPairsPrecompute:
+    """
+    Streams candidate blocks against the job matrix and keeps
+    - each candidate's top-k jobs (row-wise argpartition per block), and
+    - each job's top-k candidates (running per-job top-k merged after every block),
+    so peak memory is one score block plus O((candidates + jobs) * top_k).
+    """
+
+    def __init__(self,
+                 index: EmbeddingIndex,
+                 top_k: int = 10,
+                 min_similarity: float = 0.5,
+                 memory_mb: int = settings.PRECOMPUTE_MEMORY_MB):
+        self.index = index
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.memory_mb = memory_mb
+        self.nlp_service = NLPService()
+
+    def block_rows(self, job_count: int) -> int:
+        """Candidate rows per block that keep the score block inside the budget"""
+        return max(1, (self.memory_mb << 20) // (BYTES_PER_SCORE * max(1, job_count)))
+
+    def run(self, db: Session) -> Dict:
+        """
+        Compute rankings for every candidate and job and write them to match_results
+        """
+        started = time.perf_counter()
+        job_ids, job_vectors = self.index.jobs.live_vectors()
+        job_count, k = len(job_ids), self.top_k
+        block_rows = self.block_rows(job_count)
+        logger.info(
+            f"Precomputing matches: {len(self.index.candidates)} candidates x {job_count} jobs, "
+            f"{block_rows} candidates per block"
+        )
+
+        job_skills = {
+            job.id: job.required_skills or []
+            for job in db.query(Job.id, Job.required_skills)
+        }
+
+        # Running per-job top-k candidates
+        best_candidates = np.full((job_count, k), -1, dtype=np.int64)
+        best_scores = np.full((job_count, k), -np.inf, dtype=np.float32)
+        # Each candidate's own top-k jobs, to skip pairs already written
+        candidate_top_jobs: Dict[int, np.ndarray] = {}
+        written = 0
+
+        for candidate_ids, candidate_vectors in self.index.candidates.iter_live_blocks(block_rows):
+            scores = candidate_vectors @ job_vectors.T
+
+            # Candidate -> jobs: row-wise top-k
+            columns, row_scores = top_k_matrix(scores, k)
+            pairs = []
+            for candidate_id, row_columns, row_best in zip(candidate_ids.tolist(), columns, row_scores):
+                keep = row_best >= self.min_similarity
+                matched_jobs = job_ids[row_columns[keep]]
+                candidate_top_jobs[candidate_id] = matched_jobs
+                pairs.extend(zip([candidate_id] * len(matched_jobs), matched_jobs.tolist(), row_best[keep].tolist()))
+
+            # Job -> candidates: merge this block's column top-k into the running top-k
+            block_columns, block_scores = top_k_matrix(scores.T, k)
+            merged_ids = np.concatenate([best_candidates, candidate_ids[block_columns]], axis=1)
+            merged_scores = np.concatenate([best_scores, block_scores], axis=1)
+            positions, best_scores = top_k_matrix(merged_scores, k)
+            best_candidates = np.take_along_axis(merged_ids, positions, axis=1)
+
+            self._replace_candidate_rows(db, candidate_ids.tolist(), pairs, job_skills)
+            written += len(pairs)
+
+        # Pairs that rank in a job's top-k but not in the candidate's own top-k
+        extra = []
+        for job_id, row_ids, row_best in zip(job_ids.tolist(), best_candidates, best_scores):
+            for candidate_id, similarity in zip(row_ids.tolist(), row_best.tolist()):
+                if candidate_id < 0 or similarity < self.min_similarity:
+                    continue
+                if job_id not in candidate_top_jobs.get(candidate_id, ()):
+                    extra.append((candidate_id, job_id, similarity))
+        self._insert_pairs(db, extra, job_skills)
+        written += len(extra)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Precomputed {written} match results in {elapsed:.1f}s")
+        return {
+            'candidates': len(candidate_top_jobs),
+            'jobs': job_count,
+            'match_results': written,
+            'block_rows': block_rows,
+            'seconds': round(elapsed, 2)
+        }
+
+    def _replace_candidate_rows(self,
+                                db: Session,
+                                candidate_ids: List[int],
+                                pairs: List[Tuple[int, int, float]],
+                                job_skills: Dict[int, List[str]]):
+        """Replace stored results of a block of candidates"""
+        db.execute(delete(MatchResult).where(MatchResult.candidate_id.in_(candidate_ids)))
+        self._insert_pairs(db, pairs, job_skills)
+
+    def _insert_pairs(self,
+                      db: Session,
+                      pairs: Iterable[Tuple[int, int, float]],
+                      job_skills: Dict[int, List[str]]):
+        """Bulk upsert (candidate_id, job_id, similarity) rows and commit"""
+        pairs = list(pairs)
+        for start in range(0, len(pairs), INSERT_BATCH_ROWS):
+            batch = pairs[start:start + INSERT_BATCH_ROWS]
+            candidate_skills = {
+                candidate.id: candidate.skills or []
+                for candidate in db.query(Candidate.id, Candidate.skills).filter(
+                    Candidate.id.in_(list({candidate_id for candidate_id, _, _ in batch}))
+                )
+            }
+            upsert_match_results(db, [
+                {
+                    'candidate_id': candidate_id,
+                    'job_id': job_id,
+                    'similarity_score': similarity,
+                    'skill_overlap': self.nlp_service.calculate_skill_overlap(
+                        candidate_skills.get(candidate_id, []),
+                        job_skills.get(job_id, [])
+                    )
+                }
+                for candidate_id, job_id, similarity in batch
+            ])
+        db.commit()
@@ -0,0 +1,156 @@
+"""
+Write-behind persistence of match results with batched upserts
+"""
+import threading
+import logging
+from typing import Dict, Iterable, List, Tuple
+from functools import lru_cache
+
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.database.connection import SessionLocal
+from backend.database.models import MatchResult
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rows per INSERT statement; 4 bind parameters each stays far below driver limits
+UPSERT_CHUNK_ROWS = 1000
+
+
+def upsert_match_results(db: Session, rows: List[Dict]):
+    """
+    Insert or update (candidate_id, job_id) rows with one multi-row
+    INSERT ... ON CONFLICT DO UPDATE per chunk. Does not commit.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        for row in rows:
+            db.merge(MatchResult(**row))
+        return
+
+    for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+        statement = insert(MatchResult).values(rows[start:start + UPSERT_CHUNK_ROWS])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[MatchResult.candidate_id, MatchResult.job_id],
+            set_={
+                'similarity_score': statement.excluded.similarity_score,
+                'skill_overlap': statement.excluded.skill_overlap
+            }
+        ))
+
+
+class MatchResultWriter:
+    """
+    Buffers match results from all requests, coalescing repeats of the same
+    (candidate_id, job_id) pair, and flushes them from a background thread
+    every MATCH_WRITE_FLUSH_SECONDS or once MATCH_WRITE_BATCH_SIZE rows are pending
+    """
+
+    def __init__(self,
+                 flush_interval: float = settings.MATCH_WRITE_FLUSH_SECONDS,
+                 batch_size: int = settings.MATCH_WRITE_BATCH_SIZE,
+                 max_pending: int = settings.MATCH_WRITE_MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[int, int], Dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._counters = {'submitted': 0, 'coalesced': 0, 'written': 0, 'flushes': 0, 'failed_flushes': 0, 'dropped': 0}
+
+    def start(self):
+        """Start the background flush thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="match-result-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write everything still pending"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def submit(self, rows: Iterable[Dict]):
+        """
+        Queue match result rows; returns without touching the database
+        """
+        with self._lock:
+            for row in rows:
+                key = (row['candidate_id'], row['job_id'])
+                if key in self._pending:
+                    self._counters['coalesced'] += 1
+                self._pending[key] = row
+                self._counters['submitted'] += 1
+            pending = len(self._pending)
+
+        if self._thread is None:
+            self.start()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all pending rows; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, {}
+            if not rows:
+                return 0
+
+            db = SessionLocal()
+            try:
+                upsert_match_results(db, list(rows.values()))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._requeue(rows)
+                self._counters['failed_flushes'] += 1
+                logger.error(f"Error flushing {len(rows)} match results: {e}")
+                return 0
+            finally:
+                db.close()
+
+            self._counters['written'] += len(rows)
+            self._counters['flushes'] += 1
+            return len(rows)
+
+    def _requeue(self, rows: Dict[Tuple[int, int], Dict]):
+        """Put back rows of a failed flush unless newer results replaced them"""
+        with self._lock:
+            for key, row in rows.items():
+                if len(self._pending) >= self.max_pending:
+                    self._counters['dropped'] += 1
+                    continue
+                self._pending.setdefault(key, row)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stats(self) -> Dict:
+        """Buffer counters"""
+        with self._lock:
+            return dict(self._counters, pending=len(self._pending))
+
+
+# Singleton instance
+@lru_cache()
+def get_match_writer() -> MatchResultWriter:
+    """Get singleton match result writer instance"""
+    return MatchResultWriter()
@@ -2,13 +2,22 @@
 Matching Service for candidate-job matching using embeddings
 """
 from typing import List, Dict, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import numpy as np
 import logging
 from functools import lru_cache
 
-from backend.database.models import Candidate, Job, Embedding, MatchResult
-from backend.services.embedding_service import get_embedding_service
+from backend.database.models import Candidate, Job, Embedding
+from backend.services.vector_index import get_embedding_index, entity_attributes, CANDIDATE, JOB, SEARCH_EXACT
+from backend.services.hybrid_ranking import encode_skills
 from backend.services.nlp_service import NLPService
+from backend.services.match_writer import get_match_writer
+from backend.services.match_cache import get_match_cache
+from backend.services.shard_pool import get_shard_pool
+from backend.services.scatter_gather import get_node_search_client
+from backend.services.pgvector_search import get_pgvector_search
 
 logger = logging.getLogger(__name__)
 
@@ -17,74 +26,66 @@ class MatchingService:
     """Service for matching candidates with jobs"""
     
     def __init__(self):
-        self.embedding_service = get_embedding_service()
+        self.index = get_embedding_index()
         self.nlp_service = NLPService()
-        self._match_cache = {}
+        self.match_writer = get_match_writer()
+        self.match_cache = get_match_cache()
+        self.shard_pool = get_shard_pool()
+        self.node_client = get_node_search_client()
+        self.pgvector = get_pgvector_search()
     
     def match_candidate_to_jobs(self, 
                                 db: Session,
                                 candidate_id: int,
                                 top_k: int = 10,
-                                min_similarity: float = 0.5) -> List[Dict]:
+                                min_similarity: float = 0.5,
+                                search_mode: Optional[str] = None,
+                                nprobe: Optional[int] = None,
+                                filters: Optional[Dict] = None) -> List[Dict]:
         """
         Find top matching jobs for a candidate
+        
+        `search_mode`/`nprobe` override MATCH_SEARCH_MODE/IVF_NPROBE per request.
+        `filters` restrict the jobs searched, e.g. {'job_type': 'full-time', 'min_experience': 3}.
+        With VECTOR_BACKEND=pgvector the search runs in the database unless a search_mode is given.
         """
         try:
-            # Get candidate and embedding
+            if self.pgvector.enabled and search_mode is None:
+                return self._match_in_database(db, CANDIDATE, candidate_id, top_k, min_similarity, filters)
+            self.index.ensure_loaded(db)
+            cache_key = self._cache_key(CANDIDATE, candidate_id, top_k, min_similarity, search_mode, nprobe, filters)
+            cached = self.match_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Get candidate
             candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
             if not candidate:
                 logger.error(f"Candidate {candidate_id} not found")
                 return []
             
-            candidate_embedding = db.query(Embedding).filter(
-                Embedding.candidate_id == candidate_id
-            ).first()
+            candidate_vector = self.index.candidates.get_vector(candidate_id)
             
-            if not candidate_embedding:
+            if candidate_vector is None:
                 logger.error(f"No embedding found for candidate {candidate_id}")
                 return []
             
-            # Get all job embeddings
-            job_embeddings = db.query(Embedding).filter(
-                Embedding.job_id.isnot(None)
-            ).all()
-            
-            matches = []
-            for job_emb in job_embeddings:
-                job = db.query(Job).filter(Job.id == job_emb.job_id).first()
-                if not job:
-                    continue
-                
-                # Calculate similarity
-                similarity = self.embedding_service.cosine_similarity(
-                    candidate_embedding.embedding_vector,
-                    job_emb.embedding_vector
-                )
-                
-                if similarity >= min_similarity:
-                    # Calculate skill overlap
-                    skill_overlap = self.nlp_service.calculate_skill_overlap(
-                        candidate.skills or [],
-                        job.required_skills or []
-                    )
-                    
-                    matches.append({
-                        'job_id': job.id,
-                        'job_title': job.title,
-                        'company': job.company,
-                        'similarity_score': round(similarity * 100, 2),
-                        'skill_overlap': skill_overlap,
-                        'location': job.location,
-                        'job_type': job.job_type
-                    })
-            
-            # Sort by similarity score
-            matches.sort(key=lambda x: x['similarity_score'], reverse=True)
+            # Rank all jobs in one pass over the index
+            hits = self.shard_pool.search(
+                self.index.jobs, candidate_vector, top_k, min_similarity, search_mode, nprobe, filters,
+                query_attributes=self.index.candidates.row_attributes(candidate_id)
+            )
+            jobs = self._load_by_id(db, Job, [job_id for job_id, _, _ in hits])
+            matches = [
+                self._job_match(candidate, jobs[job_id], similarity, score)
+                for job_id, similarity, score in hits if job_id in jobs
+            ]
             
             # Store top matches in database
-            self._store_match_results(db, candidate_id, matches[:top_k])
+            self._store_match_results(candidate_id, matches)
+            self.match_cache.put(cache_key, matches)
             
-            return matches[:top_k]
+            return matches
         
         except Exception as e:
             logger.error(f"Error matching candidate to jobs: {e}")
@@ -94,123 +95,381 @@ class MatchingService:
                                 db: Session,
                                 job_id: int,
                                 top_k: int = 10,
-                                min_similarity: float = 0.5) -> List[Dict]:
+                                min_similarity: float = 0.5,
+                                search_mode: Optional[str] = None,
+                                nprobe: Optional[int] = None,
+                                filters: Optional[Dict] = None) -> List[Dict]:
         """
         Find top matching candidates for a job
+        
+        `search_mode`/`nprobe` override MATCH_SEARCH_MODE/IVF_NPROBE per request.
+        `filters` restrict the candidates searched, e.g. {'min_experience': 5}.
+        With VECTOR_BACKEND=pgvector the search runs in the database unless a search_mode is given.
         """
         try:
-            # Get job and embedding
+            if self.pgvector.enabled and search_mode is None:
+                return self._match_in_database(db, JOB, job_id, top_k, min_similarity, filters)
+            self.index.ensure_loaded(db)
+            cache_key = self._cache_key(JOB, job_id, top_k, min_similarity, search_mode, nprobe, filters)
+            cached = self.match_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Get job
             job = db.query(Job).filter(Job.id == job_id).first()
             if not job:
                 logger.error(f"Job {job_id} not found")
                 return []
             
-            job_embedding = db.query(Embedding).filter(
-                Embedding.job_id == job_id
-            ).first()
+            job_vector = self.index.jobs.get_vector(job_id)
             
-            if not job_embedding:
+            if job_vector is None:
                 logger.error(f"No embedding found for job {job_id}")
                 return []
             
-            # Get all candidate embeddings
-            candidate_embeddings = db.query(Embedding).filter(
-                Embedding.candidate_id.isnot(None)
-            ).all()
-            
-            matches = []
-            for cand_emb in candidate_embeddings:
-                candidate = db.query(Candidate).filter(
-                    Candidate.id == cand_emb.candidate_id
-                ).first()
-                if not candidate:
-                    continue
-                
-                # Calculate similarity
-                similarity = self.embedding_service.cosine_similarity(
-                    job_embedding.embedding_vector,
-                    cand_emb.embedding_vector
-                )
-                
-                if similarity >= min_similarity:
-                    # Calculate skill overlap
-                    skill_overlap = self.nlp_service.calculate_skill_overlap(
-                        candidate.skills or [],
-                        job.required_skills or []
-                    )
-                    
-                    matches.append({
-                        'candidate_id': candidate.id,
-                        'candidate_name': candidate.name,
-                        'email': candidate.email,
-                        'similarity_score': round(similarity * 100, 2),
-                        'skill_overlap': skill_overlap,
-                        'experience_years': candidate.experience_years
-                    })
-            
-            # Sort by similarity score
-            matches.sort(key=lambda x: x['similarity_score'], reverse=True)
+            # Rank all candidates in one pass over the index
+            hits = self.shard_pool.search(
+                self.index.candidates, job_vector, top_k, min_similarity, search_mode, nprobe, filters,
+                query_attributes=self.index.jobs.row_attributes(job_id)
+            )
+            candidates = self._load_by_id(db, Candidate, [candidate_id for candidate_id, _, _ in hits])
+            matches = [
+                self._candidate_match(job, candidates[candidate_id], similarity, score)
+                for candidate_id, similarity, score in hits if candidate_id in candidates
+            ]
             
             # Store top matches in database
-            self._store_match_results(db, None, matches[:top_k], job_id=job_id)
+            self._store_match_results(None, matches, job_id=job_id)
+            self.match_cache.put(cache_key, matches)
             
-            return matches[:top_k]
+            return matches
         
         except Exception as e:
             logger.error(f"Error matching job to candidates: {e}")
             raise
     
-    def _store_match_results(self, 
-                            db: Session,
-                            candidate_id: Optional[int] = None,
-                            matches: List[Dict] = None,
-                            job_id: Optional[int] = None):
+    def _match_in_database(self,
+                           db: Session,
+                           query_type: str,
+                           entity_id: int,
+                           top_k: int,
+                           min_similarity: float,
+                           filters: Optional[Dict] = None) -> List[Dict]:
         """
-        Store match results in database
+        Match one candidate (query_type="candidate") or job with a pgvector
+        query. Not cached: other workers' writes are visible to the query
+        immediately but would not invalidate this worker's cache.
+        """
+        model, other = (Candidate, Job) if query_type == CANDIDATE else (Job, Candidate)
+        entity = db.query(model).filter(model.id == entity_id).first()
+        if not entity:
+            logger.error(f"{model.__name__} {entity_id} not found")
+            return []
+        
+        vector = self.pgvector.query_vector(db, query_type, entity_id)
+        if vector is None:
+            logger.error(f"No embedding found for {query_type} {entity_id}")
+            return []
+        
+        attributes = entity_attributes(query_type, entity)
+        hits = self.pgvector.search(
+            db, JOB if query_type == CANDIDATE else CANDIDATE, vector, top_k, min_similarity, filters,
+            query_attributes=self._query_attributes(attributes['skills'], attributes['experience'])
+        )
+        others = self._load_by_id(db, other, [hit[0] for hit in hits])
+        if query_type == CANDIDATE:
+            matches = [
+                self._job_match(entity, others[job_id], similarity, score)
+                for job_id, similarity, score in hits if job_id in others
+            ]
+            self._store_match_results(entity_id, matches)
+        else:
+            matches = [
+                self._candidate_match(entity, others[candidate_id], similarity, score)
+                for candidate_id, similarity, score in hits if candidate_id in others
+            ]
+            self._store_match_results(None, matches, job_id=entity_id)
+        return matches
+    
+    def match_batch(self,
+                    db: Session,
+                    query_type: str,
+                    ids: List[int],
+                    top_k: int = 10,
+                    min_similarity: float = 0.5,
+                    filters: Optional[Dict] = None) -> Dict:
+        """
+        Match many candidates (query_type="candidate") or jobs (query_type="job")
+        with one blocked matrix-matrix product over their stacked vectors
         """
         try:
-            if candidate_id and matches:
-                for match in matches:
-                    existing = db.query(MatchResult).filter(
-                        MatchResult.candidate_id == candidate_id,
-                        MatchResult.job_id == match['job_id']
-                    ).first()
-                    
-                    if existing:
-                        existing.similarity_score = match['similarity_score'] / 100
-                        existing.skill_overlap = match['skill_overlap']
-                    else:
-                        new_match = MatchResult(
-                            candidate_id=candidate_id,
-                            job_id=match['job_id'],
-                            similarity_score=match['similarity_score'] / 100,
-                            skill_overlap=match['skill_overlap']
-                        )
-                        db.add(new_match)
-            
-            elif job_id and matches:
-                for match in matches:
-                    existing = db.query(MatchResult).filter(
-                        MatchResult.candidate_id == match['candidate_id'],
-                        MatchResult.job_id == job_id
-                    ).first()
+            self.index.ensure_loaded(db)
+            source = self.index.partition(query_type)
+            target = self.index.jobs if query_type == CANDIDATE else self.index.candidates
+            
+            ids = list(dict.fromkeys(ids))
+            found, vectors = [], []
+            for entity_id in ids:
+                vector = source.get_vector(entity_id)
+                if vector is not None:
+                    found.append(entity_id)
+                    vectors.append(vector)
+            indexed = set(found)
+            missing = [entity_id for entity_id in ids if entity_id not in indexed]
+            if not found:
+                return {'results': [], 'missing_ids': missing}
+            
+            # Serve cached entries; search the rest in one blocked pass
+            cache_keys, cached = {}, {}
+            for entity_id in found:
+                cache_keys[entity_id] = self._cache_key(
+                    query_type, entity_id, top_k, min_similarity, SEARCH_EXACT, None, filters
+                )
+                matches = self.match_cache.get(cache_keys[entity_id])
+                if matches is not None:
+                    cached[entity_id] = matches
+            
+            searched = [(entity_id, vector) for entity_id, vector in zip(found, vectors) if entity_id not in cached]
+            hits_by_id = {}
+            if searched:
+                hits_per_query = target.search_batch(
+                    np.stack([vector for _, vector in searched]), top_k, min_similarity, filters,
+                    query_attributes=[source.row_attributes(entity_id) for entity_id, _ in searched]
+                )
+                hits_by_id = dict(zip([entity_id for entity_id, _ in searched], hits_per_query))
+            hit_ids = {hit[0] for hits in hits_by_id.values() for hit in hits}
+            
+            if query_type == CANDIDATE:
+                queries = self._load_by_id(db, Candidate, hits_by_id)
+                others = self._load_by_id(db, Job, hit_ids)
+            else:
+                queries = self._load_by_id(db, Job, hits_by_id)
+                others = self._load_by_id(db, Candidate, hit_ids)
+            
+            results = []
+            for entity_id in found:
+                matches = cached.get(entity_id)
+                if matches is None:
+                    entity = queries.get(entity_id)
+                    if not entity:
+                        missing.append(entity_id)
+                        continue
                     
-                    if existing:
-                        existing.similarity_score = match['similarity_score'] / 100
-                        existing.skill_overlap = match['skill_overlap']
+                    hits = hits_by_id[entity_id]
+                    if query_type == CANDIDATE:
+                        matches = [
+                            self._job_match(entity, others[job_id], similarity, score)
+                            for job_id, similarity, score in hits if job_id in others
+                        ]
+                        self._store_match_results(entity_id, matches)
                     else:
-                        new_match = MatchResult(
-                            candidate_id=match['candidate_id'],
-                            job_id=job_id,
-                            similarity_score=match['similarity_score'] / 100,
-                            skill_overlap=match['skill_overlap']
-                        )
-                        db.add(new_match)
-            
-            db.commit()
+                        matches = [
+                            self._candidate_match(entity, others[candidate_id], similarity, score)
+                            for candidate_id, similarity, score in hits if candidate_id in others
+                        ]
+                        self._store_match_results(None, matches, job_id=entity_id)
+                    self.match_cache.put(cache_keys[entity_id], matches)
+                
+                id_field = 'candidate_id' if query_type == CANDIDATE else 'job_id'
+                results.append({id_field: entity_id, 'total_matches': len(matches), 'matches': matches})
+            
+            return {'results': results, 'missing_ids': missing}
+        
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error storing match results: {e}")
+            logger.error(f"Error batch matching {query_type}s: {e}")
+            raise
+    
+    def search_shard(self,
+                     db: Session,
+                     kind: str,
+                     vector: List[float],
+                     top_k: int = 10,
+                     min_similarity: float = 0.5,
+                     search_mode: Optional[str] = None,
+                     nprobe: Optional[int] = None,
+                     filters: Optional[Dict] = None,
+                     skills: Optional[List[str]] = None,
+                     experience: Optional[float] = None) -> List[tuple]:
+        """
+        Search this node's shard of a partition for a coordinator's query
+        vector; `skills`/`experience` of the query entity enable hybrid ranking
+        """
+        self.index.ensure_loaded(db)
+        query_attributes = None
+        if skills is not None or experience is not None:
+            query_attributes = self._query_attributes(skills, experience)
+        return self.shard_pool.search(
+            self.index.partition(kind), np.asarray(vector, dtype=np.float32),
+            top_k, min_similarity, search_mode, nprobe, filters, query_attributes
+        )
+    
+    async def match_distributed(self,
+                                db: AsyncSession,
+                                query_type: str,
+                                entity_id: int,
+                                top_k: int = 10,
+                                min_similarity: float = 0.5,
+                                search_mode: Optional[str] = None,
+                                nprobe: Optional[int] = None,
+                                filters: Optional[Dict] = None,
+                                headers: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Match a candidate (query_type="candidate") or job across all matcher
+        nodes. Returns None if the entity does not exist, otherwise the
+        matches plus which nodes answered (see NodeSearchClient.search).
+        Only awaits I/O, so it runs on the event loop.
+        """
+        try:
+            model, other = (Candidate, Job) if query_type == CANDIDATE else (Job, Candidate)
+            entity = await db.get(model, entity_id)
+            if not entity:
+                logger.error(f"{model.__name__} {entity_id} not found")
+                return None
+            
+            vector = await self._query_vector(db, query_type, entity_id)
+            if vector is None:
+                logger.error(f"No embedding found for {query_type} {entity_id}")
+                return {'matches': []}
+            
+            attributes = entity_attributes(query_type, entity)
+            hits, report = await self.node_client.search({
+                'kind': JOB if query_type == CANDIDATE else CANDIDATE,
+                'vector': vector.tolist(),
+                'top_k': top_k,
+                'min_similarity': min_similarity,
+                'search_mode': search_mode,
+                'nprobe': nprobe,
+                'filters': {key: value for key, value in (filters or {}).items() if value is not None},
+                'skills': attributes['skills'] or [],
+                'experience': attributes['experience']
+            }, headers)
+            
+            others = {}
+            if hits:
+                rows = await db.scalars(select(other).where(other.id.in_([hit[0] for hit in hits])))
+                others = {row.id: row for row in rows}
+            if query_type == CANDIDATE:
+                matches = [
+                    self._job_match(entity, others[job_id], similarity, score)
+                    for job_id, similarity, score in hits if job_id in others
+                ]
+                self._store_match_results(entity_id, matches)
+            else:
+                matches = [
+                    self._candidate_match(entity, others[candidate_id], similarity, score)
+                    for candidate_id, similarity, score in hits if candidate_id in others
+                ]
+                self._store_match_results(None, matches, job_id=entity_id)
+            
+            return dict(report, matches=matches)
+        
+        except Exception as e:
+            logger.error(f"Error matching {query_type} across nodes: {e}")
+            raise
+    
+    async def _query_vector(self, db: AsyncSession, kind: str, entity_id: int) -> Optional[np.ndarray]:
+        """
+        Indexed vector of an entity, else its latest stored embedding
+        (entities of other matcher shards, or an index not loaded here)
+        """
+        vector = self.index.partition(kind).get_vector(entity_id)
+        if vector is not None:
+            return vector
+        column = Embedding.candidate_id if kind == CANDIDATE else Embedding.job_id
+        stored = await db.scalar(
+            select(Embedding.embedding_vector).where(column == entity_id).order_by(Embedding.id.desc()).limit(1)
+        )
+        if stored is None:
+            return None
+        return np.asarray(stored, dtype=np.float32)
+    
+    def _cache_key(self,
+                   query_type: str,
+                   entity_id: int,
+                   top_k: int,
+                   min_similarity: float,
+                   search_mode: Optional[str],
+                   nprobe: Optional[int],
+                   filters: Optional[Dict] = None) -> tuple:
+        """
+        Cache key for one match list. It carries the version of the searched
+        partition and the version of the query entity's own vector, so a new
+        job only invalidates candidate->jobs lists plus that job's own list,
+        and a new candidate only job->candidates lists plus its own.
+        """
+        source = self.index.partition(query_type)
+        target = self.index.jobs if query_type == CANDIDATE else self.index.candidates
+        return (
+            query_type, entity_id, top_k, min_similarity, search_mode, nprobe,
+            tuple(sorted((key, value) for key, value in (filters or {}).items() if value is not None)),
+            target.version, source.entity_version(entity_id)
+        )
+    
+    @staticmethod
+    def _query_attributes(skills: Optional[List[str]], experience: Optional[float]) -> Dict:
+        """Hybrid ranking attributes of a query entity"""
+        return {
+            'skills': encode_skills(skills),
+            'experience': np.nan if experience is None else float(experience)
+        }
+    
+    @staticmethod
+    def _load_by_id(db: Session, model, ids) -> Dict:
+        """Fetch rows of a model for many ids in one query"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        return {row.id: row for row in db.query(model).filter(model.id.in_(ids))}
+    
+    def _job_match(self, candidate: Candidate, job: Job, similarity: float, score: float) -> Dict:
+        """Match entry describing a job for a candidate"""
+        return {
+            'job_id': job.id,
+            'job_title': job.title,
+            'company': job.company,
+            'similarity_score': round(similarity * 100, 2),
+            'match_score': round(score * 100, 2),
+            'skill_overlap': self.nlp_service.calculate_skill_overlap(
+                candidate.skills or [],
+                job.required_skills or []
+            ),
+            'location': job.location,
+            'job_type': job.job_type
+        }
+    
+    def _candidate_match(self, job: Job, candidate: Candidate, similarity: float, score: float) -> Dict:
+        """Match entry describing a candidate for a job"""
+        return {
+            'candidate_id': candidate.id,
+            'candidate_name': candidate.name,
+            'email': candidate.email,
+            'similarity_score': round(similarity * 100, 2),
+            'match_score': round(score * 100, 2),
+            'skill_overlap': self.nlp_service.calculate_skill_overlap(
+                candidate.skills or [],
+                job.required_skills or []
+            ),
+            'experience_years': candidate.experience_years
+        }
+    
+    def _store_match_results(self,
+                            candidate_id: Optional[int] = None,
+                            matches: List[Dict] = None,
+                            job_id: Optional[int] = None):
+        """
+        Queue match results for the write-behind writer; the request does not wait on the database
+        """
+        if not matches:
+            return
+        self.match_writer.submit(
+            {
+                'candidate_id': candidate_id or match['candidate_id'],
+                'job_id': job_id or match['job_id'],
+                'similarity_score': match['similarity_score'] / 100,
+                'skill_overlap': match['skill_overlap']
+            }
+            for match in matches
+        )
 
 
 # Singleton instance
@@ -33,13 +33,13 @@ class NLPService:
         text_lower = text.lower()
         found_skills = []
         
-        for skill in NLPService.COMMON_SKILLS:
+        for skill in sorted(NLPService.COMMON_SKILLS):
             # Use word boundaries for accurate matching
             pattern = r'\b' + re.escape(skill.lower()) + r'\b'
             if re.search(pattern, text_lower):
                 found_skills.append(skill.title())
         
-        return list(set(found_skills))  # Remove duplicates
+        return list(dict.fromkeys(found_skills))  # Remove duplicates
     
     @staticmethod
     def extract_experience_years(text: str) -> float:
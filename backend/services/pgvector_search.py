@@ -0,0 +1,155 @@
+"""
+In-database top-k search over the pgvector embedding column
+"""
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, func, text
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.database.connection import engine
+from backend.database.models import Candidate, Job, Embedding
+from backend.database.types import VECTOR_PGVECTOR, uses_pgvector
+from backend.services.hybrid_ranking import encode_skills
+from backend.services.vector_index import (
+    ROW_ATTRIBUTES, NUMERIC_ATTRIBUTES, SUBSTRING_ATTRIBUTES, BITSET_ATTRIBUTES,
+    CANDIDATE, JOB, match_scores, top_k_rows
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PgVectorSearch:
+    """
+    Ranks jobs or candidates with one `ORDER BY embedding_vector <=> :query
+    LIMIT n` query per search, served by the partial HNSW/IVFFlat indexes
+    (see migrations.add_pgvector_indexes) with the structured filters in the
+    WHERE clause. Enabled by VECTOR_BACKEND=pgvector on PostgreSQL; the
+    in-memory index stays the fallback everywhere else.
+    """
+
+    def __init__(self):
+        self.enabled = uses_pgvector(engine.dialect)
+        if settings.VECTOR_BACKEND == VECTOR_PGVECTOR and not self.enabled:
+            logger.warning("VECTOR_BACKEND=pgvector needs PostgreSQL; matching uses the in-memory index")
+
+    @staticmethod
+    def _partition(kind: str):
+        """Entity model and its embedding foreign key"""
+        if kind == JOB:
+            return Job, Embedding.job_id
+        if kind == CANDIDATE:
+            return Candidate, Embedding.candidate_id
+        raise ValueError(f"Unknown index partition: {kind}")
+
+    def query_vector(self, db: Session, kind: str, entity_id: int) -> Optional[np.ndarray]:
+        """Latest stored embedding of an entity"""
+        _, column = self._partition(kind)
+        return db.query(Embedding.embedding_vector).filter(
+            column == entity_id
+        ).order_by(Embedding.id.desc()).limit(1).scalar()
+
+    @staticmethod
+    def sql_filters(kind: str, filters: Optional[Dict]) -> list:
+        """
+        WHERE conditions for the same filters IndexPartition.compile_filters
+        accepts: attribute names (case-insensitive equality, substring for
+        location) or min_<name>/max_<name> for numeric attributes
+        """
+        columns = ROW_ATTRIBUTES[kind]
+        conditions = []
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            name = key[4:] if key.startswith(("min_", "max_")) else key
+            is_range = name != key
+            if (name not in columns or name in BITSET_ATTRIBUTES
+                    or is_range != (name in NUMERIC_ATTRIBUTES)):
+                raise ValueError(f"Unsupported {kind} filter: {key}")
+
+            column = columns[name]
+            if name in NUMERIC_ATTRIBUTES:
+                # NULL compares false and is filtered out, like NaN in the index
+                conditions.append(column >= float(value) if key.startswith("min_") else column <= float(value))
+                continue
+            normalized = func.lower(func.trim(column))
+            value = str(value).strip().lower()
+            if name in SUBSTRING_ATTRIBUTES:
+                conditions.append(normalized.contains(value, autoescape=True))
+            else:
+                conditions.append(normalized == value)
+        return conditions
+
+    def _configure_scan(self, db: Session, limit: int):
+        """Transaction-local index scan breadth; HNSW returns at most ef_search rows"""
+        if settings.PGVECTOR_INDEX == "hnsw":
+            ef_search = min(1000, max(settings.PGVECTOR_EF_SEARCH, limit))
+            db.execute(text("SELECT set_config('hnsw.ef_search', :value, true)"), {'value': str(ef_search)})
+        else:
+            db.execute(
+                text("SELECT set_config('ivfflat.probes', :value, true)"),
+                {'value': str(settings.PGVECTOR_IVFFLAT_PROBES)}
+            )
+
+    def search(self,
+               db: Session,
+               kind: str,
+               query: np.ndarray,
+               top_k: int = 10,
+               min_similarity: float = 0.5,
+               filters: Optional[Dict] = None,
+               query_attributes: Optional[Dict] = None) -> List[Tuple[int, float, float]]:
+        """
+        (entity_id, cosine similarity, match score) of the best `top_k` rows
+        of a partition, like IndexPartition.search. With `query_attributes`,
+        top_k * PGVECTOR_RERANK_FACTOR rows are fetched by cosine distance and
+        ordered by hybrid match score.
+        """
+        model, column = self._partition(kind)
+        attribute_columns = ROW_ATTRIBUTES[kind]
+        limit = top_k * max(1, settings.PGVECTOR_RERANK_FACTOR) if query_attributes is not None else top_k
+
+        distance = Embedding.embedding_vector.op("<=>", return_type=Float)(query)
+        self._configure_scan(db, limit)
+        rows = db.query(
+            column, distance, *attribute_columns.values()
+        ).join(
+            model, model.id == column
+        ).filter(
+            column.isnot(None), *self.sql_filters(kind, filters)
+        ).order_by(distance).limit(limit).all()
+
+        # An entity with several embeddings keeps its closest one
+        seen, ids, similarity, values = set(), [], [], []
+        for entity_id, row_distance, *row_values in rows:
+            if entity_id in seen:
+                continue
+            seen.add(entity_id)
+            ids.append(entity_id)
+            similarity.append(1.0 - row_distance)
+            values.append(dict(zip(attribute_columns, row_values)))
+        if not ids:
+            return []
+
+        similarity = np.array(similarity, dtype=np.float32)
+        scores = similarity
+        if query_attributes is not None:
+            skills = np.stack([encode_skills(row['skills']) for row in values])
+            experience = np.array(
+                [np.nan if row['experience'] is None else row['experience'] for row in values], dtype=np.float32
+            )
+            scores = match_scores(kind, similarity, skills, experience, query_attributes)
+
+        best = top_k_rows(similarity, top_k, min_similarity, ranking=scores)
+        return [(ids[row], float(similarity[row]), float(scores[row])) for row in best]
+
+
+# Singleton instance
+@lru_cache()
+def get_pgvector_search() -> PgVectorSearch:
+    """Get singleton pgvector search instance"""
+    return PgVectorSearch()
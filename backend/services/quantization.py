@@ -0,0 +1,143 @@
+"""
+Compressed vector codes for first-stage scoring: int8 scalar and product quantization
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANT_INT8 = "int8"
+QUANT_PQ = "pq"
+
+# Code rows decoded per step while scoring; small enough for the decoded
+# float32 block to stay in cache for the product that follows
+SCORE_BLOCK_ROWS = 4096
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    """
+    Euclidean k-means returning (k, dim) float32 centroids
+    """
+    rng = np.random.default_rng(seed)
+    k = max(1, min(k, len(vectors)))
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        distances = (centroids ** 2).sum(axis=1) - 2 * vectors @ centroids.T
+        assignments = np.argmin(distances, axis=1)
+        counts = np.bincount(assignments, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+
+        # Re-seed empty clusters with random points
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+            counts[empty] = 1
+        centroids = (sums / counts[:, None]).astype(np.float32)
+
+    return centroids
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension affine int8 codes: x[d] ~ offset[d] + scale[d] * code[d].
+    4x smaller than float32; scores are one float32 product per decoded block.
+    """
+
+    name = QUANT_INT8
+
+    def __init__(self):
+        self.offset = None
+        self.scale = None
+        self.trained_rows = 0
+
+    def train(self, vectors: np.ndarray):
+        """Fit each dimension's range to the training vectors"""
+        low, high = vectors.min(axis=0), vectors.max(axis=0)
+        self.scale = np.maximum((high - low) / 255.0, 1e-12).astype(np.float32)
+        self.offset = (low + 128.0 * self.scale).astype(np.float32)
+        self.trained_rows = len(vectors)
+
+    def code_shape(self, dim: int) -> tuple:
+        return (dim,)
+
+    @property
+    def code_dtype(self):
+        return np.int8
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """int8 codes of (rows, dim) vectors; values outside the trained range are clipped"""
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, -128, 127).astype(np.int8)
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products of all coded rows with a query"""
+        weights = (query * self.scale).astype(np.float32)
+        bias = np.float32(query @ self.offset)
+        scores = np.empty(len(codes), dtype=np.float32)
+        decoded = np.empty((min(len(codes), SCORE_BLOCK_ROWS), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS]
+            np.copyto(decoded[:len(block)], block, casting="unsafe")
+            scores[start:start + len(block)] = decoded[:len(block)] @ weights
+        return scores + bias
+
+
+class ProductQuantizer:
+    """
+    Splits vectors into `subvectors` equal chunks and stores each chunk as the
+    uint8 id of its nearest of 256 k-means centroids. Scores are summed from a
+    per-query (subvectors, 256) lookup table (asymmetric distance computation).
+    """
+
+    name = QUANT_PQ
+    CENTROIDS = 256
+
+    def __init__(self, subvectors: int = 96, iterations: int = 8):
+        self.subvectors = subvectors
+        self.iterations = iterations
+        self.codebooks = None  # (subvectors, 256, dim / subvectors)
+        self.trained_rows = 0
+
+    def train(self, vectors: np.ndarray):
+        """Learn one codebook per subvector"""
+        dim = vectors.shape[1]
+        if dim % self.subvectors:
+            raise ValueError(f"PQ_SUBVECTORS={self.subvectors} must divide the embedding dimension {dim}")
+        chunks = vectors.reshape(len(vectors), self.subvectors, -1)
+        self.codebooks = np.stack([
+            kmeans(chunks[:, part], self.CENTROIDS, self.iterations, seed=part)
+            for part in range(self.subvectors)
+        ])
+        self.trained_rows = len(vectors)
+        logger.info(f"PQ trained: {self.subvectors} subvectors over {len(vectors)} rows")
+
+    def code_shape(self, dim: int) -> tuple:
+        return (self.subvectors,)
+
+    @property
+    def code_dtype(self):
+        return np.uint8
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """uint8 centroid ids per subvector of (rows, dim) vectors"""
+        chunks = vectors.reshape(len(vectors), self.subvectors, -1)
+        codes = np.empty((len(vectors), self.subvectors), dtype=np.uint8)
+        for part, codebook in enumerate(self.codebooks):
+            distances = (codebook ** 2).sum(axis=1) - 2 * chunks[:, part] @ codebook.T
+            codes[:, part] = np.argmin(distances, axis=1)
+        return codes
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products of all coded rows with a query"""
+        table = np.einsum("pcd,pd->pc", self.codebooks, query.reshape(self.subvectors, -1))
+        # Offset each subvector's ids into the flattened table
+        offsets = np.arange(self.subvectors, dtype=np.int32) * self.CENTROIDS
+        flat = table.astype(np.float32).ravel()
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = flat[block + offsets].sum(axis=1)
+        return scores
@@ -0,0 +1,99 @@
+"""
+Scatter-gather search over matcher nodes that each index one shard of the id space
+"""
+import asyncio
+import heapq
+import logging
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Node endpoint searching its local shard (backend/api/match.py)
+SHARD_SEARCH_PATH = "/match/shard/search"
+
+
+class NodeSearchClient:
+    """
+    Sends one query to every matcher node in parallel and merges the
+    per-node top-k lists. A node that errors or misses its deadline is
+    reported and left out, so the merged result is partial instead of failing.
+    """
+
+    def __init__(self,
+                 node_urls: Optional[List[str]] = None,
+                 timeout_seconds: float = settings.MATCH_NODE_TIMEOUT_SECONDS):
+        if node_urls is None:
+            node_urls = [url.strip().rstrip("/") for url in settings.MATCH_NODE_URLS.split(",") if url.strip()]
+        self.node_urls = node_urls
+        self.timeout_seconds = timeout_seconds
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.node_urls)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created on first use so connections are pooled on the serving event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+        return self._client
+
+    async def _search_node(self, url: str, payload: Dict, headers: Optional[Dict]) -> List[Tuple[int, float, float]]:
+        response = await self._get_client().post(f"{url}{SHARD_SEARCH_PATH}", json=payload, headers=headers)
+        response.raise_for_status()
+        return [tuple(hit) for hit in response.json()['hits']]
+
+    async def search(self,
+                     payload: Dict,
+                     headers: Optional[Dict] = None) -> Tuple[List[Tuple[int, float, float]], Dict]:
+        """
+        Merged (entity_id, similarity, match_score) hits of all nodes for a
+        shard search payload (see ShardSearchRequest), best first, plus a
+        report of which nodes answered
+        """
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._search_node(url, payload, headers), self.timeout_seconds)
+              for url in self.node_urls),
+            return_exceptions=True
+        )
+
+        ranked, failed = [], []
+        for url, result in zip(self.node_urls, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, (asyncio.TimeoutError, httpx.TimeoutException)):
+                    reason = f"timed out after {self.timeout_seconds}s"
+                else:
+                    reason = str(result) or type(result).__name__
+                logger.warning(f"Matcher node {url} left out: {reason}")
+                failed.append({'node': url, 'error': reason})
+            else:
+                ranked.append(result)
+
+        hits = list(islice(heapq.merge(*ranked, key=itemgetter(2), reverse=True), payload['top_k']))
+        return hits, {
+            'nodes': len(self.node_urls),
+            'nodes_responded': len(ranked),
+            'failed_nodes': failed,
+            'partial': bool(failed)
+        }
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance
+@lru_cache()
+def get_node_search_client() -> NodeSearchClient:
+    """Get singleton node search client instance"""
+    return NodeSearchClient()
@@ -0,0 +1,298 @@
+"""
+Multi-process sharded exact search over shared memory
+"""
+import heapq
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import shared_memory
+from operator import itemgetter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.services.vector_index import (
+    IndexPartition, SEARCH_EXACT, apply_filters, match_scores, normalize_rows, top_k_rows
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Byte alignment of the arrays packed into one shard segment
+SEGMENT_ALIGNMENT = 64
+
+
+class ShardLayout(NamedTuple):
+    """Where a shard's arrays live: segment name, row count and (key, offset, dtype, shape) per array"""
+    name: str
+    rows: int
+    arrays: Tuple[Tuple[str, int, str, tuple], ...]
+
+
+def _create_segment(chunk: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, ShardLayout]:
+    """Copy a shard's arrays into one new shared memory segment"""
+    arrays, size = [], 0
+    for key, values in chunk.items():
+        size = -(-size // SEGMENT_ALIGNMENT) * SEGMENT_ALIGNMENT
+        arrays.append((key, size, values.dtype.str, values.shape))
+        size += values.nbytes
+
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for key, offset, dtype, shape in arrays:
+        np.ndarray(shape, dtype, buffer=segment.buf, offset=offset)[...] = chunk[key]
+    return segment, ShardLayout(segment.name, len(chunk['ids']), tuple(arrays))
+
+
+# Segments attached in a worker process: (kind, shard) -> (segment name, segment, arrays)
+_attached: Dict[Tuple[str, int], tuple] = {}
+
+
+def _attach(kind: str, shard: int, layout: ShardLayout) -> Dict[str, np.ndarray]:
+    """Arrays of a shard segment, mapped once per worker and generation"""
+    cached = _attached.get((kind, shard))
+    if cached is not None and cached[0] == layout.name:
+        return cached[2]
+    if cached is not None:
+        # Views must go before the mapping can be closed
+        _, segment, arrays = _attached.pop((kind, shard))
+        arrays.clear()
+        segment.close()
+
+    segment = shared_memory.SharedMemory(name=layout.name)
+    arrays = {
+        key: np.ndarray(shape, dtype, buffer=segment.buf, offset=offset)
+        for key, offset, dtype, shape in layout.arrays
+    }
+    _attached[(kind, shard)] = (layout.name, segment, arrays)
+    return arrays
+
+
+def search_shard(kind: str,
+                 shard: int,
+                 layout: ShardLayout,
+                 query: np.ndarray,
+                 top_k: int,
+                 min_similarity: float,
+                 predicates: List[Tuple[str, str, object]],
+                 excluded: np.ndarray,
+                 query_attributes: Optional[Dict]) -> List[Tuple[int, float, float]]:
+    """
+    Worker task: local top-k of one shard as (entity_id, similarity, match_score)
+    tuples, best first. `excluded` ids are skipped.
+    """
+    arrays = _attach(kind, shard, layout)
+    if not layout.rows:
+        return []
+
+    scores = arrays['vectors'] @ query
+    mask = apply_filters(arrays, predicates, layout.rows) if predicates else None
+    if len(excluded):
+        keep = ~np.isin(arrays['ids'], excluded)
+        mask = keep if mask is None else mask & keep
+    if mask is not None:
+        scores[~mask] = -np.inf
+
+    ranking = match_scores(kind, scores, arrays['skills'], arrays['experience'], query_attributes)
+    best = top_k_rows(scores, top_k, min_similarity, ranking)
+    return list(zip(arrays['ids'][best].tolist(), scores[best].tolist(), ranking[best].tolist()))
+
+
+class _Generation:
+    """One published copy of a partition's live rows"""
+
+    def __init__(self, version: int, segments: List[shared_memory.SharedMemory], layouts: List[ShardLayout]):
+        self.version = version
+        self.segments = segments
+        self.layouts = layouts
+        self.published_at = time.monotonic()
+        self.readers = 0
+        self.retired = False
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+
+
+class ShardPool:
+    """
+    Exact search fanned out over worker processes. A partition's live rows are
+    copied into `shards` shared memory segments; every query is scored on all
+    shards in parallel and the per-shard top-k lists are merged with a heap.
+
+    Shard copies trail the index: entities changed since a copy are masked
+    out of shard results and rescored in-process, and the copy is rebuilt
+    once it is MATCH_SHARD_REFRESH_SECONDS old or the index was reloaded.
+    """
+
+    def __init__(self,
+                 shards: int = settings.MATCH_SHARDS,
+                 min_rows: int = settings.MATCH_SHARD_MIN_ROWS,
+                 refresh_seconds: float = settings.MATCH_SHARD_REFRESH_SECONDS):
+        self.shards = shards
+        self.min_rows = min_rows
+        self.refresh_seconds = refresh_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generations: Dict[str, _Generation] = {}
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+
+    def covers(self, partition: IndexPartition, search_mode: Optional[str] = None) -> bool:
+        """Whether searches of a partition in a mode go to the shards"""
+        search_mode = search_mode or settings.MATCH_SEARCH_MODE
+        return (
+            self.shards > 1
+            and len(partition) >= self.min_rows
+            and (search_mode == SEARCH_EXACT or len(partition) < settings.ANN_MIN_ROWS)
+        )
+
+    def search(self,
+               partition: IndexPartition,
+               query: np.ndarray,
+               top_k: int = 10,
+               min_similarity: float = 0.5,
+               search_mode: Optional[str] = None,
+               nprobe: Optional[int] = None,
+               filters: Optional[Dict] = None,
+               query_attributes: Optional[Dict] = None) -> List[Tuple[int, float, float]]:
+        """
+        Same contract as IndexPartition.search; searches not covered by the
+        shards (see covers) run in-process
+        """
+        if not self.covers(partition, search_mode):
+            return partition.search(query, top_k, min_similarity, search_mode, nprobe, filters, query_attributes)
+
+        query = normalize_rows(query)
+        predicates = partition.compile_filters(filters)
+        generation = self._acquire(partition)
+        try:
+            changed = partition.changed_since(generation.version)
+            if changed is None:
+                # Reloaded while acquiring; the next search republishes
+                return partition.search(query, top_k, min_similarity, SEARCH_EXACT, None, filters, query_attributes)
+
+            excluded = np.fromiter(changed, dtype=np.int64, count=len(changed))
+            executor = self._get_executor()
+            futures = [
+                executor.submit(search_shard, partition.kind, shard, layout, query, top_k,
+                                min_similarity, predicates, excluded, query_attributes)
+                for shard, layout in enumerate(generation.layouts)
+            ]
+            ranked = [future.result() for future in futures]
+        finally:
+            self._release(generation)
+
+        if changed:
+            ranked.append(partition.search_ids(changed, query, top_k, min_similarity, filters, query_attributes))
+        return list(islice(heapq.merge(*ranked, key=itemgetter(2), reverse=True), top_k))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process with live threads and open connections is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.shards, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _is_stale(self, partition: IndexPartition, generation: Optional[_Generation]) -> bool:
+        if generation is None:
+            return True
+        if generation.version == partition.version:
+            return False
+        return (
+            partition.changed_since(generation.version) is None
+            or time.monotonic() - generation.published_at >= self.refresh_seconds
+        )
+
+    def _acquire(self, partition: IndexPartition) -> _Generation:
+        """Current generation of a partition's shards, republished first when stale"""
+        generation = self._generations.get(partition.kind)
+        if self._is_stale(partition, generation):
+            # Other searches keep using a trailing copy while one republishes,
+            # unless there is none or the index was reloaded since
+            must_wait = generation is None or partition.changed_since(generation.version) is None
+            if self._publish_lock.acquire(blocking=must_wait):
+                try:
+                    if self._is_stale(partition, self._generations.get(partition.kind)):
+                        self._publish(partition)
+                finally:
+                    self._publish_lock.release()
+
+        with self._lock:
+            generation = self._generations[partition.kind]
+            generation.readers += 1
+            return generation
+
+    def _release(self, generation: _Generation):
+        with self._lock:
+            generation.readers -= 1
+            if generation.retired and generation.readers == 0:
+                generation.close()
+
+    def _publish(self, partition: IndexPartition):
+        """Copy the partition's live rows into new shard segments"""
+        started = time.perf_counter()
+        version, chunks = partition.split_live(self.shards)
+        segments, layouts = [], []
+        try:
+            for chunk in chunks:
+                segment, layout = _create_segment(chunk)
+                segments.append(segment)
+                layouts.append(layout)
+        except Exception:
+            _Generation(version, segments, layouts).close()
+            raise
+
+        generation = _Generation(version, segments, layouts)
+        with self._lock:
+            previous = self._generations.get(partition.kind)
+            self._generations[partition.kind] = generation
+            if previous is not None:
+                previous.retired = True
+                if previous.readers == 0:
+                    previous.close()
+        logger.info(
+            f"Published {partition.kind} index to {self.shards} shards: "
+            f"{sum(layout.rows for layout in layouts)} rows in {time.perf_counter() - started:.2f}s"
+        )
+
+    def stats(self) -> Dict:
+        """Shard count and the version, size and age of each published partition"""
+        with self._lock:
+            return {
+                'shards': self.shards,
+                'min_rows': self.min_rows,
+                'partitions': {
+                    kind: {
+                        'version': generation.version,
+                        'rows': sum(layout.rows for layout in generation.layouts),
+                        'age_seconds': round(time.monotonic() - generation.published_at, 1)
+                    }
+                    for kind, generation in self._generations.items()
+                }
+            }
+
+    def close(self):
+        """Stop the workers and release every shard segment"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            generations, self._generations = self._generations, {}
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for generation in generations.values():
+            generation.retired = True
+            if generation.readers == 0:
+                generation.close()
+
+
+# Singleton instance
+@lru_cache()
+def get_shard_pool() -> ShardPool:
+    """Get singleton shard pool instance"""
+    return ShardPool()
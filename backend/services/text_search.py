@@ -0,0 +1,115 @@
+"""
+Indexed text filters and relevance-ordered full-text search for /search
+"""
+import logging
+from functools import lru_cache
+from typing import Tuple
+
+from sqlalchemy import column, func, literal, literal_column, or_, and_, select, table, text
+from sqlalchemy.sql import Select
+
+from backend.database.connection import engine
+from backend.database.migrations import TEXT_SEARCH_CONFIG, TEXT_SEARCH_DOCUMENTS, TRIGRAM_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+MIN_TRIGRAM_LENGTH = 3  # shorter substrings have no trigram to look up
+
+
+def _like_pattern(value: str) -> str:
+    """ILIKE pattern matching `value` anywhere, with wildcards escaped by '/'"""
+    escaped = value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return f"%{escaped}%"
+
+
+def _fts_phrase(value: str) -> str:
+    """FTS5 string literal matching `value` verbatim"""
+    return '"' + value.replace('"', '""') + '"'
+
+
+class TextSearch:
+    """
+    Builds the /search text filters on the indexes added by
+    migrations.add_full_text_search and add_trigram_indexes:
+
+    - substring filters (name, title, company, location) use pg_trgm GIN
+      indexes, or FTS5 trigram tables on SQLite; `fuzzy` matches misspelt
+      words by trigram similarity (PostgreSQL only)
+    - full-text queries match stemmed words of the weighted documents and
+      rank them with ts_rank_cd, or bm25 over the FTS5 tables
+
+    Where an index is missing, both fall back to ILIKE scans.
+    """
+
+    def __init__(self, probe: bool = True):
+        # probe=False: the plain ILIKE path, the baseline of benchmark_search.py
+        self.dialect = engine.dialect.name
+        self.full_text = self.trigram = False
+        if probe:
+            with engine.connect() as conn:
+                self.full_text, self.trigram = self._probe(conn)
+        logger.info(f"Text search on {self.dialect}: full-text {'indexed' if self.full_text else 'ILIKE'}, "
+                    f"substrings {'indexed' if self.trigram else 'ILIKE'}")
+
+    def _probe(self, conn) -> Tuple[bool, bool]:
+        """Whether the full-text and trigram indexes exist"""
+        if self.dialect == "postgresql":
+            columns = conn.execute(text(
+                "SELECT count(*) FROM information_schema.columns WHERE table_schema = current_schema() "
+                "AND column_name = 'search_vector' AND table_name IN ('candidates', 'jobs')"
+            )).scalar()
+            trigram = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+            return columns == len(TEXT_SEARCH_DOCUMENTS), trigram is not None
+        if self.dialect == "sqlite":
+            tables = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+            return (all(f"{name}_fts" in tables for name in TEXT_SEARCH_DOCUMENTS),
+                    all(f"{name}_trgm" in tables for name in TRIGRAM_COLUMNS))
+        return False, False
+
+    def contains(self, model, field: str, value: str, fuzzy: bool = False):
+        """
+        (condition, similarity) of a case-insensitive substring filter on
+        model.<field>; with `fuzzy` on PostgreSQL + pg_trgm, a word
+        similarity match instead and its score for ordering (else None)
+        """
+        attribute = getattr(model, field)
+        value = value.strip()
+        if self.trigram and self.dialect == "postgresql":
+            if fuzzy:
+                # `column %> value`: word_similarity(value, column) above pg_trgm.word_similarity_threshold
+                return attribute.op("%>")(value), func.word_similarity(value, attribute)
+            return attribute.ilike(_like_pattern(value), escape="/"), None
+        if self.trigram and self.dialect == "sqlite" and len(value) >= MIN_TRIGRAM_LENGTH:
+            name = f"{model.__tablename__}_trgm"
+            index = table(name, column("rowid"))
+            matches = select(index.c.rowid).where(
+                literal_column(name).op("MATCH")(literal(f"{field} : {_fts_phrase(value)}"))
+            )
+            return model.id.in_(matches), None
+        return attribute.ilike(_like_pattern(value), escape="/"), None
+
+    def match(self, query: Select, model, terms: str) -> Select:
+        """`query` narrowed to rows whose document matches every word of `terms`, most relevant first"""
+        name = model.__tablename__
+        if self.full_text and self.dialect == "postgresql":
+            vector = literal_column(f"{name}.search_vector")
+            tsquery = func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), terms)
+            return query.where(vector.op("@@")(tsquery)).order_by(func.ts_rank_cd(vector, tsquery).desc())
+        if self.full_text and self.dialect == "sqlite":
+            index = table(f"{name}_fts", column("rowid"), column("rank"))
+            phrases = " ".join(_fts_phrase(word) for word in terms.split())
+            return query.join(index, index.c.rowid == model.id).where(
+                literal_column(index.name).op("MATCH")(literal(phrases))
+            ).order_by(index.c.rank)
+        columns = [getattr(model, field) for field, _ in TEXT_SEARCH_DOCUMENTS[name]]
+        return query.where(and_(*(
+            or_(*(attribute.ilike(_like_pattern(word), escape="/") for attribute in columns))
+            for word in terms.split()
+        )))
+
+
+# Singleton instance
+@lru_cache()
+def get_text_search() -> TextSearch:
+    """Get singleton text search instance"""
+    return TextSearch()
@@ -0,0 +1,1239 @@
+"""
+In-memory vector index for fast candidate/job similarity search
+"""
+import bisect
+import threading
+import logging
+import time
+from typing import List, Dict, Tuple, Optional, Iterable, NamedTuple
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.database.models import Candidate, Job, Embedding
+from backend.services.ann_index import IVFIndex
+from backend.services.quantization import ScalarQuantizer, ProductQuantizer, QUANT_INT8, QUANT_PQ
+from backend.services.hybrid_ranking import (
+    SKILL_VOCABULARY, SKILL_WORDS, encode_skills, skill_overlap_fraction,
+    experience_fit, hybrid_scores, get_hybrid_weights
+)
+from backend.services.index_snapshot import SnapshotWriter, open_snapshot
+from backend.services.encoders import encoder_name
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB = "job"
+CANDIDATE = "candidate"
+
+SEARCH_EXACT = "exact"
+SEARCH_IVF = "ivf"
+SEARCH_INT8 = QUANT_INT8
+SEARCH_PQ = QUANT_PQ
+SEARCH_MODES = (SEARCH_EXACT, SEARCH_IVF, SEARCH_INT8, SEARCH_PQ)
+QUANTIZED_MODES = (SEARCH_INT8, SEARCH_PQ)
+
+# Rows copied per step when exporting a partition to a snapshot
+EXPORT_BLOCK_ROWS = 65536
+
+# Attributes kept per index row: name -> source column.
+# Numeric attributes filter by range (min_<name>/max_<name>), `location`
+# by case-insensitive substring and the rest by case-insensitive equality.
+# `skills` is a bitset over SKILL_VOCABULARY used for ranking, not filtering.
+ROW_ATTRIBUTES = {
+    JOB: {
+        'location': Job.location,
+        'job_type': Job.job_type,
+        'seniority_level': Job.seniority_level,
+        'domain': Job.domain,
+        'experience': Job.experience_required,
+        'skills': Job.required_skills
+    },
+    CANDIDATE: {
+        'experience': Candidate.experience_years,
+        'skills': Candidate.skills
+    }
+}
+NUMERIC_ATTRIBUTES = {'experience'}
+SUBSTRING_ATTRIBUTES = {'location'}
+BITSET_ATTRIBUTES = {'skills'}
+
+# Filters leaving at most this fraction of rows are scanned by gathering
+# only the matching rows instead of scoring the whole partition
+FILTER_GATHER_FRACTION = 0.25
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize rows as float32 (zero rows stay zero, i.e. similarity 0)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def entity_attributes(kind: str, entity) -> Dict:
+    """Index attribute values of a Job or Candidate row"""
+    return {name: getattr(entity, column.key) for name, column in ROW_ATTRIBUTES[kind].items()}
+
+
+def apply_filters(columns: Dict[str, np.ndarray],
+                  predicates: List[Tuple[str, str, object]],
+                  size: int) -> np.ndarray:
+    """
+    Mask of the `size` rows of attribute `columns` matching every compiled
+    predicate (see IndexPartition.compile_filters)
+    """
+    mask = np.ones(size, dtype=bool)
+    for name, op, operand in predicates:
+        column = columns[name]
+        # NaN (unknown) compares False and is filtered out
+        if op == "min":
+            mask &= column >= operand
+        elif op == "max":
+            mask &= column <= operand
+        else:
+            mask &= np.isin(column, operand)
+    return mask
+
+
+def match_scores(kind: str,
+                 similarity: np.ndarray,
+                 skills: np.ndarray,
+                 experience: np.ndarray,
+                 query_attributes: Optional[Dict]) -> np.ndarray:
+    """
+    Hybrid ranking scores of rows of a `kind` partition (their skill bitsets
+    and experience) against a query entity of the other kind
+    """
+    if query_attributes is None:
+        return similarity
+    skill_fraction = skill_overlap_fraction(skills, query_attributes['skills'], rows_are_jobs=kind == JOB)
+    if kind == JOB:
+        fit = experience_fit(query_attributes['experience'], experience)
+    else:
+        fit = experience_fit(experience, query_attributes['experience'])
+    return hybrid_scores(similarity, skill_fraction, fit, get_hybrid_weights())
+
+
+def top_k_rows(scores: np.ndarray,
+               top_k: int,
+               min_similarity: float,
+               ranking: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Return row positions of the best `top_k` rows with scores above
+    `min_similarity`, sorted by descending `ranking` (default: the scores)
+    """
+    ranking = scores if ranking is None else ranking
+    rows = np.flatnonzero(scores >= min_similarity)
+    if rows.size > top_k:
+        best = np.argpartition(-ranking[rows], top_k - 1)[:top_k]
+        rows = rows[best]
+    return rows[np.argsort(-ranking[rows], kind="stable")]
+
+
+def top_k_matrix(scores: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise top-k of a score matrix: (column positions, scores), each row
+    sorted by descending score
+    """
+    k = min(top_k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-best, axis=1, kind="stable")
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(best, order, axis=1)
+
+
+class _PartitionState(NamedTuple):
+    """
+    Consistent view of partition buffers. Rows past `size` are spare capacity;
+    searches read one state so concurrent writers never tear a query.
+
+    Vectors are split in two segments: a read-only `base` (rows [0, len(base)),
+    memory-mapped when loaded from a snapshot) and an appendable `tail` buffer
+    holding every later row. All other columns span both segments, including
+    `attributes`: dictionary-encoded int32 codes (-1 when missing) for
+    categorical attributes, float32 values (NaN when missing) for numeric
+    ones and (rows, SKILL_WORDS) uint64 words for bitsets.
+
+    `codes` holds compressed vector codes per trained quantizer (int8, pq)
+    for first-stage scoring; rows appended after training are encoded on insert.
+    """
+    size: int
+    ids: np.ndarray  # int64 entity ids
+    base: np.ndarray  # float32 normalized vectors, read-only
+    tail: np.ndarray  # float32 normalized vectors appended after `base`
+    alive: np.ndarray  # False for tombstoned rows
+    lists: np.ndarray  # int32 IVF list per row, -1 before training
+    row_by_id: Dict[int, int]
+    attributes: Dict[str, np.ndarray]
+    codes: Dict[str, np.ndarray]
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Gather vectors of the given row positions from both segments"""
+        split = len(self.base)
+        in_base = rows < split
+        if in_base.all():
+            return np.asarray(self.base[rows])
+        if not in_base.any():
+            return self.tail[rows - split]
+
+        out = np.empty((len(rows), self.base.shape[1]), dtype=np.float32)
+        out[in_base] = self.base[rows[in_base]]
+        out[~in_base] = self.tail[rows[~in_base] - split]
+        return out
+
+    def segments(self) -> List[np.ndarray]:
+        """Vector segments covering rows [0, size) in order"""
+        split = len(self.base)
+        return [self.base, self.tail[:self.size - split]]
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """Scores of every row against a query vector"""
+        base, tail = self.segments()
+        if len(base) == 0:
+            return tail @ query
+        return np.concatenate([base @ query, tail @ query])
+
+    def matmul(self, queries: np.ndarray) -> np.ndarray:
+        """Scores of every row against a stack of queries, shape (queries, rows)"""
+        base, tail = self.segments()
+        if len(base) == 0:
+            return queries @ tail.T
+        return np.concatenate([queries @ base.T, queries @ tail.T], axis=1)
+
+
+def _is_categorical(name: str) -> bool:
+    return name not in NUMERIC_ATTRIBUTES and name not in BITSET_ATTRIBUTES
+
+
+def _missing_value(name: str):
+    if name in BITSET_ATTRIBUTES:
+        return 0
+    return np.nan if name in NUMERIC_ATTRIBUTES else -1
+
+
+def _attribute_dtype(name: str):
+    if name in BITSET_ATTRIBUTES:
+        return np.uint64
+    return np.float32 if name in NUMERIC_ATTRIBUTES else np.int32
+
+
+def _attribute_shape(name: str) -> tuple:
+    """Per-row shape of an attribute column"""
+    return (SKILL_WORDS,) if name in BITSET_ATTRIBUTES else ()
+
+
+def _build_state(ids: np.ndarray,
+                 vectors: np.ndarray,
+                 attributes: Dict[str, np.ndarray],
+                 base: Optional[np.ndarray] = None) -> _PartitionState:
+    """State with every row alive; `base` (if given) holds the first rows' vectors"""
+    size = len(ids)
+    if base is None:
+        base = np.empty((0, vectors.shape[1]), dtype=np.float32)
+    return _PartitionState(
+        size=size,
+        ids=np.array(ids, dtype=np.int64),
+        base=base,
+        tail=vectors,
+        alive=np.ones(size, dtype=bool),
+        lists=np.full(size, -1, dtype=np.int32),
+        row_by_id={entity_id: row for row, entity_id in enumerate(ids.tolist())},
+        attributes={name: np.array(values, dtype=_attribute_dtype(name)) for name, values in attributes.items()},
+        codes={}
+    )
+
+
+def _grow_state(state: _PartitionState, capacity: int) -> _PartitionState:
+    """Copy row buffers into arrays of a larger capacity (`base` is never copied)"""
+    grown = {}
+    for name in ('ids', 'alive', 'lists'):
+        value = getattr(state, name)
+        buffer = np.zeros(capacity, dtype=value.dtype)
+        buffer[:state.size] = value[:state.size]
+        grown[name] = buffer
+
+    attributes = {}
+    for name, values in state.attributes.items():
+        buffer = np.full((capacity,) + values.shape[1:], _missing_value(name), dtype=values.dtype)
+        buffer[:state.size] = values[:state.size]
+        attributes[name] = buffer
+
+    codes = {}
+    for name, values in state.codes.items():
+        buffer = np.zeros((capacity,) + values.shape[1:], dtype=values.dtype)
+        buffer[:state.size] = values[:state.size]
+        codes[name] = buffer
+
+    split = len(state.base)
+    tail = np.zeros((capacity - split, state.tail.shape[1]), dtype=np.float32)
+    tail[:state.size - split] = state.tail[:state.size - split]
+    return state._replace(tail=tail, attributes=attributes, codes=codes, **grown)
+
+
+class IndexPartition:
+    """
+    Pre-normalized float32 vectors of one entity type (jobs or candidates).
+
+    Rows are append-only: updating or deleting an entity tombstones its old row,
+    and tombstoned rows are dropped by background compaction once they pass
+    INDEX_COMPACTION_THRESHOLD of the partition. Compaction folds a
+    memory-mapped base into process memory until the next snapshot is loaded.
+    """
+
+    def __init__(self, kind: str, dim: int):
+        self.kind = kind
+        self.dim = dim
+        self.attribute_names = list(ROW_ATTRIBUTES[kind])
+        # Append-only value -> code dictionaries of categorical attributes
+        self._vocabularies: Dict[str, Dict[str, int]] = {
+            name: {} for name in self.attribute_names if _is_categorical(name)
+        }
+        self._state = _build_state(
+            np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float32), self._encode_rows([])
+        )
+        self._lock = threading.RLock()
+        self._vocabulary_lock = threading.Lock()
+        self._ivf: Optional[IVFIndex] = None
+        self._quantizers: Dict[str, object] = {}
+        self._tombstones = 0
+        self._compacting = False
+        # Bumped on every content change; entities changed since the last
+        # load remember the version of their latest change
+        self.version = 0
+        self._loaded_version = 0
+        self._entity_versions: Dict[int, int] = {}
+        # (version, entity id) of every change since the last load, in version order
+        self._changes: List[Tuple[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._state.row_by_id)
+
+    def _replace_state(self, state: _PartitionState):
+        with self._lock:
+            self._state = state
+            self._ivf = None
+            self._quantizers = {}
+            self._tombstones = 0
+            self.version += 1
+            self._loaded_version = self.version
+            self._entity_versions = {}
+            self._changes = []
+
+    def _encode_value(self, name: str, value):
+        """Numeric value, skill bitset or vocabulary code of one attribute value"""
+        if name in BITSET_ATTRIBUTES:
+            return encode_skills(value)
+        if name in NUMERIC_ATTRIBUTES:
+            return np.nan if value is None else float(value)
+        text = str(value).strip().lower() if value is not None else ""
+        if not text:
+            return -1
+        vocabulary = self._vocabularies[name]
+        code = vocabulary.get(text)
+        if code is None:
+            with self._vocabulary_lock:
+                code = vocabulary.setdefault(text, len(vocabulary))
+        return code
+
+    def _encode_rows(self, rows: List[Optional[Dict]]) -> Dict[str, np.ndarray]:
+        """Attribute columns for a list of attribute dicts (None: all missing)"""
+        return {
+            name: np.array(
+                [self._encode_value(name, (row or {}).get(name)) for row in rows],
+                dtype=_attribute_dtype(name)
+            ).reshape((len(rows),) + _attribute_shape(name))
+            for name in self.attribute_names
+        }
+
+    def load(self, rows: Iterable[tuple]):
+        """
+        Replace partition contents with (entity_id, vector, *attribute values)
+        rows, attribute values in ROW_ATTRIBUTES order.
+        Later rows win when an entity has several embeddings.
+        """
+        latest = {}
+        for entity_id, vector, *values in rows:
+            if vector is None or len(vector) != self.dim:
+                logger.warning(f"Skipping {self.kind} {entity_id}: unexpected embedding size")
+                continue
+            latest[entity_id] = (vector, dict(zip(self.attribute_names, values)))
+
+        ids = np.fromiter(latest.keys(), dtype=np.int64, count=len(latest))
+        if latest:
+            vectors = normalize_rows(np.stack([vector for vector, _ in latest.values()]).astype(np.float32, copy=False))
+        else:
+            vectors = np.empty((0, self.dim), dtype=np.float32)
+        attributes = self._encode_rows([values for _, values in latest.values()])
+
+        self._replace_state(_build_state(ids, vectors, attributes))
+
+    def load_arrays(self,
+                    ids: np.ndarray,
+                    vectors: np.ndarray,
+                    attributes: Dict[str, np.ndarray],
+                    vocabularies: Dict[str, List[str]]):
+        """
+        Serve already-normalized vectors (typically a read-only memmap) as the
+        partition's base segment without copying them. Attribute codes are
+        translated from the snapshot's vocabularies to this partition's.
+        """
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim or len(vectors) != len(ids):
+            raise ValueError(f"Snapshot arrays for {self.kind} partition have unexpected shape")
+        if any(len(attributes[name]) != len(ids) for name in self.attribute_names):
+            raise ValueError(f"Snapshot attributes for {self.kind} partition have unexpected shape")
+
+        columns = {}
+        for name in self.attribute_names:
+            values = np.asarray(attributes[name])
+            if _is_categorical(name):
+                table = np.array([self._encode_value(name, value) for value in vocabularies[name]] + [-1], dtype=np.int32)
+                values = table[values]  # code -1 picks the trailing -1
+            columns[name] = values
+
+        ids = np.array(ids, dtype=np.int64)
+        tail = np.empty((0, self.dim), dtype=np.float32)
+        self._replace_state(_build_state(ids, tail, columns, base=vectors))
+
+    def vocabularies(self) -> Dict[str, List[str]]:
+        """Categorical attribute values in code order"""
+        with self._vocabulary_lock:
+            return {name: list(vocabulary) for name, vocabulary in self._vocabularies.items()}
+
+    def export(self, writer: SnapshotWriter):
+        """
+        Write live rows to a snapshot in blocks, keeping peak memory bounded
+        """
+        state = self._state
+        rows = np.flatnonzero(state.alive[:state.size])
+
+        def fill(target: np.ndarray):
+            for start in range(0, len(rows), EXPORT_BLOCK_ROWS):
+                block = rows[start:start + EXPORT_BLOCK_ROWS]
+                target[start:start + len(block)] = state.vectors(block)
+
+        writer.write_array(f"{self.kind}_ids", state.ids[rows])
+        for name, values in state.attributes.items():
+            writer.write_array(f"{self.kind}_{name}", values[rows])
+        writer.write_rows(f"{self.kind}_vectors", np.float32, (len(rows), self.dim), fill)
+        return len(rows)
+
+    def live_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and vectors of all live rows"""
+        state = self._state
+        rows = np.flatnonzero(state.alive[:state.size])
+        return state.ids[rows], state.vectors(rows)
+
+    def iter_live_blocks(self, block_rows: int) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+        """Ids and vectors of live rows, `block_rows` at a time"""
+        state = self._state
+        rows = np.flatnonzero(state.alive[:state.size])
+        for start in range(0, len(rows), block_rows):
+            block = rows[start:start + block_rows]
+            yield state.ids[block], state.vectors(block)
+
+    def get_vector(self, entity_id: int) -> Optional[np.ndarray]:
+        """Get the normalized vector of an entity"""
+        state = self._state
+        row = state.row_by_id.get(entity_id)
+        if row is None:
+            return None
+        return state.vectors(np.array([row]))[0]
+
+    def entity_version(self, entity_id: int) -> int:
+        """Partition version at which an entity's vector last changed"""
+        return self._entity_versions.get(entity_id, self._loaded_version)
+
+    def changed_since(self, version: int) -> Optional[set]:
+        """
+        Ids of entities upserted or deleted after `version`; None if the
+        partition was reloaded since, i.e. every entity may have changed
+        """
+        with self._lock:
+            if version < self._loaded_version:
+                return None
+            start = bisect.bisect_right(self._changes, (version, float("inf")))
+            return {entity_id for _, entity_id in self._changes[start:]}
+
+    def split_live(self, parts: int) -> Tuple[int, List[Dict[str, np.ndarray]]]:
+        """
+        Current version plus the live rows cut into `parts` contiguous chunks,
+        each {'ids', 'vectors', <attribute name>: values}. Chunks are gathered
+        lazily by the returned generator, so only one is copied at a time.
+        """
+        with self._lock:
+            state = self._state
+            version = self.version
+            live = np.flatnonzero(state.alive[:state.size])
+
+        def chunks():
+            for rows in np.array_split(live, parts):
+                chunk = {'ids': state.ids[rows], 'vectors': state.vectors(rows)}
+                chunk.update((name, values[rows]) for name, values in state.attributes.items())
+                yield chunk
+
+        return version, chunks()
+
+    def upsert(self, entity_id: int, vector: List[float], attributes: Optional[Dict] = None):
+        """
+        Add or replace an entity's vector (and filterable attributes) in O(1) amortized time
+        """
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected {self.dim}-dim vector, got {len(vector)}")
+        vector = normalize_rows(vector)
+        values = {name: self._encode_value(name, (attributes or {}).get(name)) for name in self.attribute_names}
+
+        with self._lock:
+            state = self._state
+            capacity = len(state.ids)
+            if state.size == capacity:
+                state = _grow_state(state, max(1024, capacity * 2))
+
+            row = state.size
+            state.ids[row] = entity_id
+            state.tail[row - len(state.base)] = vector
+            state.alive[row] = True
+            state.lists[row] = self._ivf.assign(vector) if self._ivf is not None else -1
+            for name, value in values.items():
+                state.attributes[name][row] = value
+            for name, quantizer in self._quantizers.items():
+                state.codes[name][row] = quantizer.encode(vector[None])[0]
+
+            previous = state.row_by_id.get(entity_id)
+            state.row_by_id[entity_id] = row
+            if previous is not None:
+                state.alive[previous] = False
+                self._tombstones += 1
+
+            self._state = state._replace(size=row + 1)
+            self.version += 1
+            self._entity_versions[entity_id] = self.version
+            self._changes.append((self.version, entity_id))
+
+        self._maybe_compact()
+
+    def delete(self, entity_id: int) -> bool:
+        """
+        Tombstone an entity's row; returns False if it was not indexed
+        """
+        with self._lock:
+            state = self._state
+            row = state.row_by_id.pop(entity_id, None)
+            if row is None:
+                return False
+            state.alive[row] = False
+            self._tombstones += 1
+            self.version += 1
+            self._entity_versions[entity_id] = self.version
+            self._changes.append((self.version, entity_id))
+
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self):
+        """Start background compaction when tombstones pass the threshold"""
+        size = self._state.size
+        if self._tombstones < settings.INDEX_COMPACTION_MIN_TOMBSTONES:
+            return
+        if self._tombstones < settings.INDEX_COMPACTION_THRESHOLD * size:
+            return
+
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+
+        threading.Thread(target=self.compact, name=f"compact-{self.kind}-index", daemon=True).start()
+
+    def compact(self):
+        """
+        Rewrite buffers without tombstoned rows
+        """
+        try:
+            with self._lock:
+                state = self._state
+                keep = np.flatnonzero(state.alive[:state.size])
+                compacted = _build_state(
+                    state.ids[keep], state.vectors(keep),
+                    {name: values[keep] for name, values in state.attributes.items()}
+                )
+                self._state = compacted._replace(
+                    lists=state.lists[keep],
+                    codes={name: codes[keep] for name, codes in state.codes.items()}
+                )
+                removed, self._tombstones = self._tombstones, 0
+            logger.info(f"Compacted {self.kind} index: dropped {removed} tombstones, {len(keep)} rows left")
+        except Exception as e:
+            logger.error(f"Error compacting {self.kind} index: {e}")
+        finally:
+            self._compacting = False
+
+    def stats(self) -> Dict:
+        """Row, tombstone and capacity counters"""
+        state = self._state
+        return {
+            'rows': len(state.row_by_id),
+            'tombstones': self._tombstones,
+            'capacity': len(state.ids),
+            'mapped_rows': len(state.base),
+            'version': self.version,
+            'ivf_lists': len(self._ivf.centroids) if self._ivf is not None else 0,
+            'vector_bytes_in_memory': state.tail.nbytes + (0 if isinstance(state.base, np.memmap) else state.base.nbytes),
+            'code_bytes': {name: codes.nbytes for name, codes in state.codes.items()}
+        }
+
+    def sample_vectors(self, sample_size: int, seed: int = 0) -> np.ndarray:
+        """Random sample of live vectors"""
+        state = self._state
+        rows = np.flatnonzero(state.alive[:state.size])
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(rows, size=min(sample_size, rows.size), replace=False)
+        return state.vectors(np.sort(rows))
+
+    def _get_ivf(self) -> IVFIndex:
+        """
+        Train the IVF quantizer on first ANN use, and retrain once the
+        partition has doubled since the last training
+        """
+        ivf = self._ivf
+        if ivf is not None and len(self) <= 2 * ivf.trained_rows:
+            return ivf
+
+        with self._lock:
+            if self._ivf is None or len(self) > 2 * self._ivf.trained_rows:
+                state = self._state
+                ivf = IVFIndex(nlist=settings.IVF_NLIST, iterations=settings.IVF_TRAIN_ITERATIONS)
+                ivf.train(state.vectors(np.flatnonzero(state.alive[:state.size])))
+                state.lists[:state.size] = np.concatenate([ivf.assign(segment) for segment in state.segments()])
+                self._ivf = ivf
+            return self._ivf
+
+    def _get_quantizer(self, name: str):
+        """
+        Train a quantizer and encode every row on first use; retrain once the
+        partition has doubled since the last training
+        """
+        quantizer = self._quantizers.get(name)
+        if quantizer is not None and len(self) <= 2 * quantizer.trained_rows:
+            return quantizer
+
+        with self._lock:
+            quantizer = self._quantizers.get(name)
+            if quantizer is None or len(self) > 2 * quantizer.trained_rows:
+                quantizer = ScalarQuantizer() if name == QUANT_INT8 else ProductQuantizer(settings.PQ_SUBVECTORS)
+                started = time.perf_counter()
+                quantizer.train(self.sample_vectors(settings.QUANT_TRAIN_SAMPLE))
+                # Retraining is driven by partition growth, not by the sample size
+                quantizer.trained_rows = len(self)
+
+                state = self._state
+                codes = np.zeros((len(state.ids),) + quantizer.code_shape(self.dim), dtype=quantizer.code_dtype)
+                for start in range(0, state.size, EXPORT_BLOCK_ROWS):
+                    rows = np.arange(start, min(start + EXPORT_BLOCK_ROWS, state.size))
+                    codes[rows] = quantizer.encode(state.vectors(rows))
+                self._state = state._replace(codes=dict(state.codes, **{name: codes}))
+                self._quantizers = dict(self._quantizers, **{name: quantizer})
+                logger.info(
+                    f"{name} codes built for {state.size} {self.kind} rows "
+                    f"in {time.perf_counter() - started:.1f}s"
+                )
+            return quantizer
+
+    def compile_filters(self, filters: Optional[Dict]) -> List[Tuple[str, str, object]]:
+        """
+        Filters as (attribute, op, operand) predicates for apply_filters. Keys are
+        attribute names, or min_<name>/max_<name> for numeric attributes; None
+        values are ignored. Categorical values resolve to vocabulary codes.
+        """
+        predicates = []
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            name = key[4:] if key.startswith(("min_", "max_")) else key
+            is_range = name != key
+            if (name not in self.attribute_names or name in BITSET_ATTRIBUTES
+                    or is_range != (name in NUMERIC_ATTRIBUTES)):
+                raise ValueError(f"Unsupported {self.kind} filter: {key}")
+
+            if name in NUMERIC_ATTRIBUTES:
+                predicates.append((name, key[:3], float(value)))
+                continue
+
+            text = str(value).strip().lower()
+            with self._vocabulary_lock:
+                vocabulary = list(self._vocabularies[name].items())
+            if name in SUBSTRING_ATTRIBUTES:
+                codes = [code for known, code in vocabulary if text in known]
+            else:
+                codes = [code for known, code in vocabulary if known == text]
+            predicates.append((name, "in", np.array(codes, dtype=np.int32)))
+        return predicates
+
+    def filter_mask(self, state: _PartitionState, filters: Dict) -> np.ndarray:
+        """Rows in [0, state.size) matching every filter (see compile_filters)"""
+        columns = {name: values[:state.size] for name, values in state.attributes.items()}
+        return apply_filters(columns, self.compile_filters(filters), state.size)
+
+    def row_attributes(self, entity_id: int) -> Optional[Dict]:
+        """Skill bitset and experience of an indexed entity, as hybrid ranking query attributes"""
+        state = self._state
+        row = state.row_by_id.get(entity_id)
+        if row is None:
+            return None
+        return {
+            'skills': state.attributes['skills'][row].copy(),
+            'experience': float(state.attributes['experience'][row])
+        }
+
+    def _match_scores(self,
+                      state: _PartitionState,
+                      rows: Optional[np.ndarray],
+                      similarity: np.ndarray,
+                      query_attributes: Optional[Dict]) -> np.ndarray:
+        """
+        Hybrid ranking scores of scored rows (`rows` None: all rows) against a
+        query entity from the other partition; plain similarity without one
+        """
+        if query_attributes is None:
+            return similarity
+
+        def column(name: str) -> np.ndarray:
+            values = state.attributes[name]
+            return values[:state.size] if rows is None else values[rows]
+
+        return match_scores(self.kind, similarity, column('skills'), column('experience'), query_attributes)
+
+    def search(self,
+               query: np.ndarray,
+               top_k: int = 10,
+               min_similarity: float = 0.5,
+               search_mode: Optional[str] = None,
+               nprobe: Optional[int] = None,
+               filters: Optional[Dict] = None,
+               query_attributes: Optional[Dict] = None) -> List[Tuple[int, float, float]]:
+        """
+        Cosine search: one matrix-vector product plus argpartition top-k.
+        In `ivf` mode only the rows of the `nprobe` nearest lists are scored.
+        In `int8`/`pq` mode all rows are scored on compressed codes and the
+        best top_k * QUANT_RESCORE_FACTOR are rescored on float32 vectors.
+        Partitions below ANN_MIN_ROWS are always scanned exactly.
+        `filters` (see filter_mask) are applied before scoring.
+
+        With `query_attributes` (see row_attributes) rows above `min_similarity`
+        are ranked by the weighted hybrid score. Returns (entity_id, similarity,
+        match_score) tuples, best first.
+        """
+        search_mode = search_mode or settings.MATCH_SEARCH_MODE
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search_mode}")
+
+        if len(self) < settings.ANN_MIN_ROWS:
+            search_mode = SEARCH_EXACT
+        return self._search(query, top_k, min_similarity, search_mode, nprobe, filters, query_attributes)
+
+    def _search(self,
+                query: np.ndarray,
+                top_k: int,
+                min_similarity: float,
+                search_mode: str,
+                nprobe: Optional[int] = None,
+                filters: Optional[Dict] = None,
+                query_attributes: Optional[Dict] = None) -> List[Tuple[int, float, float]]:
+        if len(self) == 0:
+            return []
+
+        query = normalize_rows(query)
+        ivf = self._get_ivf() if search_mode == SEARCH_IVF else None
+        quantizer = self._get_quantizer(search_mode) if search_mode in QUANTIZED_MODES else None
+        state = self._state
+        alive = state.alive[:state.size]
+
+        rows = None
+        if filters:
+            alive = alive & self.filter_mask(state, filters)
+            if np.count_nonzero(alive) <= FILTER_GATHER_FRACTION * state.size:
+                # Selective filter: score only the matching rows, exactly
+                rows = np.flatnonzero(alive)
+        if rows is None and ivf is not None:
+            probed = ivf.probe(query, nprobe or settings.IVF_NPROBE, state.lists[:state.size])
+            rows = np.flatnonzero(probed & alive)
+        if rows is None and quantizer is not None:
+            # First stage on compressed codes; the shortlist is rescored below
+            approximate = quantizer.score(state.codes[search_mode][:state.size], query)
+            approximate[~alive] = -np.inf
+            shortlist = max(top_k, 1) * settings.QUANT_RESCORE_FACTOR
+            rows = top_k_rows(approximate, shortlist, np.finfo(np.float32).min)
+
+        if rows is not None:
+            scores = state.vectors(rows) @ query
+        else:
+            scores = state.dot(query)
+            scores[~alive] = -np.inf
+        ranking = self._match_scores(state, rows, scores, query_attributes)
+
+        best = top_k_rows(scores, top_k, min_similarity, ranking)
+        hit_rows = best if rows is None else rows[best]
+        return list(zip(state.ids[hit_rows].tolist(), scores[best].tolist(), ranking[best].tolist()))
+
+    def search_ids(self,
+                   entity_ids: Iterable[int],
+                   query: np.ndarray,
+                   top_k: int = 10,
+                   min_similarity: float = 0.5,
+                   filters: Optional[Dict] = None,
+                   query_attributes: Optional[Dict] = None) -> List[Tuple[int, float, float]]:
+        """Exact search restricted to the given entities; ids not indexed are skipped"""
+        state = self._state
+        rows = np.array(
+            [row for row in map(state.row_by_id.get, entity_ids) if row is not None], dtype=np.int64
+        )
+        if filters and len(rows):
+            columns = {name: values[rows] for name, values in state.attributes.items()}
+            rows = rows[apply_filters(columns, self.compile_filters(filters), len(rows))]
+        if not len(rows):
+            return []
+
+        scores = state.vectors(rows) @ normalize_rows(query)
+        ranking = self._match_scores(state, rows, scores, query_attributes)
+        best = top_k_rows(scores, top_k, min_similarity, ranking)
+        return list(zip(state.ids[rows[best]].tolist(), scores[best].tolist(), ranking[best].tolist()))
+
+    def search_batch(self,
+                     queries: np.ndarray,
+                     top_k: int = 10,
+                     min_similarity: float = 0.5,
+                     filters: Optional[Dict] = None,
+                     query_attributes: Optional[List[Dict]] = None) -> List[List[Tuple[int, float, float]]]:
+        """
+        Exact search for many queries at once: blocks of stacked queries are
+        scored with one matrix-matrix product each, bounding the score matrices
+        to MATCH_BATCH_BLOCK_MB. Selective `filters` shrink the scored columns.
+        `query_attributes` holds one entry per query (see search).
+        """
+        if len(self) == 0:
+            return [[] for _ in queries]
+
+        queries = normalize_rows(queries)
+        state = self._state
+        live = state.alive[:state.size]
+        rows, vectors = None, None
+        if filters:
+            live = live & self.filter_mask(state, filters)
+            if np.count_nonzero(live) <= FILTER_GATHER_FRACTION * state.size:
+                rows = np.flatnonzero(live)
+                vectors = state.vectors(rows)
+        row_ids = state.ids[:state.size] if rows is None else state.ids[rows]
+        bytes_per_score = 4 if query_attributes is None else 8
+        block_rows = max(1, (settings.MATCH_BATCH_BLOCK_MB << 20) // (bytes_per_score * max(1, len(row_ids))))
+
+        results = []
+        for start in range(0, len(queries), block_rows):
+            block = queries[start:start + block_rows]
+            if vectors is not None:
+                scores = block @ vectors.T
+            else:
+                scores = state.matmul(block)
+                scores[:, ~live] = -np.inf
+
+            ranking = scores
+            if query_attributes is not None:
+                ranking = np.empty_like(scores)
+                for position, attributes in enumerate(query_attributes[start:start + len(block)]):
+                    ranking[position] = self._match_scores(state, rows, scores[position], attributes)
+                ranking[scores < min_similarity] = -np.inf
+
+            columns, best = top_k_matrix(ranking, top_k)
+            similarities = np.take_along_axis(scores, columns, axis=1)
+            for row_columns, row_similarity, row_best in zip(columns, similarities, best):
+                keep = row_similarity >= min_similarity
+                results.append(list(zip(
+                    row_ids[row_columns[keep]].tolist(), row_similarity[keep].tolist(), row_best[keep].tolist()
+                )))
+        return results
+
+    def measure_recall(self,
+                       queries: np.ndarray,
+                       top_k: int = 10,
+                       nprobe: Optional[int] = None,
+                       search_mode: str = SEARCH_IVF) -> Dict:
+        """
+        Compare results and latency of an approximate search mode against
+        exact search for sample queries
+        """
+        if search_mode not in SEARCH_MODES or search_mode == SEARCH_EXACT:
+            raise ValueError(f"Recall is measured for approximate modes, got: {search_mode}")
+
+        found = expected = 0
+        exact_ms, ann_ms = [], []
+        for query in queries:
+            start = time.perf_counter()
+            exact = self._search(query, top_k, -1.0, SEARCH_EXACT)
+            exact_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            approximate = self._search(query, top_k, -1.0, search_mode, nprobe=nprobe)
+            ann_ms.append((time.perf_counter() - start) * 1000)
+
+            expected += len(exact)
+            found += len({hit[0] for hit in exact} & {hit[0] for hit in approximate})
+
+        report = {
+            'partition': self.kind,
+            'search_mode': search_mode,
+            'rows': len(self),
+            'queries': len(queries),
+            'top_k': top_k,
+            'recall': round(found / expected, 4) if expected else 1.0,
+            'exact_ms_p50': round(float(np.median(exact_ms)), 3) if exact_ms else 0.0,
+            'approximate_ms_p50': round(float(np.median(ann_ms)), 3) if ann_ms else 0.0,
+            'approximate_ms_p95': round(float(np.percentile(ann_ms, 95)), 3) if ann_ms else 0.0
+        }
+        if search_mode == SEARCH_IVF:
+            report['nlist'] = len(self._ivf.centroids) if self._ivf is not None else 0
+            report['nprobe'] = nprobe or settings.IVF_NPROBE
+        else:
+            codes = self._state.codes.get(search_mode)
+            code_bytes = codes[0].nbytes if codes is not None and len(codes) else 0
+            report['rescore_factor'] = settings.QUANT_RESCORE_FACTOR
+            report['bytes_per_vector'] = {'float32': 4 * self.dim, search_mode: code_bytes}
+            report['compression'] = round(4 * self.dim / code_bytes, 1) if code_bytes else 0.0
+        return report
+
+
+class EmbeddingIndex:
+    """
+    Process-wide index over all job and candidate embeddings.
+
+    With INDEX_SNAPSHOT_DIR set, a cold worker maps the latest snapshot
+    instead of parsing every embedding row, then replays embeddings newer
+    than the snapshot's watermark (highest Embedding.id it contains).
+    Replaying continues every INDEX_SYNC_INTERVAL_SECONDS so rows written
+    by other workers become visible too. Each entity remembers the highest
+    embedding id applied to it, so rows this worker already applied on
+    upload are not replayed a second time.
+
+    Ids are handed out before commit, so a transaction holding a lower id
+    can commit after the watermark moved past it. Ids below the watermark
+    without a row are kept as gaps and re-checked on every sync for
+    INDEX_SYNC_GAP_SECONDS.
+
+    With MATCHER_SHARD_COUNT > 1 the index only holds the ids of this node's
+    shard (id % shard_count == shard_index) and keeps its snapshots apart.
+    """
+
+    def __init__(self,
+                 dim: int = settings.EMBEDDING_DIM,
+                 shard_index: int = settings.MATCHER_SHARD_INDEX,
+                 shard_count: int = settings.MATCHER_SHARD_COUNT):
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid matcher shard {shard_index} of {shard_count}")
+        self.dim = dim
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.jobs = IndexPartition(JOB, dim)
+        self.candidates = IndexPartition(CANDIDATE, dim)
+        self._lock = threading.Lock()
+        self._stale = True
+        self._watermark = 0
+        self._applied: Dict[Tuple[str, int], int] = {}  # (kind, entity id) -> embedding id
+        self._gaps: Dict[int, float] = {}  # embedding id missing below the watermark -> first seen
+        self._last_sync = 0.0
+        self._snapshot_path: Optional[str] = None
+
+    def partition(self, kind: str) -> IndexPartition:
+        """Get partition by entity type"""
+        if kind == JOB:
+            return self.jobs
+        if kind == CANDIDATE:
+            return self.candidates
+        raise ValueError(f"Unknown index partition: {kind}")
+
+    def owns(self, entity_id: int) -> bool:
+        """Whether an entity belongs to this node's shard"""
+        return entity_id % self.shard_count == self.shard_index
+
+    def _shard_filters(self, column) -> list:
+        """SQL conditions restricting an entity id column to this node's shard"""
+        if self.shard_count == 1:
+            return []
+        return [column % self.shard_count == self.shard_index]
+
+    def _snapshot_directory(self, directory: str) -> str:
+        """Snapshot directory of this node's shard"""
+        if self.shard_count == 1:
+            return directory
+        return str(Path(directory) / f"shard-{self.shard_index}-of-{self.shard_count}")
+
+    def build(self, db: Session):
+        """
+        Load all embeddings from the database
+        """
+        try:
+            logger.info("Building embedding index...")
+            watermark = db.query(func.max(Embedding.id)).scalar() or 0
+            # Read before the rows: an id committing in between is replayed, not lost
+            present = self._present_ids(db, Embedding.id > watermark - settings.INDEX_SYNC_MAX_GAPS,
+                                        Embedding.id <= watermark)
+            job_rows = db.query(
+                Embedding.job_id, Embedding.embedding_vector, *ROW_ATTRIBUTES[JOB].values()
+            ).join(
+                Job, Job.id == Embedding.job_id
+            ).filter(
+                Embedding.id <= watermark, *self._shard_filters(Embedding.job_id)
+            ).order_by(Embedding.id).all()
+            candidate_rows = db.query(
+                Embedding.candidate_id, Embedding.embedding_vector, *ROW_ATTRIBUTES[CANDIDATE].values()
+            ).join(
+                Candidate, Candidate.id == Embedding.candidate_id
+            ).filter(
+                Embedding.id <= watermark, *self._shard_filters(Embedding.candidate_id)
+            ).order_by(Embedding.id).all()
+
+            self.jobs.load(job_rows)
+            self.candidates.load(candidate_rows)
+            self._watermark = watermark
+            self._applied = {}
+            self._gaps = {}
+            self._note_gaps(present, 0, watermark)
+            self._snapshot_path = None
+            self._stale = False
+            logger.info(
+                f"Embedding index built: {len(self.jobs)} jobs, {len(self.candidates)} candidates"
+            )
+        except Exception as e:
+            logger.error(f"Error building embedding index: {e}")
+            raise
+
+    def save_snapshot(self, directory: str = settings.INDEX_SNAPSHOT_DIR) -> str:
+        """
+        Persist both partitions as float32 .npy files plus a manifest
+        """
+        with SnapshotWriter(self._snapshot_directory(directory)) as writer:
+            rows = {kind: self.partition(kind).export(writer) for kind in (JOB, CANDIDATE)}
+            path = writer.publish({
+                'model_name': encoder_name(),
+                'dim': self.dim,
+                'rows': rows,
+                'watermark': {'embedding_id': self._watermark, 'gaps': sorted(self._gaps)},
+                'shard': {'index': self.shard_index, 'count': self.shard_count},
+                'skill_vocabulary': SKILL_VOCABULARY,
+                'vocabularies': {kind: self.partition(kind).vocabularies() for kind in (JOB, CANDIDATE)},
+                'created_at': time.time()
+            })
+        return str(path)
+
+    def load_snapshot(self, directory: str = settings.INDEX_SNAPSHOT_DIR) -> bool:
+        """
+        Map the current snapshot read-only; False when there is no usable snapshot
+        """
+        snapshot = open_snapshot(self._snapshot_directory(directory))
+        if snapshot is None:
+            return False
+
+        manifest, arrays = snapshot['manifest'], snapshot['arrays']
+        if manifest.get('model_name') != encoder_name() or manifest.get('dim') != self.dim:
+            logger.warning(f"Ignoring index snapshot {snapshot['path']}: built for another model")
+            return False
+        if manifest.get('skill_vocabulary') != SKILL_VOCABULARY:
+            logger.warning(f"Ignoring index snapshot {snapshot['path']}: built for another skill vocabulary")
+            return False
+        if manifest.get('shard', {'index': 0, 'count': 1}) != {'index': self.shard_index, 'count': self.shard_count}:
+            logger.warning(f"Ignoring index snapshot {snapshot['path']}: built for another matcher shard")
+            return False
+
+        try:
+            for kind in (JOB, CANDIDATE):
+                partition = self.partition(kind)
+                partition.load_arrays(
+                    arrays[f"{kind}_ids"],
+                    arrays[f"{kind}_vectors"],
+                    {name: arrays[f"{kind}_{name}"] for name in partition.attribute_names},
+                    manifest['vocabularies'][kind]
+                )
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Ignoring index snapshot {snapshot['path']}: {e}")
+            return False
+
+        self._watermark = manifest['watermark']['embedding_id']
+        self._applied = {}
+        self._gaps = dict.fromkeys(manifest['watermark'].get('gaps', []), time.monotonic())
+        self._snapshot_path = snapshot['path']
+        self._stale = False
+        logger.info(
+            f"Embedding index mapped from {snapshot['path']}: "
+            f"{len(self.jobs)} jobs, {len(self.candidates)} candidates"
+        )
+        return True
+
+    def _apply(self, kind: str, entity_id: int, vector, attributes: Optional[Dict],
+               embedding_id: Optional[int]) -> bool:
+        """Upsert unless the entity already holds this or a newer embedding"""
+        if embedding_id is not None:
+            key = (kind, entity_id)
+            if self._applied.get(key, 0) >= embedding_id:
+                return False
+            self._applied[key] = embedding_id
+        self.partition(kind).upsert(entity_id, vector, attributes)
+        return True
+
+    def _present_ids(self, db: Session, *conditions) -> np.ndarray:
+        """Sorted ids of committed embedding rows of every shard"""
+        ids = db.query(Embedding.id).filter(*conditions).order_by(Embedding.id).all()
+        return np.array([row[0] for row in ids], dtype=np.int64)
+
+    def _note_gaps(self, present: np.ndarray, low: int, high: int):
+        """Remember the ids in (low, high] that have no committed row"""
+        start = max(low, high - settings.INDEX_SYNC_MAX_GAPS) + 1
+        if start > high:
+            return
+        now = time.monotonic()
+        for embedding_id in np.setdiff1d(np.arange(start, high + 1), present, assume_unique=True).tolist():
+            self._gaps.setdefault(embedding_id, now)
+        if len(self._gaps) > settings.INDEX_SYNC_MAX_GAPS:
+            for embedding_id in sorted(self._gaps)[:len(self._gaps) - settings.INDEX_SYNC_MAX_GAPS]:
+                del self._gaps[embedding_id]
+
+    def sync(self, db: Session):
+        """
+        Replay embeddings written after the watermark (by this or any other
+        worker) and those that committed late into a gap below it
+        """
+        now = time.monotonic()
+        self._gaps = {
+            embedding_id: seen for embedding_id, seen in self._gaps.items()
+            if now - seen < settings.INDEX_SYNC_GAP_SECONDS
+        }
+        pending = Embedding.id > self._watermark
+        if self._gaps:
+            pending = or_(pending, Embedding.id.in_(list(self._gaps)))
+        present = self._present_ids(db, pending)
+        previous = self._watermark
+        high = max(previous, int(present[-1])) if len(present) else previous
+
+        job_columns = ROW_ATTRIBUTES[JOB]
+        candidate_columns = ROW_ATTRIBUTES[CANDIDATE]
+        rows = db.query(
+            Embedding.id, Embedding.job_id, Embedding.candidate_id, Embedding.embedding_vector,
+            *job_columns.values(), *candidate_columns.values()
+        ).outerjoin(Job, Job.id == Embedding.job_id).outerjoin(
+            Candidate, Candidate.id == Embedding.candidate_id
+        ).filter(
+            pending, Embedding.id <= high,
+            *self._shard_filters(func.coalesce(Embedding.job_id, Embedding.candidate_id))
+        ).order_by(Embedding.id).all()
+
+        replayed = late = 0
+        for embedding_id, job_id, candidate_id, vector, *values in rows:
+            late += embedding_id <= previous
+            if vector is None or len(vector) != self.dim:
+                continue
+            if job_id is not None:
+                replayed += self._apply(JOB, job_id, vector, dict(zip(job_columns, values)), embedding_id)
+            elif candidate_id is not None:
+                replayed += self._apply(CANDIDATE, candidate_id, vector,
+                                        dict(zip(candidate_columns, values[len(job_columns):])), embedding_id)
+
+        for embedding_id in present.tolist():
+            self._gaps.pop(embedding_id, None)
+        self._note_gaps(present, previous, high)
+        self._watermark = high
+
+        # Rows below the lowest id still replayable are never replayed again
+        floor = min(self._gaps, default=self._watermark + 1)
+        self._applied = {key: applied for key, applied in self._applied.items() if applied >= floor}
+        self._last_sync = time.monotonic()
+        if rows:
+            logger.info(f"Replayed {replayed} of {len(rows)} embeddings up to id {self._watermark}"
+                        + (f" ({late} committed behind the watermark)" if late else ""))
+
+    def ensure_loaded(self, db: Session):
+        """
+        Load the index on first use or after invalidation, and periodically
+        catch up with embeddings written elsewhere
+        """
+        if not self._stale:
+            if time.monotonic() - self._last_sync >= settings.INDEX_SYNC_INTERVAL_SECONDS:
+                with self._lock:
+                    self.sync(db)
+            return
+
+        with self._lock:
+            if not self._stale:
+                return
+            if not (settings.INDEX_SNAPSHOT_DIR and self.load_snapshot()):
+                self.build(db)
+                if settings.INDEX_SNAPSHOT_DIR:
+                    try:
+                        self.save_snapshot()
+                    except OSError as e:
+                        logger.warning(f"Could not write index snapshot: {e}")
+            self.sync(db)
+
+    def measure_recall(self,
+                       db: Session,
+                       kind: str,
+                       sample_size: int = 100,
+                       top_k: int = 10,
+                       nprobe: Optional[int] = None,
+                       search_mode: str = SEARCH_IVF) -> Dict:
+        """
+        Recall of an approximate search mode over a partition, queried with
+        vectors of the opposite entity type (falls back to the partition's own vectors)
+        """
+        self.ensure_loaded(db)
+        target = self.partition(kind)
+        source = self.candidates if kind == JOB else self.jobs
+        if len(source) == 0:
+            source = target
+
+        return target.measure_recall(source.sample_vectors(sample_size), top_k, nprobe, search_mode)
+
+    def upsert(self, kind: str, entity_id: int, vector: List[float], attributes: Optional[Dict] = None,
+               embedding_id: Optional[int] = None):
+        """
+        Add or replace an entity's vector after its embedding is committed.
+        Skipped while the index is stale (the next build reads it from the
+        database) and for entities of other matcher shards. With the
+        committed `embedding_id`, the next sync does not apply the row again.
+        """
+        with self._lock:
+            if not self._stale and self.owns(entity_id):
+                self._apply(kind, entity_id, vector, attributes, embedding_id)
+
+    def delete(self, kind: str, entity_id: int):
+        """Remove an entity from the index"""
+        with self._lock:
+            if not self._stale:
+                self.partition(kind).delete(entity_id)
+
+    def stats(self) -> Dict:
+        """Per-partition index counters"""
+        return {
+            'loaded': not self._stale,
+            'snapshot': self._snapshot_path,
+            'watermark': self._watermark,
+            'watermark_gaps': len(self._gaps),
+            'shard': {'index': self.shard_index, 'count': self.shard_count},
+            'jobs': self.jobs.stats(),
+            'candidates': self.candidates.stats()
+        }
+
+    def invalidate(self):
+        """Mark index stale so the next search rebuilds it"""
+        self._stale = True
+
+
+# Singleton instance
+@lru_cache()
+def get_embedding_index() -> EmbeddingIndex:
+    """Get singleton embedding index instance"""
+    return EmbeddingIndex()
@@ -0,0 +1,94 @@
+"""
+Shared fixtures. Settings are read from the environment on import, so
+they point at a throwaway SQLite database and the hashing encoder before
+any backend module is loaded.
+"""
+import os
+import shutil
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="job-matcher-tests-")
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{DATA_DIR}/test.db",
+    'JWT_SECRET_KEY': "test-secret",
+    'HUGGINGFACE_API_TOKEN': "test-token",
+    'EMBEDDING_BACKEND': "hashing",
+    'EMBEDDING_CACHE_PATH': "",
+    'INDEX_SNAPSHOT_DIR': "",
+    'STARTUP_WARMUP': "false",
+})
+
+import numpy as np
+import pytest
+
+from backend.config import get_settings
+from backend.database import init_db, engine, SessionLocal, Base, Job, Candidate, Embedding
+from backend.services.encoders import encoder_name
+
+settings = get_settings()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once, through the migrations"""
+    init_db()
+    yield engine
+    engine.dispose()
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    """Session on an emptied database"""
+    session = SessionLocal()
+    yield session
+    session.close()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def random_vector(rng):
+    """Random EMBEDDING_DIM vectors as float lists"""
+    def make() -> list:
+        return rng.standard_normal(settings.EMBEDDING_DIM).tolist()
+    return make
+
+
+@pytest.fixture
+def add_job(db, random_vector):
+    """Insert a job plus its embedding; returns (job, embedding)"""
+    def add(vector=None, embedding_id=None, **columns):
+        job = Job(**dict({'title': "Engineer", 'company': "Acme", 'description': "", 'required_skills': []}, **columns))
+        db.add(job)
+        db.flush()
+        embedding = Embedding(
+            id=embedding_id, job_id=job.id, embedding_vector=vector or random_vector(), model_name=encoder_name()
+        )
+        db.add(embedding)
+        db.commit()
+        return job, embedding
+    return add
+
+
+@pytest.fixture
+def add_candidate(db, random_vector):
+    """Insert a candidate plus its embedding; returns (candidate, embedding)"""
+    def add(vector=None, embedding_id=None, **columns):
+        candidate = Candidate(**dict({'name': "Ada", 'skills': [], 'raw_text': ""}, **columns))
+        db.add(candidate)
+        db.flush()
+        embedding = Embedding(
+            id=embedding_id, candidate_id=candidate.id, embedding_vector=vector or random_vector(),
+            model_name=encoder_name()
+        )
+        db.add(embedding)
+        db.commit()
+        return candidate, embedding
+    return add
@@ -0,0 +1,90 @@
+"""
+Structured filters give the same answers in the exact and the
+approximate (IVF, int8, PQ) search modes
+"""
+import numpy as np
+import pytest
+
+from backend.services.vector_index import (
+    IndexPartition, JOB, SEARCH_EXACT, SEARCH_IVF, QUANT_INT8, QUANT_PQ
+)
+from backend.tests.conftest import settings
+
+DIM = 32
+ROWS = 3000
+TOP_K = 20
+LOCATIONS = ["New York, NY", "Austin, TX", "Berlin, Germany", "Remote"]
+JOB_TYPES = ["full-time", "contract"]
+DOMAINS = ["technology", "finance", "healthcare"]
+# The first two leave more than FILTER_GATHER_FRACTION of the rows and go
+# through the approximate stage, the last two are scanned exactly
+FILTERS = [
+    {'job_type': "Full-Time "},
+    {'job_type': "full-time", 'min_experience': 2},
+    {'location': "york"},
+    {'domain': "finance", 'max_experience': 2},
+]
+
+
+@pytest.fixture
+def jobs(rng, monkeypatch):
+    """(partition, attributes by id) of ROWS jobs, searched approximately at any size"""
+    monkeypatch.setattr(settings, "ANN_MIN_ROWS", 0)
+    monkeypatch.setattr(settings, "PQ_SUBVECTORS", 8)
+    attributes = {
+        entity_id: {
+            'location': LOCATIONS[entity_id % len(LOCATIONS)],
+            'job_type': JOB_TYPES[entity_id % len(JOB_TYPES)],
+            'domain': DOMAINS[(entity_id // 7) % len(DOMAINS)],
+            'experience': float(entity_id % 8),
+        }
+        for entity_id in range(1, ROWS + 1)
+    }
+    partition = IndexPartition(JOB, DIM)
+    partition.load(
+        (entity_id, rng.standard_normal(DIM), values['location'], values['job_type'], None,
+         values['domain'], values['experience'], [])
+        for entity_id, values in attributes.items()
+    )
+    return partition, attributes
+
+
+def passes(values: dict, filters: dict) -> bool:
+    """The filter semantics documented on ROW_ATTRIBUTES, in plain Python"""
+    for key, expected in filters.items():
+        if key == 'min_experience':
+            ok = values['experience'] >= expected
+        elif key == 'max_experience':
+            ok = values['experience'] <= expected
+        elif key == 'location':
+            ok = expected.strip().lower() in values['location'].lower()
+        else:
+            ok = values[key] == expected.strip().lower()
+        if not ok:
+            return False
+    return True
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("search_mode", [SEARCH_EXACT, SEARCH_IVF, QUANT_INT8, QUANT_PQ])
+def test_every_hit_passes_the_filters(jobs, rng, search_mode, filters):
+    partition, attributes = jobs
+    hits = partition.search(rng.standard_normal(DIM), TOP_K, -1.0, search_mode, filters=filters)
+
+    assert hits
+    assert all(passes(attributes[entity_id], filters) for entity_id, _, _ in hits)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("search_mode", [SEARCH_IVF, QUANT_INT8, QUANT_PQ])
+def test_exhaustive_approximate_search_matches_exact(jobs, rng, monkeypatch, search_mode, filters):
+    partition, _ = jobs
+    # Probe every IVF list and rescore every row, so nothing is left out
+    monkeypatch.setattr(settings, "QUANT_RESCORE_FACTOR", ROWS)
+    query = rng.standard_normal(DIM)
+
+    exact = partition.search(query, TOP_K, -1.0, SEARCH_EXACT, filters=filters)
+    approximate = partition.search(query, TOP_K, -1.0, search_mode, nprobe=ROWS, filters=filters)
+
+    assert [entity_id for entity_id, _, _ in approximate] == [entity_id for entity_id, _, _ in exact]
+    assert np.allclose([score for _, score, _ in approximate], [score for _, score, _ in exact], atol=1e-6)
@@ -0,0 +1,108 @@
+"""
+Match result cache: LRU/TTL bounds and invalidation through index versions
+"""
+import pytest
+
+from backend.services.match_cache import MatchCache
+from backend.services.match_writer import MatchResultWriter
+from backend.services.matching_service import MatchingService
+from backend.services.vector_index import EmbeddingIndex, JOB, CANDIDATE, entity_attributes
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MatchCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    cache.get("a")
+    cache.put("c", [3])
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ([1], [3])
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = MatchCache(max_entries=2, ttl_seconds=-1)
+    cache.put("a", [1])
+
+    assert cache.get("a") is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_zero_size_disables_the_cache():
+    cache = MatchCache(max_entries=0)
+    cache.put("a", [1])
+    assert cache.get("a") is None
+
+
+@pytest.fixture
+def service(db):
+    """Matching service over its own index, cache and result writer"""
+    service = MatchingService()
+    service.index = EmbeddingIndex()
+    service.match_cache = MatchCache(max_entries=100, ttl_seconds=60)
+    service.match_writer = MatchResultWriter()
+    yield service
+    db.rollback()  # the final flush needs SQLite's write lock
+    service.match_writer.stop()
+
+
+def upload(service, kind, entity, embedding):
+    """Index an uploaded entity the way the upload routes do"""
+    service.index.upsert(kind, entity.id, embedding.embedding_vector, entity_attributes(kind, entity),
+                         embedding_id=embedding.id)
+
+
+def job_ids(matches) -> set:
+    return {match['job_id'] for match in matches}
+
+
+def test_cached_list_survives_unrelated_updates(db, service, add_job, add_candidate):
+    candidate, _ = add_candidate()
+    add_job()
+    matches = service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+
+    # Another candidate changes the candidate partition, not the jobs searched
+    upload(service, CANDIDATE, *add_candidate(name="Grace"))
+
+    assert service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1) is matches
+    assert service.match_cache.stats()['hits'] == 1
+
+
+def test_new_job_invalidates_candidate_lists(db, service, add_job, add_candidate):
+    candidate, _ = add_candidate()
+    add_job()
+    before = service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+
+    job, embedding = add_job(title="Data Engineer")
+    upload(service, JOB, job, embedding)
+    after = service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+
+    assert job_ids(after) == job_ids(before) | {job.id}
+    assert service.match_cache.stats()['hits'] == 0
+
+
+def test_new_vector_of_the_query_entity_invalidates_its_list(db, service, add_job, add_candidate, random_vector):
+    candidate, embedding = add_candidate()
+    add_job()
+    service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+
+    service.index.upsert(CANDIDATE, candidate.id, random_vector(), entity_attributes(CANDIDATE, candidate),
+                         embedding_id=embedding.id + 1)
+    service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+
+    assert service.match_cache.stats()['hits'] == 0
+
+
+def test_sync_of_an_uploaded_embedding_keeps_cached_lists(db, service, add_job, add_candidate):
+    candidate, _ = add_candidate()
+    add_job()
+    service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+    job, embedding = add_job(title="Data Engineer")
+    upload(service, JOB, job, embedding)
+    matches = service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1)
+
+    # Replaying the job's already indexed embedding must not bump the version
+    service.index.sync(db)
+
+    assert service.match_candidate_to_jobs(db, candidate.id, min_similarity=-1) is matches
@@ -0,0 +1,70 @@
+"""
+Versioned schema migrations: each runs once, and re-running is harmless
+"""
+import numpy as np
+from sqlalchemy import text
+
+from backend.database import engine, Embedding, JobSkill
+from backend.database import migrations
+from backend.database.migrations import run_migrations, applied_versions
+
+
+def schema() -> list:
+    with engine.connect() as conn:
+        return sorted(conn.execute(text("SELECT type, name, sql FROM sqlite_master")).all(), key=str)
+
+
+def recorded() -> dict:
+    with engine.connect() as conn:
+        return applied_versions(conn)
+
+
+def test_every_migration_is_recorded_once():
+    assert recorded() == {
+        version: migration.__name__ for version, migration in enumerate(migrations.MIGRATIONS, start=1)
+    }
+
+
+def test_rerunning_migrations_changes_nothing(db, add_job):
+    add_job(required_skills=["Python"])
+    before = schema()
+
+    run_migrations(engine)
+    run_migrations(engine)
+
+    assert schema() == before
+    assert len(recorded()) == len(migrations.MIGRATIONS)
+
+
+def test_migrations_reapply_cleanly_after_losing_their_versions(db, add_job):
+    job, embedding = add_job(required_skills=["Python", "SQL"])
+    vector = np.array(embedding.embedding_vector)
+    db.rollback()  # end the read transaction, it would block the migrations' writes
+    before = schema()
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_migrations"))
+    run_migrations(engine)
+
+    assert schema() == before
+    assert len(recorded()) == len(migrations.MIGRATIONS)
+    assert np.array_equal(db.get(Embedding, embedding.id).embedding_vector, vector)
+    assert db.query(JobSkill).filter(JobSkill.job_id == job.id).count() == 2
+
+
+def test_applied_versions_are_skipped(monkeypatch):
+    calls = []
+    version = len(migrations.MIGRATIONS) + 1
+
+    def add_test_step(conn):
+        calls.append(conn)
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [add_test_step])
+    try:
+        run_migrations(engine)
+        run_migrations(engine)
+        assert len(calls) == 1
+        assert recorded()[version] == "add_test_step"
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM schema_migrations WHERE version = :version"), {'version': version})
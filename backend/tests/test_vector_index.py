@@ -0,0 +1,122 @@
+"""
+Incremental index updates: upserts, replay of committed embeddings and
+the sync watermark
+"""
+import numpy as np
+
+from backend.services.vector_index import EmbeddingIndex, IndexPartition, JOB, entity_attributes
+from backend.tests.conftest import settings
+
+
+def test_upsert_tombstones_the_replaced_row(random_vector):
+    partition = IndexPartition(JOB, settings.EMBEDDING_DIM)
+    partition.upsert(1, random_vector())
+    partition.upsert(2, random_vector())
+    replacement = random_vector()
+    partition.upsert(1, replacement)
+
+    stats = partition.stats()
+    assert (stats['rows'], stats['tombstones'], stats['version']) == (2, 1, 3)
+    assert np.allclose(partition.get_vector(1), replacement / np.linalg.norm(replacement))
+    assert partition.changed_since(1) == {1, 2}
+
+
+def test_delete_tombstones_the_row(random_vector):
+    partition = IndexPartition(JOB, settings.EMBEDDING_DIM)
+    partition.upsert(1, random_vector())
+
+    assert partition.delete(1)
+    assert not partition.delete(1)
+    assert partition.get_vector(1) is None
+    assert (partition.stats()['rows'], partition.stats()['tombstones']) == (0, 1)
+
+
+def test_sync_replays_embeddings_written_by_other_workers(db, add_job):
+    add_job()
+    index = EmbeddingIndex()
+    index.build(db)
+
+    job, embedding = add_job()
+    index.sync(db)
+
+    assert index.jobs.get_vector(job.id) is not None
+    assert index.stats()['watermark'] == embedding.id
+    assert index.jobs.stats()['tombstones'] == 0
+
+
+def test_sync_skips_embeddings_already_applied_on_upload(db, add_job):
+    add_job()
+    index = EmbeddingIndex()
+    index.build(db)
+    version = index.jobs.version
+
+    for _ in range(30):
+        job, embedding = add_job()
+        index.upsert(JOB, job.id, embedding.embedding_vector, entity_attributes(JOB, job), embedding_id=embedding.id)
+    index.sync(db)
+
+    stats = index.jobs.stats()
+    assert (stats['rows'], stats['tombstones'], stats['version']) == (31, 0, version + 30)
+    assert index.stats()['watermark'] == embedding.id
+
+
+def test_sync_applies_a_newer_embedding_of_an_uploaded_entity(db, add_job, random_vector):
+    index = EmbeddingIndex()
+    index.build(db)
+    job, embedding = add_job()
+    index.upsert(JOB, job.id, embedding.embedding_vector, entity_attributes(JOB, job), embedding_id=embedding.id)
+
+    # Another worker replaces the embedding, as a resume re-upload does
+    db.delete(embedding)
+    replacement = random_vector()
+    db.add(type(embedding)(job_id=job.id, embedding_vector=replacement, model_name=embedding.model_name))
+    db.commit()
+    index.sync(db)
+
+    assert np.allclose(index.jobs.get_vector(job.id), replacement / np.linalg.norm(replacement), atol=1e-6)
+    assert index.jobs.stats()['tombstones'] == 1
+
+
+def test_sync_picks_up_embeddings_committed_behind_the_watermark(db, add_job):
+    add_job(embedding_id=1)
+    add_job(embedding_id=3)
+    index = EmbeddingIndex()
+    index.build(db)
+    assert index.stats()['watermark_gaps'] == 1
+
+    # Id 2 was taken by a transaction that commits after id 3
+    late, _ = add_job(embedding_id=2)
+    index.sync(db)
+
+    assert index.jobs.get_vector(late.id) is not None
+    assert index.stats()['watermark'] == 3
+    assert index.stats()['watermark_gaps'] == 0
+
+
+def test_sync_stops_checking_gaps_after_the_gap_window(db, add_job, monkeypatch):
+    add_job(embedding_id=1)
+    add_job(embedding_id=3)
+    index = EmbeddingIndex()
+    index.build(db)
+
+    monkeypatch.setattr(settings, "INDEX_SYNC_GAP_SECONDS", 0.0)
+    index.sync(db)
+    assert index.stats()['watermark_gaps'] == 0
+
+
+def test_snapshot_keeps_watermark_and_gaps(db, add_job, tmp_path):
+    add_job(embedding_id=1)
+    job, _ = add_job(embedding_id=3)
+    index = EmbeddingIndex()
+    index.build(db)
+    index.save_snapshot(str(tmp_path))
+
+    mapped = EmbeddingIndex()
+    assert mapped.load_snapshot(str(tmp_path))
+    assert mapped.stats()['watermark'] == 3
+    assert mapped.stats()['watermark_gaps'] == 1
+    assert np.allclose(mapped.jobs.get_vector(job.id), index.jobs.get_vector(job.id))
+
+    late, _ = add_job(embedding_id=2)
+    mapped.sync(db)
+    assert mapped.jobs.get_vector(late.id) is not None